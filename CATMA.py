@@ -1,16 +1,28 @@
 import argparse as ap
 import json
 import os
+import time
+from concurrent.futures import ProcessPoolExecutor
 
 from src.utils import *
-from src.model_processor import read_static_model, read_dynamic_model
-from src.non_conformance_detector import detect_non_conformances
-from src.interpretation_generator import generate_interpretation
-from src.non_conformance_visualizer import visualize_non_conformances
+from src.model_processor import read_static_model
+from src.model_cache import create_model_cache, compute_file_hash
+from src.model_registry import ModelRegistry
+from src.random_walk import get_random_walk_settings
+from src.non_conformance_detector import detect_non_conformances, extract_occurred_links_from_dynamic_model
+from src.non_conformance_visualizer import visualize_non_conformances, get_diagram_settings
 from src.interpretation_visualizer import generate_html_for_interpretation
+from src.interpretation_pool import stream_interpretations_in_pool
+from src.analysis_pipeline import fingerprint_non_conformances, generate_interpretations_in_windows, wait_for_rendered_models, DEFAULT_BUFFER_SIZE
+from src.render_pool import RenderPool, DEFAULT_RENDER_TIMEOUT, create_render_cache
+from src.incremental_analysis import *
 
 
 FF_SUFFIX = '.csv.ff.final.dot' # Suffix of the dynamic model files created by FlexFringe tool
+CONFIG_PATH = './config/config.json' # Default path to the configuration file
+INTERPRETATION_TEXTS_PATH = './interpretation_texts/interpretation_texts.json' # Path to the texts used in the interpretations
+BATCH_SUMMARY_FILE_NAME = 'batch_summary.json' # File that stores the summary of a batch of projects
+PROJECT_PATH_KEYS = ('name', 'static_model_path', 'dynamic_models_path', 'output_path', 'previous_dynamic_models_path') # Fields of a project in the manifest that are not configuration
 
 def create_output_folders(output_folder: str):
     '''
@@ -33,8 +45,16 @@ def read_arguments():
     arg_parser.add_argument('--static_model_path', type=str, help='Path to static model.')
     arg_parser.add_argument('--dynamic_models_path', type=str, help='Path to the runtime models.')
     arg_parser.add_argument('--output_path', type=str, help='Path to the output folder.')
+    arg_parser.add_argument('--model_format', type=str, choices=list(FF_MODEL_SUFFIXES.keys()), default='dot', help='Format of the runtime models that should be read (default: dot).')
+    arg_parser.add_argument('--previous_dynamic_models_path', type=str, help='Path to the previous runtime models, enables the incremental analysis.')
+    arg_parser.add_argument('--config_path', type=str, default=CONFIG_PATH, help='Path to the configuration file (default: ' + CONFIG_PATH + ').')
+    arg_parser.add_argument('--manifest_path', type=str, help='Path to a manifest of projects that are analyzed in a single batch.')
+    arg_parser.add_argument('--jobs', type=int, help='Number of worker processes that generate the interpretations (default: the `jobs` field of the configuration, or 1).')
     args = arg_parser.parse_args()
 
+    if args.manifest_path:
+        return args
+
     static_model_path = args.static_model_path
     if not static_model_path:
         print("\nNo path to static models provided, please run again.\n")
@@ -43,63 +63,225 @@ def read_arguments():
     if not dynamic_models_path:
         print("\nNo path to dynamic models provided, please run again.\n")
         return
-    output_folder = args.output_path
-    if not output_folder: output_folder = "./"  # use current directory if no output folder specified
+    if not args.output_path: args.output_path = "./"  # use current directory if no output folder specified
 
-    return static_model_path, dynamic_models_path, output_folder
+    return args
 
 
-def main():
+def compare_with_previous_models(previous_dynamic_models_path: str, dynamic_models_path: str, output_folder: str, config: dict, static_model, dynamic_model, static_non_conformances: set, dynamic_non_conformances: set, model_registry, model_cache):
+    '''
+    Compare the current dynamic models with a previous snapshot of the models (e.g. before a fix was deployed).
+    The non-conformances of the previous models are detected and the resolved, new and unchanged 
+    non-conformances are written to the delta report, together with the models and links that changed.
+    The interpretations of the resolved non-conformances are removed from the output folder.
+    '''
+    general_model_file = config['general_dynamic_model'] + FF_SUFFIX
+    previous_dynamic_model = model_registry.get_model(previous_dynamic_models_path + general_model_file, lazy=True)
+    previous_static_non_conformances, previous_dynamic_non_conformances = detect_non_conformances(static_model, previous_dynamic_model, config['services'])
+    delta = {
+        'static': compute_non_conformance_delta(previous_static_non_conformances, static_non_conformances),
+        'dynamic': compute_non_conformance_delta(previous_dynamic_non_conformances, dynamic_non_conformances)
+    }
+    model_diff = diff_model_folders(compute_model_folder_hashes(previous_dynamic_models_path, model_cache), compute_model_folder_hashes(dynamic_models_path, model_cache))
+    link_diff = diff_link_sets(extract_occurred_links_from_dynamic_model(previous_dynamic_model, config['services']), extract_occurred_links_from_dynamic_model(dynamic_model, config['services']))
+    write_delta_report(output_folder, delta, model_diff, link_diff)
+    print(compute_delta_text(delta))
+    removed_paths = remove_resolved_interpretations(output_folder, delta, static_model)
+    if len(removed_paths) > 0:
+        print('Removed ' + str(len(removed_paths)) + ' interpretations of resolved non-conformances')
 
-    static_model_path, dynamic_models_path, output_folder = read_arguments()
-    if (not static_model_path) or (not dynamic_models_path):
-        return
-    
-    # Read config information
-    print('Reading configuration file...')
-    config = json.load(open('./config/config.json'))
-    interpretation_texts = json.load(open('./interpretation_texts/interpretation_texts.json'))
-    
+
+def run_analysis(static_model_path: str, dynamic_models_path: str, output_folder: str, config: dict, interpretation_texts: dict, model_format: str = 'dot', previous_dynamic_models_path: str = None, executor = None, jobs: int = 1) -> dict:
+    '''
+    Run the conformance analysis of a single project: read the models, detect the non-conformances and generate
+    their interpretations and visualizations. The numbers of detected, reused and failed interpretations are returned.
+
+    :param static_model_path: The path to the static model.
+    :param dynamic_models_path: The path to the folder containing the dynamic models.
+    :param output_folder: The path to the output folder.
+    :param config: The configuration of the project.
+    :param interpretation_texts: The texts that are used in the interpretations.
+    :param model_format: The format of the dynamic models that should be read, either `dot` or `json`.
+    :param previous_dynamic_models_path: The (optional) path to the previous dynamic models, enables the incremental analysis.
+    :param executor: The (optional) process pool that is shared between projects, by default a pool is created for the project.
+    :param jobs: The number of worker processes that generate the interpretations, with 1 they are generated in this process.
+    '''
     # Create the output folder and subfolders to store the output files of CATMA
     create_output_folders(output_folder)
+    model_cache = create_model_cache(config)
+    # Every dynamic model is loaded, cleaned and rendered only once during the run, the rendering runs in the background
+    render_pool = RenderPool(config.get('render_workers'), config.get('render_timeout', DEFAULT_RENDER_TIMEOUT), render_cache=create_render_cache(config))
+    model_registry = ModelRegistry(model_format, model_cache, executor, render_pool)
 
     # Workflow step 1: read models 
     print('Processing static model...')
     static_model = read_static_model(static_model_path)
     print('Processing dynamic model...')
-    dynamic_model = read_dynamic_model(dynamic_models_path + config['general_dynamic_model']  + FF_SUFFIX)
+    general_model_path = dynamic_models_path + config['general_dynamic_model']  + FF_SUFFIX
+    dynamic_model = model_registry.get_model(general_model_path, lazy=True)
     
     # Workflow step 2: detect non-conformances
     print('Detecting non-conformances...')
     static_non_conformances, dynamic_non_conformances = detect_non_conformances(static_model, dynamic_model, config['services'])
 
+    # In the incremental mode the results are compared with the previous models and unchanged interpretations are reused
+    previous_state = None
+    if previous_dynamic_models_path:
+        print('Comparing with previous dynamic models...')
+        previous_state = load_analysis_state(output_folder)
+        compare_with_previous_models(previous_dynamic_models_path, dynamic_models_path, output_folder, config, static_model, dynamic_model, static_non_conformances, dynamic_non_conformances, model_registry, model_cache)
+
     if len(static_non_conformances) + len(dynamic_non_conformances) == 0:
         print('No non-conformances detected between implementation and deployment of system, everything looks good :)')
-        return
+        save_analysis_state(output_folder, static_non_conformances, dynamic_non_conformances, {})
+        model_registry.close()
+        if previous_state is not None:
+            previous_state['file'].close()
+        return {'static_non_conformances': 0, 'dynamic_non_conformances': 0, 'reused_interpretations': 0, 'failed_interpretations': 0}
     
     print(compute_num_detected_ncf_text(len(static_non_conformances), len(dynamic_non_conformances)))
 
-    # Workflow step 3: generate interpretations
-    print('Generating non-conformance interpretations...')
+    # Workflow step 3: visualize non-conformances, the diagram is rendered in the background while the interpretations are generated
+    print('Generating non-conformance visualizations...')
+    visualize_non_conformances(static_non_conformances, dynamic_non_conformances, output_folder, static_model, get_diagram_settings(config), render_pool)
+
+    # Workflow steps 4 and 5: the non-conformances stream through the pipeline (fingerprint -> interpret -> render -> write),
+    # so the report of a non-conformance is written as soon as its interpretation and models are ready
+    sequence_analysis = config.get('sequence_analysis', 'analytic')
+    random_walk_settings = get_random_walk_settings(config)
+    interpretation_settings = {'static_model': compute_file_hash(static_model_path), 'services': config['services'], 'sequence_analysis': sequence_analysis, 'random_walk_settings': random_walk_settings}
+    non_conformances = [('static', sncf) for sncf in sorted(static_non_conformances)] + [('dynamic', dncf) for dncf in sorted(dynamic_non_conformances)]
+    buffer_size = config.get('pipeline_buffer_size', DEFAULT_BUFFER_SIZE)
+    items = fingerprint_non_conformances(non_conformances, dynamic_models_path, general_model_path, interpretation_settings, model_format, previous_state, model_cache)
+    # one process pool for the whole pipeline (as in `run_batch`), so the workers are started once instead of once per window;
+    # the pool starts its worker processes on the first task
+    pool = executor if executor is not None else ProcessPoolExecutor(max_workers=jobs if jobs > 1 else config.get('max_workers'))
+    if jobs > 1:
+        # the workers load the models of the project themselves, so the models are not loaded here
+        print('Generating non-conformance interpretations with ' + str(jobs) + ' jobs...')
+        items = stream_interpretations_in_pool(pool, items, static_model, static_model_path, dynamic_models_path, general_model_path, output_folder,
+                                               sequence_analysis, random_walk_settings, model_format, model_cache, render_pool, max(buffer_size, 2 * jobs))
+    else:
+        print('Generating non-conformance interpretations...')
+        model_registry.executor = pool
+        items = generate_interpretations_in_windows(items, dynamic_models_path, output_folder, static_model, dynamic_model, model_registry, sequence_analysis, random_walk_settings, buffer_size, config.get('max_workers'))
+    # the interpretation pages refer to the rendered models, so a page is written once its models are rendered
+    items = wait_for_rendered_models(items, render_pool, buffer_size)
+
+    reused_interpretations, failed_interpretations = 0, 0
+    try:
+        with AnalysisStateWriter(output_folder, static_non_conformances, dynamic_non_conformances) as state_writer:
+            for item in items:
+                ncf_type, ncf = item['non_conformance_type'], item['non_conformance']
+                if item['error'] is not None:
+                    # failed interpretations are not stored, so they are generated again in the next run
+                    print('Interpretation of the ' + ncf_type + ' non-conformance ' + ncf + ' failed: ' + item['error'])
+                    failed_interpretations += 1
+                    continue
+                reused_interpretations += item['reused']
+                for svg_path, error in item['render_errors'].items():
+                    print('Rendering of ' + svg_path + ' failed: ' + error)
+                generate_html_for_interpretation(output_folder + 'interpretations/', item['interpretation'], interpretation_texts)
+                state_writer.add(ncf_type, ncf, item['fingerprint'], item['interpretation'])
+    finally:
+        if pool is not executor:
+            pool.shutdown()
+        model_registry.close()
+        if previous_state is not None:
+            previous_state['file'].close()
+    if reused_interpretations > 0:
+        print('Reused ' + str(reused_interpretations) + ' interpretations of the previous run')
+
+    # the models of the interpretations are rendered by now, only the architecture diagram may still be rendering
+    for path, error in render_pool.wait([output_folder + 'visualization/plantuml.png']).items():
+        print('Rendering of ' + path + ' failed: ' + error)
+    render_pool.close()
+    if render_pool.cache_hits > 0:
+        print('Reused ' + str(render_pool.cache_hits) + ' of ' + str(len(render_pool.jobs)) + ' rendered models from the render cache')
 
-    ncf_interpretations = list()
-    for sncf in static_non_conformances:
-        services = sncf.split('-')
-        ncf_interpretations.append(generate_interpretation('static', services, dynamic_models_path, output_folder, static_model, dynamic_model))
+    return {'static_non_conformances': len(static_non_conformances), 'dynamic_non_conformances': len(dynamic_non_conformances), 'reused_interpretations': reused_interpretations, 'failed_interpretations': failed_interpretations}
 
-    for dncf in dynamic_non_conformances:
-        services = dncf.split('-')
-        ncf_interpretations.append(generate_interpretation('dynamic', services, dynamic_models_path, output_folder, static_model, dynamic_model))
+
+def read_manifest(manifest_path: str, config: dict) -> list:
+    '''
+    Read the manifest of a batch of projects. The manifest lists the projects with their static model, folder of
+    dynamic models and output folder; all other fields of a project (e.g. `services` and `general_dynamic_model`)
+    override the configuration, after the (optional) `config` section of the manifest that holds for all projects.
+
+    :param manifest_path: The path to the manifest.
+    :param config: The configuration that is used for the fields that are not set in the manifest.
+    '''
+    manifest = json.load(open(manifest_path))
+    batch_config = dict(config, **manifest.get('config', {}))
+    projects = []
+    for project in manifest['projects']:
+        project_config = dict(batch_config, **{key: value for key, value in project.items() if key not in PROJECT_PATH_KEYS})
+        projects.append({
+            'name': project.get('name', project['output_path']),
+            'static_model_path': project['static_model_path'],
+            'dynamic_models_path': project['dynamic_models_path'],
+            'output_path': project['output_path'],
+            'previous_dynamic_models_path': project.get('previous_dynamic_models_path'),
+            'config': project_config
+        })
+    return projects
+
+
+def run_batch(manifest_path: str, config: dict, interpretation_texts: dict, model_format: str = 'dot', jobs: int = 1) -> list:
+    '''
+    Run the conformance analysis of all projects in a manifest. All projects share one process pool, so the
+    worker processes are started once for the whole batch. A project that fails does not stop the batch, the
+    outcome of every project is written to the summary (at the `summary_path` of the manifest, or next to it).
+
+    :param manifest_path: The path to the manifest, see `read_manifest`.
+    :param config: The configuration that is used for the fields that are not set in the manifest.
+    :param interpretation_texts: The texts that are used in the interpretations.
+    :param model_format: The format of the dynamic models that should be read, either `dot` or `json`.
+    :param jobs: The number of worker processes that generate the interpretations, the shared pool gets this many workers if it is more than 1.
+    '''
+    projects = read_manifest(manifest_path, config)
+    summary = []
+    with ProcessPoolExecutor(max_workers=jobs if jobs > 1 else config.get('max_workers')) as executor:
+        for project in projects:
+            print('\nAnalyzing project ' + project['name'] + '...')
+            start_time = time.perf_counter()
+            result = {'name': project['name'], 'output_path': project['output_path']}
+            try:
+                result.update(run_analysis(project['static_model_path'], project['dynamic_models_path'], project['output_path'], project['config'],
+                                           interpretation_texts, model_format, project['previous_dynamic_models_path'], executor, jobs))
+                result['status'] = 'ok'
+            except Exception as e:
+                print('Analysis of project ' + project['name'] + ' failed: ' + str(e))
+                result['status'] = 'failed'
+                result['error'] = str(e)
+            result['duration_seconds'] = round(time.perf_counter() - start_time, 3)
+            summary.append(result)
+
+    summary_path = json.load(open(manifest_path)).get('summary_path') or os.path.join(os.path.dirname(manifest_path), BATCH_SUMMARY_FILE_NAME)
+    os.makedirs(os.path.dirname(summary_path) or '.', exist_ok=True)
+    with open(summary_path, 'w') as f:
+        json.dump(summary, f, indent=4)
+    print('\nAnalyzed ' + str(len(summary)) + ' projects, the summary is written to ' + summary_path)
+    return summary
+
+
+def main():
+
+    args = read_arguments()
+    if args is None:
+        return
     
-    # Workflow step 4: visualize non-conformances
-    print('Generating non-conformance visualizations...')
-    visualize_non_conformances(static_non_conformances, dynamic_non_conformances, output_folder, static_model)
+    # Read config information
+    print('Reading configuration file...')
+    config = json.load(open(args.config_path))
+    interpretation_texts = json.load(open(INTERPRETATION_TEXTS_PATH))
+    jobs = args.jobs if args.jobs is not None else config.get('jobs', 1)
+
+    if args.manifest_path:
+        run_batch(args.manifest_path, config, interpretation_texts, args.model_format, jobs)
+    else:
+        run_analysis(args.static_model_path, args.dynamic_models_path, args.output_path, config, interpretation_texts, args.model_format, args.previous_dynamic_models_path, jobs=jobs)
 
-    # Workflow step 5: generate visualization for non-conformances
-    print('Generating interpretation visualizations...')
-    for ncf_interpretation in ncf_interpretations:
-        generate_html_for_interpretation(output_folder + 'interpretations/', ncf_interpretation, interpretation_texts)
-        
 
 if __name__ == '__main__':
     main()
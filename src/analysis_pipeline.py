@@ -0,0 +1,107 @@
+from src.interpretation_generator import generate_interpretation, collect_model_paths_for_non_conformances
+from src.incremental_analysis import collect_input_paths_for_interpretation, compute_interpretation_fingerprint, find_reusable_interpretation, RENDERED_MODEL_KEYS
+from collections import deque
+from itertools import islice
+
+DEFAULT_BUFFER_SIZE = 8 # Maximal number of non-conformances that are buffered between two stages of the pipeline
+
+
+def fingerprint_non_conformances(non_conformances: list, dynamic_models_path: str, general_model_path: str, interpretation_settings: dict, model_format: str = None, previous_state = None, model_cache = None):
+    """
+    First stage of the pipeline: compute the fingerprint of the inputs of every non-conformance and find its
+    interpretation in the results of the previous run. Every non-conformance is yielded as a dict with its
+    `non_conformance_type`, `non_conformance`, `stream`, `fingerprint` and `interpretation` (None if it has to
+    be generated); `reused` tells whether the interpretation of the previous run is reused.
+
+    :param non_conformances: The (type, non-conformance) tuples, the index of a non-conformance is its random stream.
+    :param dynamic_models_path: The path to the folder containing the dynamic models.
+    :param general_model_path: The path to the general dynamic model.
+    :param interpretation_settings: The settings the interpretations depend on, see `compute_interpretation_fingerprint`.
+    :param model_format: The format of the dynamic models that should be read, either `dot` or `json`.
+    :param previous_state: The (optional) results of the previous run, see `load_analysis_state`.
+    :param model_cache: The (optional) persistent cache of parsed dynamic models.
+    """
+    model_hashes = {}
+    for stream, (non_conformance_type, non_conformance) in enumerate(non_conformances):
+        # the random walks of an interpretation depend on its stream, the analytic results do not
+        settings = dict(interpretation_settings, stream=stream) if interpretation_settings['sequence_analysis'] == 'random_walk' else interpretation_settings
+        input_paths = collect_input_paths_for_interpretation(non_conformance_type, non_conformance.split('-'), dynamic_models_path, general_model_path, model_format)
+        fingerprint = compute_interpretation_fingerprint(input_paths, settings, model_cache, model_hashes)
+        interpretation = find_reusable_interpretation(previous_state, non_conformance_type, non_conformance, fingerprint)
+        yield {
+            'non_conformance_type': non_conformance_type,
+            'non_conformance': non_conformance,
+            'stream': stream,
+            'fingerprint': fingerprint,
+            'interpretation': interpretation,
+            'reused': interpretation is not None,
+            'error': None
+        }
+
+
+def generate_interpretations_in_windows(items, dynamic_models_path: str, output_folder: str, static_model, dynamic_model, model_registry, sequence_analysis: str, random_walk_settings: dict, window_size: int = DEFAULT_BUFFER_SIZE, max_workers: int = None):
+    """
+    Second stage of the pipeline (in this process): generate the interpretations of the non-conformances that were
+    not reused, a window of non-conformances at a time. The dynamic models of a window are loaded at once, and the
+    models that the next window does not need are released, so only the models of one window are kept in memory.
+    An interpretation that fails is yielded with its `error` and without an interpretation.
+
+    :param items: The non-conformances from the first stage, see `fingerprint_non_conformances`.
+    :param window_size: The number of non-conformances of a window.
+    :param max_workers: The maximum number of worker processes that load the models of a window.
+    See `generate_interpretation` for the other parameters.
+    """
+    items = iter(items)
+    previous_model_paths = set()
+    while True:
+        window = list(islice(items, window_size))
+        if not window:
+            break
+        pending = [item for item in window if item['interpretation'] is None]
+        model_paths = collect_model_paths_for_non_conformances({item['non_conformance'] for item in pending if item['non_conformance_type'] == 'static'},
+                                                               {item['non_conformance'] for item in pending if item['non_conformance_type'] == 'dynamic'}, dynamic_models_path)
+        model_registry.release(previous_model_paths - set(model_paths))
+        try:
+            model_registry.prefetch(model_paths, max_workers)
+        except Exception:
+            # e.g. a model that cannot be parsed, the models are then loaded per interpretation so only its interpretations fail
+            pass
+        previous_model_paths = set(model_paths)
+        for item in window:
+            if item['interpretation'] is None:
+                # as in the worker processes (see `generate_interpretation_task`), an error only fails the interpretation it belongs to
+                try:
+                    item['interpretation'] = generate_interpretation(item['non_conformance_type'], item['non_conformance'].split('-'), dynamic_models_path, output_folder, static_model,
+                                                                     dynamic_model, model_registry, sequence_analysis, random_walk_settings, item['stream'])
+                except Exception as e:
+                    item['error'] = type(e).__name__ + ': ' + str(e)
+            yield item
+    model_registry.release(previous_model_paths)
+
+
+def collect_rendered_paths(interpretation: dict) -> list:
+    return [interpretation[key] for key in RENDERED_MODEL_KEYS if key in interpretation]
+
+
+def wait_for_rendered_models(items, render_pool, buffer_size: int = DEFAULT_BUFFER_SIZE):
+    """
+    Third stage of the pipeline: yield the non-conformances, in their order, once the models of their interpretation
+    are rendered. Up to `buffer_size` non-conformances are buffered while their models render in the background,
+    the errors of the rendering are stored in `render_errors`.
+
+    :param items: The non-conformances with their interpretation from the second stage.
+    :param render_pool: The RenderPool that renders the models.
+    :param buffer_size: The maximal number of non-conformances that wait for the rendering.
+    """
+    buffer = deque()
+    for item in items:
+        buffer.append(item)
+        while len(buffer) > buffer_size or (buffer and buffer[0]['interpretation'] is None) or (buffer and render_pool.is_finished(collect_rendered_paths(buffer[0]['interpretation']))):
+            yield finish_rendering(buffer.popleft(), render_pool)
+    while buffer:
+        yield finish_rendering(buffer.popleft(), render_pool)
+
+
+def finish_rendering(item: dict, render_pool) -> dict:
+    item['render_errors'] = render_pool.wait(collect_rendered_paths(item['interpretation'])) if item['interpretation'] is not None else {}
+    return item
@@ -0,0 +1,266 @@
+import re
+import subprocess
+
+# An attribute list of a statement, quoted strings may contain `]` and newlines (e.g. the node labels of FlexFringe)
+ATTRIBUTE_LIST_PATTERN = r'\[((?:[^\]"]|"(?:[^"\\]|\\.)*")*)\]'
+STATEMENT_REGEX = re.compile(r'^\s*("(?:[^"\\]|\\.)*"|[\w.]+)\s*(?:->\s*("(?:[^"\\]|\\.)*"|[\w.]+))?\s*(?:' + ATTRIBUTE_LIST_PATTERN + r')?\s*;?\s*$', re.DOTALL)
+ATTRIBUTE_REGEX = re.compile(r'(\w+)\s*=\s*("(?:[^"\\]|\\.)*"|[^\s,\]]+)', re.DOTALL)
+ID_REGEX = re.compile(r'^(?:[A-Za-z_][\w]*|-?(?:\.\d+|\d+(?:\.\d*)?))$')
+KEYWORD_REGEX = re.compile(r'^(?:digraph|graph|strict|node|edge|subgraph)\b')
+
+
+class DotNode:
+    """
+    Lightweight replacement for the pydot Node class. It only offers the part of the pydot API
+    that is used by CATMA.
+    """
+    __slots__ = ('name', 'attributes')
+
+    def __init__(self, name: str, attributes: dict):
+        self.name = name
+        self.attributes = attributes
+
+    def get_name(self) -> str:
+        return self.name
+
+    def get_attributes(self) -> dict:
+        return self.attributes
+
+    def get_label(self):
+        return self.attributes.get('label')
+
+    def set_label(self, label: str):
+        self.attributes['label'] = label
+
+    def set_fillcolor(self, color: str):
+        self.attributes['fillcolor'] = color
+
+
+class DotEdge:
+    """
+    Lightweight replacement for the pydot Edge class. It only offers the part of the pydot API
+    that is used by CATMA. Labels are kept as they occur in the DOT file (including quotes),
+    just like pydot does. Besides the label, an edge stores the id of its symbol in the alphabet
+    of the graph and its frequency, so the label text does not have to be parsed again.
+    """
+    __slots__ = ('source', 'destination', 'attributes', 'symbol', 'frequency')
+
+    def __init__(self, source: str, destination: str, attributes: dict, symbol: int = None, frequency: int = 0):
+        self.source = source
+        self.destination = destination
+        self.attributes = attributes
+        self.symbol = symbol
+        self.frequency = frequency
+
+    def get_source(self) -> str:
+        return self.source
+
+    def get_destination(self) -> str:
+        return self.destination
+
+    def get_attributes(self) -> dict:
+        return self.attributes
+
+    def get_label(self):
+        return self.attributes.get('label')
+
+    def set_href(self, href: str):
+        self.attributes['href'] = href
+
+
+class DotGraph:
+    """
+    Lightweight replacement for the pydot Dot class, used to hold the dynamic models learned by FlexFringe.
+    """
+
+    def __init__(self, name: str = 'DFA', graph_type: str = 'digraph'):
+        self.name = name
+        self.graph_type = graph_type
+        self.nodes = []
+        self.edges = []
+        self.alphabet = []
+        self.symbol_ids = {}
+
+    def intern_symbol(self, symbol_name: str) -> int:
+        """
+        Get the id of a symbol (the call information of a transition) in the alphabet of the graph,
+        the symbol is added to the alphabet if it was not seen before.
+
+        :param symbol_name: The symbol, e.g. `8080.0__>catalog__200.0__get__order__catalog`.
+        """
+        symbol = self.symbol_ids.get(symbol_name)
+        if symbol is None:
+            symbol = len(self.alphabet)
+            self.alphabet.append(symbol_name)
+            self.symbol_ids[symbol_name] = symbol
+        return symbol
+
+    def get_name(self) -> str:
+        return self.name
+
+    def get_nodes(self) -> list:
+        return self.nodes
+
+    def get_edges(self) -> list:
+        return self.edges
+
+    def del_node(self, node):
+        name = node.get_name() if isinstance(node, DotNode) else node
+        self.nodes = [n for n in self.nodes if n.get_name() != name]
+
+    def to_string(self) -> str:
+        """
+        Convert the graph back into the DOT format.
+        """
+        lines = [self.graph_type + ' ' + self.name + ' {']
+        for node in self.nodes:
+            lines.append(format_statement(node.name, node.attributes))
+        for edge in self.edges:
+            lines.append(format_statement(edge.source + ' -> ' + edge.destination, edge.attributes))
+        lines.append('}\n')
+        return '\n'.join(lines)
+
+    def write(self, path: str, format: str = 'raw', prog: str = 'dot'):
+        """
+        Write the graph to a file. For any format other than `raw` the graph is rendered by Graphviz.
+
+        :param path: The path of the file the graph is written to.
+        :param format: The output format, e.g. `raw` for the DOT text or `svg`.
+        :param prog: The Graphviz program that is used for the rendering.
+        """
+        write_dot_text(self.to_string(), path, format, prog)
+
+
+def write_dot_text(dot_text: str, path: str, format: str = 'raw', prog: str = 'dot', timeout: float = None):
+    """
+    Write a graph in the DOT format to a file. For any format other than `raw` the graph is rendered by Graphviz.
+
+    :param dot_text: The graph in the DOT format.
+    :param path: The path of the file the graph is written to.
+    :param format: The output format, e.g. `raw` for the DOT text or `svg`.
+    :param prog: The Graphviz program that is used for the rendering.
+    :param timeout: The maximal number of seconds the rendering may take, None for no limit.
+    """
+    if format == 'raw':
+        with open(path, 'w') as f:
+            f.write(dot_text)
+        return
+    subprocess.run([prog, '-T' + format, '-o', path], input=dot_text.encode('utf-8'), check=True, timeout=timeout)
+
+
+def quote_value(value: str) -> str:
+    """
+    Quote an attribute value for the DOT format, values that are already quoted or are valid IDs are kept as is.
+
+    :param value: The attribute value.
+    """
+    value = str(value)
+    if (len(value) > 1 and value[0] == '"' and value[-1] == '"') or ID_REGEX.match(value):
+        return value
+    return '"' + value.replace('"', '\\"') + '"'
+
+
+def format_statement(statement: str, attributes: dict) -> str:
+    """
+    Format a node or edge statement, including its attribute list, in the DOT format.
+
+    :param statement: The node name or the edge (`src -> dst`).
+    :param attributes: The attributes of the node or edge.
+    """
+    if not attributes:
+        return statement + ';'
+    return statement + ' [' + ', '.join(key + '=' + quote_value(value) for key, value in attributes.items()) + '];'
+
+
+def strip_quotes(identifier: str) -> str:
+    if len(identifier) > 1 and identifier[0] == '"' and identifier[-1] == '"':
+        return identifier[1:-1]
+    return identifier
+
+
+def add_statement(graph: DotGraph, statement: str):
+    """
+    Parse a single (complete) statement and add the resulting node or edge to the graph. Empty
+    statements, such as the stray `;` FlexFringe sometimes writes, are ignored.
+
+    :param graph: The graph to which the node or edge is added.
+    :param statement: The text of the statement.
+    """
+    statement = statement.strip()
+    if statement in ('', ';') or KEYWORD_REGEX.match(statement):
+        return
+    match = STATEMENT_REGEX.match(statement)
+    if match is None:
+        return
+    source, destination, attribute_text = match.groups()
+    attributes = dict(ATTRIBUTE_REGEX.findall(attribute_text)) if attribute_text else {}
+    if destination is None:
+        graph.nodes.append(DotNode(strip_quotes(source), attributes))
+        return
+    symbol, frequency = None, 0
+    label = attributes.get('label')
+    if label is not None:
+        # labels of FlexFringe are formatted as `"<symbol>\n<frequency> "`
+        splitted = strip_quotes(label).split('\n')
+        symbol = graph.intern_symbol(splitted[0])
+        if len(splitted) > 1 and splitted[1].strip().isdigit():
+            frequency = int(splitted[1].strip())
+    graph.edges.append(DotEdge(strip_quotes(source), strip_quotes(destination), attributes, symbol, frequency))
+
+
+def count_unescaped_quotes(line: str) -> int:
+    return line.count('"') - line.count('\\"')
+
+
+def parse_dot_lines(lines) -> DotGraph:
+    """
+    Parse the restricted DOT dialect emitted by FlexFringe in a single pass. Statements are collected
+    line by line until they are complete (outside of a quoted string and terminated by `;`), so
+    only a single statement is kept in memory at a time.
+
+    :param lines: An iterable over the lines of the DOT file.
+    """
+    graph = DotGraph()
+    statement = []
+    in_quotes = False
+    for line in lines:
+        if not in_quotes and not statement:
+            stripped = line.strip()
+            if stripped == '' or stripped.startswith('//') or stripped == '}':
+                continue
+            if stripped.endswith('{'):
+                header = stripped[:-1].split()
+                if len(header) > 1:
+                    graph.graph_type = header[-2]
+                    graph.name = strip_quotes(header[-1])
+                continue
+
+        statement.append(line)
+        if count_unescaped_quotes(line) % 2 == 1:
+            in_quotes = not in_quotes
+        if not in_quotes and line.rstrip().endswith(';'):
+            add_statement(graph, ''.join(statement))
+            statement = []
+
+    if statement:
+        add_statement(graph, ''.join(statement).rstrip().rstrip('}'))
+    return graph
+
+
+def parse_dot_file(path: str) -> DotGraph:
+    """
+    Load a dynamic model that is stored in the DOT format by FlexFringe.
+
+    :param path: The path to the DOT file.
+    """
+    with open(path, 'r') as f:
+        return parse_dot_lines(f)
+
+
+def parse_dot_string(text: str) -> DotGraph:
+    """
+    Load a dynamic model from a string in the DOT format produced by FlexFringe.
+
+    :param text: The DOT text.
+    """
+    return parse_dot_lines(text.splitlines(keepends=True))
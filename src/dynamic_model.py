@@ -0,0 +1,330 @@
+from src.dot_parser import DotGraph, format_statement, write_dot_text, strip_quotes
+from src.transition_label import TransitionLabel, parse_transition_label
+from src.frequency_index import FrequencyIndex
+import numpy as np
+
+NO_SYMBOL = -1 # Symbol id of transitions without a label, e.g. the initial transition `I -> 0`
+INITIAL_STATE = '0' # Name of the state in which every trace of a FlexFringe model starts
+
+
+class DynamicModelEdge:
+    """
+    View on a single transition of a DynamicModel. Views are only created on request (e.g. by
+    `get_edges`) and offer the part of the pydot Edge API that is used by CATMA, the data itself
+    stays in the arrays of the model.
+    """
+    __slots__ = ('model', 'index')
+
+    def __init__(self, model, index: int):
+        self.model = model
+        self.index = index
+
+    @property
+    def symbol(self):
+        symbol = int(self.model.symbols[self.index])
+        return None if symbol == NO_SYMBOL else symbol
+
+    @property
+    def frequency(self) -> int:
+        return int(self.model.frequencies[self.index])
+
+    def get_source(self) -> str:
+        return self.model.state_names[self.model.sources[self.index]]
+
+    def get_destination(self) -> str:
+        return self.model.state_names[self.model.destinations[self.index]]
+
+    def get_label(self):
+        return self.model.get_edge_label(self.index)
+
+    def get_attributes(self) -> dict:
+        return self.model.get_edge_attributes(self.index)
+
+    def set_href(self, href: str):
+        self.model.hrefs[self.index] = href
+
+
+class DynamicModelNode:
+    """
+    View on a single state of a DynamicModel, offering the part of the pydot Node API that is used by CATMA.
+    """
+    __slots__ = ('model', 'state')
+
+    def __init__(self, model, state: int):
+        self.model = model
+        self.state = state
+
+    def get_name(self) -> str:
+        return self.model.state_names[self.state]
+
+    def get_label(self):
+        return self.model.get_node_attributes(self.state).get('label')
+
+    def get_attributes(self) -> dict:
+        return self.model.get_node_attributes(self.state)
+
+    def set_label(self, label: str):
+        self.model.node_labels[self.state] = label
+
+    def set_fillcolor(self, color: str):
+        self.model.node_fillcolors[self.state] = color
+
+
+class DynamicModel:
+    """
+    Compact, array-backed representation of a dynamic model learned by FlexFringe. States are
+    stored as integers and the transitions in CSR form: the outgoing transitions of state `s` are
+    the indices `offsets[s]` up to `offsets[s + 1]` of the `destinations`, `symbols` and
+    `frequencies` arrays. The labels of the transitions are interned in the `alphabet` and each
+    symbol is parsed once into a TransitionLabel record (`labels`) when the model is built.
+    The statistics FlexFringe writes in the state labels are not kept, as they are replaced by
+    `clean` before a model is visualized.
+    """
+
+    def __init__(self, state_names: list, declared_states: np.ndarray, sources: np.ndarray, destinations: np.ndarray,
+                 symbols: np.ndarray, frequencies: np.ndarray, alphabet: list, state_widths: np.ndarray = None,
+                 state_penwidths: np.ndarray = None, box_states: set = None):
+        self.state_names = state_names
+        self.state_ids = {name: state for state, name in enumerate(state_names)}
+        self.declared_states = declared_states
+
+        # Sort the transitions by source state to build the CSR arrays
+        order = np.argsort(sources, kind='stable')
+        self.sources = sources[order]
+        self.destinations = destinations[order]
+        self.symbols = symbols[order]
+        self.frequencies = frequencies[order]
+        self.offsets = np.zeros(len(state_names) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.sources, minlength=len(state_names)), out=self.offsets[1:])
+
+        self.alphabet = alphabet
+        self.symbol_ids = {symbol_name: symbol for symbol, symbol_name in enumerate(alphabet)}
+        # the frequency of a label is the summed frequency of all transitions with this symbol
+        labelled = self.symbols != NO_SYMBOL
+        symbol_frequencies = np.bincount(self.symbols[labelled], weights=self.frequencies[labelled], minlength=len(alphabet))
+        self.labels = [parse_transition_label(symbol_name, int(symbol_frequencies[symbol])) for symbol, symbol_name in enumerate(alphabet)]
+        self.frequency_index = FrequencyIndex(self.labels, symbol_frequencies, np.flatnonzero(np.bincount(self.symbols[labelled], minlength=len(alphabet))))
+
+        num_states = len(state_names)
+        self.state_widths = state_widths if state_widths is not None else np.full(num_states, np.nan, dtype=np.float32)
+        self.state_penwidths = state_penwidths if state_penwidths is not None else np.full(num_states, np.nan, dtype=np.float32)
+        self.box_states = box_states if box_states is not None else set()
+        self.link_index = None
+        self.cleaned = False
+        self.node_labels = {}
+        self.node_fillcolors = {}
+        self.hrefs = {}
+
+    @classmethod
+    def from_graph(cls, graph: DotGraph):
+        """
+        Build a DynamicModel from a graph loaded by the FlexFringe DOT (or JSON) parser.
+
+        :param graph: The graph loaded by the parser.
+        """
+        state_ids = {}
+        state_names = []
+
+        def get_state(name: str) -> int:
+            state = state_ids.get(name)
+            if state is None:
+                state = len(state_names)
+                state_ids[name] = state
+                state_names.append(name)
+            return state
+
+        declared = []
+        widths = {}
+        penwidths = {}
+        box_states = set()
+        for node in graph.get_nodes():
+            state = get_state(node.get_name())
+            declared.append(state)
+            attributes = node.get_attributes()
+            if 'width' in attributes:
+                widths[state] = float(strip_quotes(attributes['width']))
+            if 'penwidth' in attributes:
+                penwidths[state] = float(strip_quotes(attributes['penwidth']))
+            if strip_quotes(attributes.get('shape', '')) == 'box':
+                box_states.add(state)
+
+        edges = graph.get_edges()
+        sources = np.fromiter((get_state(e.source) for e in edges), dtype=np.int32, count=len(edges))
+        destinations = np.fromiter((get_state(e.destination) for e in edges), dtype=np.int32, count=len(edges))
+        symbols = np.fromiter((NO_SYMBOL if e.symbol is None else e.symbol for e in edges), dtype=np.int32, count=len(edges))
+        frequencies = np.fromiter((e.frequency for e in edges), dtype=np.int64, count=len(edges))
+
+        num_states = len(state_names)
+        declared_states = np.zeros(num_states, dtype=bool)
+        declared_states[declared] = True
+        state_widths = np.full(num_states, np.nan, dtype=np.float32)
+        state_widths[list(widths.keys())] = list(widths.values())
+        state_penwidths = np.full(num_states, np.nan, dtype=np.float32)
+        state_penwidths[list(penwidths.keys())] = list(penwidths.values())
+        return cls(state_names, declared_states, sources, destinations, symbols, frequencies, list(graph.alphabet),
+                   state_widths, state_penwidths, box_states)
+
+    @property
+    def num_states(self) -> int:
+        return len(self.state_names)
+
+    @property
+    def num_edges(self) -> int:
+        return len(self.destinations)
+
+    def get_state(self, name: str):
+        """
+        Get the id of a state, or None if the model has no state with the given name.
+
+        :param name: The name of the state, e.g. `0`.
+        """
+        return self.state_ids.get(name)
+
+    def get_initial_state(self):
+        return self.state_ids.get(INITIAL_STATE)
+
+    def get_out_edges(self, state: int) -> range:
+        """
+        Get the indices of the outgoing transitions of a state.
+
+        :param state: The id of the state.
+        """
+        return range(self.offsets[state], self.offsets[state + 1])
+
+    def get_transition_label(self, symbol: int) -> TransitionLabel:
+        return self.labels[symbol]
+
+    def get_symbol_link(self, symbol: int) -> str:
+        return self.labels[symbol].link
+
+    def get_symbols_of_link(self, link: str) -> list:
+        """
+        Get the ids of all symbols that belong to a link.
+
+        :param link: The link in the format `src__dst`.
+        """
+        return [symbol for symbol, label in enumerate(self.labels) if label.link == link]
+
+    def build_link_index(self):
+        """
+        Build the index of the transitions per link and per (state, link) pair. The transitions are sorted
+        by their key, so the transitions of a key are found with a binary search. The index is built on the
+        first query and kept with the model.
+        """
+        link_ids = {}
+        symbol_links = np.array([link_ids.setdefault(label.link, len(link_ids)) for label in self.labels] + [-1], dtype=np.int64)
+        edge_links = symbol_links[self.symbols] # the symbol id -1 of transitions without a link selects the last entry
+        labelled_edges = np.flatnonzero(edge_links >= 0)
+        link_order = labelled_edges[np.argsort(edge_links[labelled_edges], kind='stable')]
+        state_link_keys = self.sources[labelled_edges].astype(np.int64) * max(len(link_ids), 1) + edge_links[labelled_edges]
+        state_link_order = labelled_edges[np.argsort(state_link_keys, kind='stable')]
+        self.link_index = {
+            'link_ids': link_ids,
+            'link_order': link_order,
+            'link_keys': edge_links[link_order],
+            'state_link_order': state_link_order,
+            'state_link_keys': self.sources[state_link_order].astype(np.int64) * max(len(link_ids), 1) + edge_links[state_link_order]
+        }
+
+    def get_edges_of_link(self, link: str, state: int = None) -> np.ndarray:
+        """
+        Get the indices of the transitions that belong to a link, optionally only the outgoing transitions of a state.
+
+        :param link: The link in the format `src__dst`.
+        :param state: The id of the source state, if None the transitions of all states are returned.
+        """
+        if self.link_index is None:
+            self.build_link_index()
+        link_id = self.link_index['link_ids'].get(link)
+        if link_id is None:
+            return np.zeros(0, dtype=np.int64)
+        if state is None:
+            order, keys, key = self.link_index['link_order'], self.link_index['link_keys'], link_id
+        else:
+            order, keys, key = self.link_index['state_link_order'], self.link_index['state_link_keys'], int(state) * max(len(self.link_index['link_ids']), 1) + link_id
+        return order[np.searchsorted(keys, key, side='left'):np.searchsorted(keys, key, side='right')]
+
+    def get_present_symbols(self) -> np.ndarray:
+        """
+        Get the ids of the symbols that occur on at least one transition of the model.
+        """
+        return np.unique(self.symbols[self.symbols != NO_SYMBOL])
+
+    def get_edges(self) -> list:
+        return [DynamicModelEdge(self, index) for index in range(self.num_edges)]
+
+    def get_nodes(self) -> list:
+        return [DynamicModelNode(self, state) for state in np.flatnonzero(self.declared_states)]
+
+    def clean(self):
+        """
+        Replace the labels of the states by `State <name>` and remove the coloring of the states.
+        """
+        self.cleaned = True
+        return self
+
+    def get_edge_label(self, index: int):
+        symbol = self.symbols[index]
+        if symbol == NO_SYMBOL:
+            return None
+        return '"' + self.alphabet[symbol] + '\n' + str(self.frequencies[index]) + ' "'
+
+    def get_edge_attributes(self, index: int) -> dict:
+        attributes = {}
+        label = self.get_edge_label(index)
+        if label is not None:
+            attributes['label'] = label
+            penwidth = self.state_penwidths[self.sources[index]]
+            if not np.isnan(penwidth):
+                attributes['penwidth'] = str(penwidth)
+        if index in self.hrefs:
+            attributes['href'] = self.hrefs[index]
+        return attributes
+
+    def get_node_attributes(self, state: int) -> dict:
+        name = self.state_names[state]
+        attributes = {}
+        if self.cleaned:
+            attributes['label'] = 'State ' + name.split('_')[-1] + '\n'
+            attributes['style'] = 'filled'
+            attributes['fillcolor'] = 'white'
+        else:
+            attributes['label'] = name
+        if state in self.node_labels:
+            attributes['label'] = self.node_labels[state]
+        if state in self.node_fillcolors:
+            attributes['style'] = 'filled'
+            attributes['fillcolor'] = self.node_fillcolors[state]
+        if state in self.box_states:
+            attributes['shape'] = 'box'
+        width = self.state_widths[state]
+        if not np.isnan(width):
+            attributes['width'] = str(width)
+            attributes['height'] = str(width)
+        penwidth = self.state_penwidths[state]
+        if not np.isnan(penwidth):
+            attributes['penwidth'] = str(penwidth)
+        return attributes
+
+    def to_string(self) -> str:
+        """
+        Convert the model into the DOT format, e.g. to render it with Graphviz.
+        """
+        lines = ['digraph DFA {']
+        for state in np.flatnonzero(self.declared_states):
+            lines.append(format_statement(self.state_names[state], self.get_node_attributes(state)))
+        for index in range(self.num_edges):
+            edge = self.state_names[self.sources[index]] + ' -> ' + self.state_names[self.destinations[index]]
+            lines.append(format_statement(edge, self.get_edge_attributes(index)))
+        lines.append('}\n')
+        return '\n'.join(lines)
+
+    def write(self, path: str, format: str = 'raw', prog: str = 'dot'):
+        """
+        Write the model to a file. For any format other than `raw` the model is rendered by Graphviz.
+
+        :param path: The path of the file the model is written to.
+        :param format: The output format, e.g. `raw` for the DOT text or `svg`.
+        :param prog: The Graphviz program that is used for the rendering.
+        """
+        write_dot_text(self.to_string(), path, format, prog)
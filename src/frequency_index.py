@@ -0,0 +1,79 @@
+import heapq
+import numpy as np
+
+
+class FrequencyIndex:
+    """
+    Aggregated frequencies of the transitions of a dynamic model. The frequencies are summed once when the
+    model is loaded, per call (symbol), per link and per (link, status code) pair, so the frequencies can be
+    queried without going over the transitions of the model again.
+    """
+
+    def __init__(self, labels: list, symbol_frequencies: np.ndarray, present_symbols: np.ndarray):
+        """
+        :param labels: The TransitionLabel of every symbol of the model.
+        :param symbol_frequencies: The summed frequency of the transitions of every symbol.
+        :param present_symbols: The ids of the symbols that occur on at least one transition, in ascending order.
+        """
+        self.labels = labels
+        self.present_symbols = present_symbols
+        self.call_frequencies = {}
+        self.link_frequencies = {}
+        self.link_status_frequencies = {}
+        for symbol in present_symbols:
+            label = labels[symbol]
+            frequency = int(symbol_frequencies[symbol])
+            self.call_frequencies[label.text] = frequency
+            self.link_frequencies[label.link] = self.link_frequencies.get(label.link, 0) + frequency
+            key = (label.link, label.status)
+            self.link_status_frequencies[key] = self.link_status_frequencies.get(key, 0) + frequency
+
+    def get_call_frequency(self, call: str) -> int:
+        """
+        Get the frequency of a call, or 0 if the call does not occur in the model.
+
+        :param call: The symbol of the call, e.g. `8080__catalog__user__catalog`.
+        """
+        return self.call_frequencies.get(call, 0)
+
+    def get_link_frequency(self, link: str) -> int:
+        """
+        Get the summed frequency of all calls of a link, or 0 if the link does not occur in the model.
+
+        :param link: The link in the format `src__dst`.
+        """
+        return self.link_frequencies.get(link, 0)
+
+    def get_link_status_frequency(self, link: str, status) -> int:
+        """
+        Get the summed frequency of the calls of a link with the given status code.
+
+        :param link: The link in the format `src__dst`.
+        :param status: The status code, None for models that do not store the status code.
+        """
+        return self.link_status_frequencies.get((link, status), 0)
+
+    def get_status_frequencies(self, link: str) -> dict:
+        """
+        Get the frequency per status code of the calls of a link.
+
+        :param link: The link in the format `src__dst`.
+        """
+        return {status: frequency for (status_link, status), frequency in self.link_status_frequencies.items() if status_link == link}
+
+    def get_top_calls(self, n: int) -> list:
+        """
+        Get the N most frequent calls as (symbol, frequency) tuples. A heap is used, so only N calls are
+        kept sorted; calls with the same frequency keep the order of their symbol ids.
+
+        :param n: The number of calls that is returned.
+        """
+        return heapq.nlargest(n, self.call_frequencies.items(), key=lambda x: x[1])
+
+    def get_top_links(self, n: int) -> list:
+        """
+        Get the N most frequent links as (link, frequency) tuples.
+
+        :param n: The number of links that is returned.
+        """
+        return heapq.nlargest(n, self.link_frequencies.items(), key=lambda x: x[1])
@@ -0,0 +1,307 @@
+import hashlib
+import json
+import os
+import pickle
+
+from src.model_cache import compute_file_hash
+from src.utils import select_dynamic_model_file
+from src.interpretation_generator import get_link_model_path, get_service_model_path
+from src.interpretation_visualizer import get_interpretation_file_name
+
+STATE_VERSION = 3 # Version of the stored analysis state, states of other versions are ignored
+STATE_FILE_NAME = 'analysis_state.pickle' # File in the output folder that stores the results of the previous run
+DELTA_REPORT_FILE_NAME = 'delta_report.json' # File in the output folder that stores the delta between two model snapshots
+RENDERED_MODEL_KEYS = ('link_dyn_model', 'src_dyn_model', 'dst_dyn_model') # Keys of an interpretation that refer to rendered SVG files
+MODEL_FILE_EXTENSIONS = ('.dot', '.json') # Extensions of the dynamic model files, other files in a model folder (e.g. `.DS_Store`) are ignored
+
+
+def compute_model_hash(model_path: str, model_cache = None):
+    """
+    Compute the content hash of a model file, or None if the file does not exist. If a model cache is
+    given, the hash is taken from its index when the file did not change.
+
+    :param model_path: The path to the model file.
+    :param model_cache: The (optional) cache of parsed dynamic models.
+    """
+    if not os.path.exists(model_path):
+        return None
+    if model_cache is not None:
+        return model_cache.get_content_hash(model_path)
+    return compute_file_hash(model_path)
+
+
+def compute_model_folder_hashes(dynamic_models_folder: str, model_cache = None) -> dict:
+    """
+    Compute the content hash of every dynamic model file (DOT or JSON) in a folder of dynamic models.
+
+    :param dynamic_models_folder: The path to the folder containing the dynamic models.
+    :param model_cache: The (optional) cache of parsed dynamic models.
+    """
+    model_hashes = {}
+    for file_name in sorted(os.listdir(dynamic_models_folder)):
+        model_path = os.path.join(dynamic_models_folder, file_name)
+        if file_name.endswith(MODEL_FILE_EXTENSIONS) and os.path.isfile(model_path):
+            model_hashes[file_name] = compute_model_hash(model_path, model_cache)
+    return model_hashes
+
+
+def diff_model_folders(previous_hashes: dict, current_hashes: dict) -> dict:
+    """
+    Compare the content hashes of two folders of dynamic models, the files are matched by their name.
+
+    :param previous_hashes: The content hash per file of the previous folder.
+    :param current_hashes: The content hash per file of the current folder.
+    """
+    return {
+        'added': sorted(current_hashes.keys() - previous_hashes.keys()),
+        'removed': sorted(previous_hashes.keys() - current_hashes.keys()),
+        'changed': sorted(name for name in current_hashes.keys() & previous_hashes.keys() if current_hashes[name] != previous_hashes[name]),
+        'unchanged': sorted(name for name in current_hashes.keys() & previous_hashes.keys() if current_hashes[name] == previous_hashes[name])
+    }
+
+
+def diff_link_sets(previous_links: set, current_links: set) -> dict:
+    """
+    Compare the links that occurred in two dynamic models.
+
+    :param previous_links: The links that occurred in the previous model.
+    :param current_links: The links that occurred in the current model.
+    """
+    return {'added': sorted(current_links - previous_links), 'removed': sorted(previous_links - current_links)}
+
+
+def compute_non_conformance_delta(previous_non_conformances: set, current_non_conformances: set) -> dict:
+    """
+    Compare the non-conformances (of a single type) of two runs.
+
+    :param previous_non_conformances: The non-conformances of the previous run.
+    :param current_non_conformances: The non-conformances of the current run.
+    """
+    return {
+        'resolved': sorted(previous_non_conformances - current_non_conformances),
+        'new': sorted(current_non_conformances - previous_non_conformances),
+        'unchanged': sorted(previous_non_conformances & current_non_conformances)
+    }
+
+
+def compute_delta_text(delta: dict) -> str:
+    """
+    Compute the text that is printed to the console after the non-conformances of two runs are compared.
+
+    :param delta: The delta per type of non-conformance, see `compute_non_conformance_delta`.
+    """
+    parts = []
+    for non_conformance_type in ('static', 'dynamic'):
+        counts = {key: len(value) for key, value in delta[non_conformance_type].items()}
+        parts.append(non_conformance_type + ': ' + str(counts['resolved']) + ' resolved, ' + str(counts['new']) + ' new, ' + str(counts['unchanged']) + ' unchanged')
+
+    return 'Non-conformances compared to the previous models (' + '; '.join(parts) + ')'
+
+
+def remove_resolved_interpretations(output_folder: str, delta: dict, static_model) -> list:
+    """
+    Remove the HTML documents of the interpretations of the non-conformances that were resolved, so the
+    interpretations folder of a rerun into the same output folder only holds the current non-conformances.
+    The rendered models are kept, as they may be shared with the current non-conformances. The paths to the
+    removed documents are returned.
+
+    :param output_folder: The path to the output folder.
+    :param delta: The delta per type of non-conformance, see `compute_non_conformance_delta`.
+    :param static_model: The StaticModel, its service registry gives the display names of the services.
+    """
+    service_registry = static_model.service_registry
+    removed_paths = []
+    for non_conformance_type in ('static', 'dynamic'):
+        for non_conformance in delta[non_conformance_type]['resolved']:
+            services = [service_registry.get_display_name(service_registry.add_service(service)) for service in non_conformance.split('-')]
+            interpretation_path = output_folder + 'interpretations/' + get_interpretation_file_name(non_conformance_type, services)
+            if os.path.exists(interpretation_path):
+                os.remove(interpretation_path)
+                removed_paths.append(interpretation_path)
+    return removed_paths
+
+
+def write_delta_report(output_folder: str, delta: dict, model_diff: dict, link_diff: dict) -> str:
+    """
+    Write the delta report that shows which non-conformances were resolved, which are new and which did not
+    change, together with the dynamic models and links that changed. The path to the report is returned.
+
+    :param output_folder: The path to the output folder.
+    :param delta: The delta per type of non-conformance, see `compute_non_conformance_delta`.
+    :param model_diff: The difference between the folders of dynamic models, see `diff_model_folders`.
+    :param link_diff: The difference between the links of the general dynamic models, see `diff_link_sets`.
+    """
+    report_path = output_folder + DELTA_REPORT_FILE_NAME
+    report = {'non_conformances': delta, 'dynamic_models': model_diff, 'links': link_diff}
+    with open(report_path, 'w') as f:
+        json.dump(report, f, indent=4)
+    return report_path
+
+
+def collect_input_paths_for_interpretation(non_conformance_type: str, services: list, dynamic_models_folder: str, general_model_path: str, model_format: str = None) -> list:
+    """
+    Collect the paths to the dynamic model files that are read to generate the interpretation of a non-conformance.
+
+    :param non_conformance_type: The type of the non-conformance, either `static` or `dynamic`.
+    :param services: The list of two services that are involved in the non-conformance.
+    :param dynamic_models_folder: The path to the folder containing the dynamic models.
+    :param general_model_path: The path to the general dynamic model.
+    :param model_format: The format of the models that are read, either `dot` or `json`.
+    """
+    if non_conformance_type == 'static':
+        model_paths = [get_link_model_path(dynamic_models_folder, services)]
+    else:
+        model_paths = [get_service_model_path(dynamic_models_folder, service) for service in services] + [general_model_path]
+    return [select_dynamic_model_file(model_path, model_format) for model_path in model_paths]
+
+
+def compute_interpretation_fingerprint(input_paths: list, settings: dict, model_cache = None, model_hashes: dict = None) -> str:
+    """
+    Compute the fingerprint of the inputs of an interpretation: the content of the dynamic models it reads
+    and the settings it depends on (e.g. the content of the static model). An interpretation of a previous
+    run can be reused when its fingerprint did not change.
+
+    :param input_paths: The paths to the dynamic model files that are read, see `collect_input_paths_for_interpretation`.
+    :param settings: The settings the interpretation depends on, these must be serializable to JSON.
+    :param model_cache: The (optional) cache of parsed dynamic models.
+    :param model_hashes: The (optional) content hashes per path that are already known, new hashes are added to it.
+    """
+    if model_hashes is None:
+        model_hashes = {}
+    for path in input_paths:
+        if path not in model_hashes:
+            model_hashes[path] = compute_model_hash(path, model_cache)
+    inputs = [(os.path.basename(path), model_hashes[path]) for path in input_paths]
+    return hashlib.sha256(json.dumps({'inputs': inputs, 'settings': settings}, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+class AnalysisStateWriter:
+    """
+    Writes the results of a run to the output folder while the run is going, so the interpretations do not have
+    to be kept in memory until the end of the run. The state is a stream of pickles: a header with the detected
+    non-conformances, followed by one entry per interpretation. Every entry stores the length of the pickled
+    interpretation, so the state can be indexed without loading the interpretations, see `load_analysis_state`.
+    The state is written to a temporary file that replaces the state of the previous run when the writer is closed.
+    """
+
+    def __init__(self, output_folder: str, static_non_conformances: set, dynamic_non_conformances: set):
+        """
+        :param output_folder: The path to the output folder.
+        :param static_non_conformances: The detected non-conformances of type static.
+        :param dynamic_non_conformances: The detected non-conformances of type dynamic.
+        """
+        self.state_path = output_folder + STATE_FILE_NAME
+        self.temporary_path = self.state_path + '.' + str(os.getpid()) + '.tmp'
+        self.file = open(self.temporary_path, 'wb')
+        header = {'version': STATE_VERSION, 'static_non_conformances': set(static_non_conformances), 'dynamic_non_conformances': set(dynamic_non_conformances)}
+        pickle.dump(header, self.file, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else: # the state of the previous run is kept
+            self.file.close()
+            os.remove(self.temporary_path)
+        return False
+
+    def add(self, non_conformance_type: str, non_conformance: str, fingerprint: str, interpretation: dict):
+        """
+        Store the interpretation of a non-conformance.
+
+        :param non_conformance_type: The type of the non-conformance, either `static` or `dynamic`.
+        :param non_conformance: The non-conformance in the format `src-dst`.
+        :param fingerprint: The fingerprint of the inputs of the interpretation.
+        :param interpretation: The interpretation.
+        """
+        data = pickle.dumps(interpretation, protocol=pickle.HIGHEST_PROTOCOL)
+        pickle.dump(((non_conformance_type, non_conformance), fingerprint, len(data)), self.file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.file.write(data)
+
+    def close(self):
+        self.file.close()
+        os.replace(self.temporary_path, self.state_path)
+
+
+def load_analysis_state(output_folder: str):
+    """
+    Load the results of the previous run from the output folder, or None if there are no (usable) results.
+    Only the fingerprints and the positions of the interpretations are loaded, an interpretation is read
+    from the file when it is reused, see `find_reusable_interpretation`.
+
+    :param output_folder: The path to the output folder.
+    """
+    state_path = output_folder + STATE_FILE_NAME
+    if not os.path.exists(state_path):
+        return None
+    try:
+        # the file stays open, so the state can be read after the next state replaced it
+        f = open(state_path, 'rb')
+    except OSError:
+        return None
+    try:
+        header = pickle.load(f)
+        if not isinstance(header, dict) or header.get('version') != STATE_VERSION:
+            f.close()
+            return None
+        interpretations = {}
+        while f.peek(1):
+            key, fingerprint, length = pickle.load(f)
+            interpretations[key] = (fingerprint, f.tell(), length)
+            f.seek(length, os.SEEK_CUR)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError, TypeError):
+        f.close()
+        return None
+    return dict(header, interpretations=interpretations, file=f)
+
+
+def read_state_interpretation(state: dict, position: int, length: int) -> dict:
+    """
+    Read an interpretation from the file of the analysis state.
+
+    :param state: The results of the previous run, see `load_analysis_state`.
+    :param position: The position of the pickled interpretation in the file.
+    :param length: The length of the pickled interpretation.
+    """
+    state['file'].seek(position)
+    return pickle.loads(state['file'].read(length))
+
+
+def save_analysis_state(output_folder: str, static_non_conformances: set, dynamic_non_conformances: set, interpretations: dict):
+    """
+    Store the results of the run in the output folder, so the next (incremental) run can reuse them.
+
+    :param output_folder: The path to the output folder.
+    :param static_non_conformances: The detected non-conformances of type static.
+    :param dynamic_non_conformances: The detected non-conformances of type dynamic.
+    :param interpretations: The fingerprint and interpretation per non-conformance, keyed by (type, non-conformance).
+    """
+    with AnalysisStateWriter(output_folder, static_non_conformances, dynamic_non_conformances) as state_writer:
+        for (non_conformance_type, non_conformance), entry in interpretations.items():
+            state_writer.add(non_conformance_type, non_conformance, entry['fingerprint'], entry['interpretation'])
+
+
+def find_reusable_interpretation(state, non_conformance_type: str, non_conformance: str, fingerprint: str):
+    """
+    Find the interpretation of a non-conformance in the results of the previous run. The interpretation is only
+    reused if its inputs did not change and the SVG files of the models it refers to still exist.
+
+    :param state: The results of the previous run, see `load_analysis_state`.
+    :param non_conformance_type: The type of the non-conformance, either `static` or `dynamic`.
+    :param non_conformance: The non-conformance in the format `src-dst`.
+    :param fingerprint: The fingerprint of the current inputs of the interpretation.
+    """
+    if state is None:
+        return None
+    previous = state['interpretations'].get((non_conformance_type, non_conformance))
+    if previous is None or previous[0] != fingerprint:
+        return None
+    try:
+        interpretation = read_state_interpretation(state, previous[1], previous[2])
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError):
+        return None
+    if not all(os.path.exists(interpretation[key]) for key in RENDERED_MODEL_KEYS if key in interpretation):
+        return None
+    return interpretation
@@ -1,12 +1,17 @@
-from src.utils import collect_dynamic_model, extract_state_to_edges_mapping_from_dynamic_model, clean_dynamic_model, extract_link_from_transition_label
-import os
-import random
+from src.utils import clean_dynamic_model
+from src.model_registry import ModelRegistry
+from src.sequence_matcher import SequenceMatcher
+from src.random_walk import get_random_walk_settings, create_random_generator, do_batched_random_walks, do_adaptive_random_walks, compute_walk_budget
+import numpy as np
 
 FF_LINK_MODEL_SUFFIX = '_link_data.csv.ff.final.dot' # Specific suffix for dynamic models learned for the links (communication behavior between services)
 FF_SERVICE_MODEL_SUFFIX = '_service_data.csv.ff.final.dot' # Specific suffix for dynamic models learned for the services ( communication behavior of a service)
+MIN_PREVIOUS_SEQUENCE_LENGTH = 2 # Minimal number of services in a previous sequence of a link, unless a service without callers is reached
+MAX_PREVIOUS_SEQUENCE_LENGTH = 5 # Maximal number of services in a previous sequence of a link
+MAX_PREVIOUS_SEQUENCES = 1000 # Maximal number of previous sequences that is enumerated for a link
 
 
-def generate_interpretation(non_conformance_type: str, services: list, dynamic_models_folder: str, output_folder: str, static_model: dict, dynamic_model) -> dict:
+def generate_interpretation(non_conformance_type: str, services: list, dynamic_models_folder: str, output_folder: str, static_model, dynamic_model, model_registry = None, sequence_analysis: str = 'analytic', random_walk_settings: dict = None, stream: int = 0) -> dict:
     """
     This function is used to generate the interpretation of the non-conformance between the static
     and dynamic models. We have two definitions for non-conformances that we detect: static and dynamic.
@@ -16,22 +21,30 @@ def generate_interpretation(non_conformance_type: str, services: list, dynamic_m
     :param non_conformance_type: The type of difference between the static and dynamic models
     :param services: The list of two services that are involved in the non-conformance. Order follows the direction of the link
     :param dynamic_models_folder: The path to the folder containing the dynamic models
-    :param static_model: The dictionary containing the evidences extracted from the static model
+    :param static_model: The StaticModel containing the evidences extracted from the static model
     :param dynamic_model: The model that is learned from all HTTP event logs.
+    :param model_registry: The (optional) run-scoped registry that holds the loaded and rendered dynamic models.
+    :param sequence_analysis: How the occurred sequences are found in the dynamic model, either `analytic` (exact probabilities) or `random_walk`.
+    :param random_walk_settings: The number, length and seed of the walks over the dynamic model, see `get_random_walk_settings`.
+    :param stream: The index of the random stream of this interpretation, so the walks do not depend on the order in which interpretations are generated.
     """
+    if random_walk_settings is None:
+        random_walk_settings = get_random_walk_settings({})
     interpretation = {}
     interpretation['non_conformance_type'] = non_conformance_type
-    processed_services = [x.replace('_', '-') for x in services] # change it back to original name
+    service_registry = static_model.service_registry
+    service_ids = [service_registry.add_service(x) for x in services]
+    processed_services = [service_registry.get_display_name(x) for x in service_ids] # change it back to original name
     interpretation['services'] = processed_services
-    link_code_evidences = collect_link_code(services[0] + '-' + services[1], static_model['links'])
+    link_code_evidences = list(static_model.get_link_evidences_by_id(service_registry.get_link_id(service_ids[0], service_ids[1])))
     interpretation['link_code_evidences'] = link_code_evidences
 
     # For if we find non-conformance in the static model; link occurring in the dynamic model
     # but not in the static model
     if non_conformance_type == 'static':
-        link_dyn_model_path = dynamic_models_folder + processed_services[0] + '_' + processed_services[1] + FF_LINK_MODEL_SUFFIX
+        link_dyn_model_path = get_link_model_path(dynamic_models_folder, services)
         out_file_name = services[0] + '_' + services[1] + '_link_model'
-        collect_and_process_model_for_static_non_conformance(link_dyn_model_path, interpretation, output_folder, out_file_name, static_model)
+        collect_and_process_model_for_static_non_conformance(link_dyn_model_path, interpretation, output_folder, out_file_name, static_model, model_registry)
 
 
     # For if we find non-conformance in the dynamic model; link occurring in the static model
@@ -39,37 +52,53 @@ def generate_interpretation(non_conformance_type: str, services: list, dynamic_m
     if non_conformance_type == 'dynamic':
         # Check if there is dynamic model for source service
         src_service_dynamic_model = collect_and_process_model_for_dynamic_non_conformance(
-            dynamic_models_folder + processed_services[0] + FF_SERVICE_MODEL_SUFFIX, 
+            get_service_model_path(dynamic_models_folder, services[0]), 
             interpretation, 
             output_folder, 
             processed_services[0] + '_service_model', 
             static_model,
-            'src'
+            'src',
+            model_registry
         )
         
         # Check if dynamic model exist for destination service
         dst_service_dynamic_model = collect_and_process_model_for_dynamic_non_conformance(
-            dynamic_models_folder + processed_services[1] + FF_SERVICE_MODEL_SUFFIX, 
+            get_service_model_path(dynamic_models_folder, services[1]), 
             interpretation, 
             output_folder, 
             processed_services[1] + '_service_model', 
             static_model,
-            'dst'
+            'dst',
+            model_registry
         )
 
         if src_service_dynamic_model is not None and dst_service_dynamic_model is not None:
-            static_call_sequences = find_previous_sequences_for_link_static_model(static_model['links'], services[1], services[0], 1000)
-            dynamic_paths = do_random_walk_dynamic_model(dynamic_model, services[0], services[1], 1000, 20)
-            occurred_call_sequences = find_occurred_sequences_in_paths(static_call_sequences, dynamic_paths)
-            code_call_sequences = collect_code_call_sequences_from_sequences(static_call_sequences, static_model['links'])
+            static_call_sequences = find_previous_sequences_for_link_static_model(static_model, services[1], services[0])
+            if sequence_analysis == 'random_walk':
+                random_generator = create_random_generator(random_walk_settings['seed'], stream)
+                if random_walk_settings['adaptive']:
+                    dynamic_paths, interpretation['random_walk_coverage'] = do_adaptive_random_walk_dynamic_model(dynamic_model, processed_services[0], processed_services[1], random_walk_settings, random_generator)
+                else:
+                    dynamic_paths = do_random_walk_dynamic_model(dynamic_model, processed_services[0], processed_services[1], random_walk_settings['number_of_walks'], random_walk_settings['walk_length'], random_generator, random_walk_settings['frequency_weighted'])
+                occurred_call_sequences = find_occurred_sequences_in_paths(static_call_sequences, dynamic_paths)
+                interpretation['call_sequence_statistics'] = compute_sequence_statistics_from_paths(static_call_sequences, dynamic_paths)
+            else:
+                sequence_statistics = compute_sequence_statistics(dynamic_model, static_call_sequences, processed_services[0] + '__' + processed_services[1], random_walk_settings['walk_length'])
+                occurred_call_sequences = find_occurred_sequences_in_statistics(static_call_sequences, sequence_statistics)
+                interpretation['call_sequence_statistics'] = sequence_statistics
+            code_call_sequences = collect_code_call_sequences_from_sequences(static_call_sequences, static_model)
             interpretation['potential_call_sequences'] = static_call_sequences
             interpretation['occurred_call_sequences'] = occurred_call_sequences
             interpretation['code_call_sequences'] = code_call_sequences
             sequences_call_details = dict()
+            sequences_call_details_frequencies = dict()
             for call_sequence in occurred_call_sequences:
-                sequences_call_details[str(call_sequence)] = find_sequence_of_call_details(call_sequence, dynamic_model)
+                call_details_frequencies = find_call_details_frequencies(call_sequence, dynamic_model)
+                sequences_call_details[str(call_sequence)] = [list(details) for details in call_details_frequencies]
+                sequences_call_details_frequencies[str(call_sequence)] = list(call_details_frequencies.values())
             
             interpretation['call_details_sequences'] = sequences_call_details
+            interpretation['call_details_frequencies'] = sequences_call_details_frequencies
         elif src_service_dynamic_model is None and dst_service_dynamic_model is not None:
             interpretation['missing_dynamic_model'] = [services[0]]
         elif src_service_dynamic_model is not None and dst_service_dynamic_model is None:
@@ -80,80 +109,87 @@ def generate_interpretation(non_conformance_type: str, services: list, dynamic_m
     return interpretation
 
 
+def get_link_model_path(dynamic_models_folder: str, services: list) -> str:
+    """
+    Get the path to the dynamic model learned for the communication behavior between two services.
+
+    :param dynamic_models_folder: The path to the folder containing the dynamic models
+    :param services: The list of two services of the link. Order follows the direction of the link
+    """
+    return dynamic_models_folder + services[0].replace('_', '-') + '_' + services[1].replace('_', '-') + FF_LINK_MODEL_SUFFIX
+
+
+def get_service_model_path(dynamic_models_folder: str, service: str) -> str:
+    """
+    Get the path to the dynamic model learned for the communication behavior of a service.
+
+    :param dynamic_models_folder: The path to the folder containing the dynamic models
+    :param service: The name of the service
+    """
+    return dynamic_models_folder + service.replace('_', '-') + FF_SERVICE_MODEL_SUFFIX
+
+
+def collect_model_paths_for_non_conformances(static_non_conformances: set, dynamic_non_conformances: set, dynamic_models_folder: str) -> list:
+    """
+    Collect the paths to all dynamic models that are needed to generate the interpretations of the detected
+    non-conformances: the link model for each static non-conformance and the models of both services for each
+    dynamic non-conformance. Every path is only included once.
+
+    :param static_non_conformances: The detected non-conformances of type static
+    :param dynamic_non_conformances: The detected non-conformances of type dynamic
+    :param dynamic_models_folder: The path to the folder containing the dynamic models
+    """
+    model_paths = []
+    for sncf in static_non_conformances:
+        model_paths.append(get_link_model_path(dynamic_models_folder, sncf.split('-')))
+    for dncf in dynamic_non_conformances:
+        model_paths += [get_service_model_path(dynamic_models_folder, service) for service in dncf.split('-')]
+
+    return list(dict.fromkeys(model_paths))
+
+
 def compute_top_n_transitions_from_dynamic_model(dynamic_model, n: int) -> list:
     """
     Find the top N tranitions that occur within the dynamic model. The dynamic model stores the 
-    frequency of each transition within the model and we use this information to filter out the 
-    top N transitions.
+    frequency of each transition within the model, these are summed per call in the frequency index
+    of the model when it is loaded, so the top N calls are taken from this index.
 
-    :param model: The dynamic model that is loaded using the pydot library
+    :param model: The dynamic model that is loaded using the FlexFringe DOT parser
     :param n: The number of top transitions to be returned
     """
+    return dynamic_model.frequency_index.get_top_calls(n)
 
-    edges = dynamic_model.get_edges()
-    call_frequencies = {}
-    # Go through all edges to collect the call information and its corresponding frequency
-    for e in edges:
-        # get the edge label
-        label = e.get_label()
-        if label is None:
-            continue
-        
-        label = label.replace('"', '')
-        splitted = label.split('\n')
-        call_information = splitted[0]
-        frequency = int(splitted[1].strip())
-        if call_information in call_frequencies:
-            call_frequencies[call_information] += frequency
-        else:
-            call_frequencies[call_information] = frequency
-    
-    # Sort the call information based on the frequency and return the top N calls
-    top_n_calls = []
-    sorted_calls = sorted(call_frequencies.items(), key=lambda x: x[1], reverse=True)
-    for i in range(n):
-        if i >= len(sorted_calls):
-            break
-        top_n_calls.append((sorted_calls[i][0], sorted_calls[i][1]))
-
-    return top_n_calls
 
-
-def collect_link_code(link: str, link_evidences: dict) -> list:
+def collect_link_code(link: str, static_model) -> list:
     """
     Collect the code evidences for the given link. The evidences are collected from the static model.
 
     :param link: The link for which the code evidences are collected
-    :param link_evidences: The dictionary containing the evidences extracted from the static model
+    :param static_model: The StaticModel containing the evidences extracted from the static model
     """
-    code_for_link = []
-    for evidence in link_evidences:
-        if evidence == link:
-            code_for_link += link_evidences[evidence]
-    
-    return code_for_link
+    return list(static_model.get_link_evidences(link))
 
 
-def collect_code_call_sequences_from_sequences(sequences: list, link_evidences: dict) -> list:
+def collect_code_call_sequences_from_sequences(sequences: list, static_model) -> list:
     """
     Collect the code call sequences for the given sequences of links. We basically tranform a sequence of links
     to their corresponding sequence of code calls.
 
     :param occurred_sequences: The list of sequences of links that occurred in the dynamic model.
-    :param link_evidences: The dictionary containing the link evidences extracted from the static model
+    :param static_model: The StaticModel containing the evidences extracted from the static model
     """
+    service_registry = static_model.service_registry
     code_call_sequences = dict()
     for sequence in sequences:
         code_call_sequence = []
         for link in sequence:
-            processed_link = link.replace('__', '-')
-            code_call_sequence += collect_link_code(processed_link, link_evidences)
+            code_call_sequence += static_model.get_link_evidences_by_id(service_registry.find_link(link))
         code_call_sequences['-'.join(sequence)] = code_call_sequence
     
     return code_call_sequences
 
 
-def collect_and_process_model_for_static_non_conformance(link_dyn_model_path: str, interpretation:dict, output_folder:str, output_file_name:str, static_model:dict):
+def collect_and_process_model_for_static_non_conformance(link_dyn_model_path: str, interpretation:dict, output_folder:str, output_file_name:str, static_model, model_registry = None):
     """
     Collect and process the dynamic model for a static non-conformance. We compute the top 10 frequently
     occurring transitions from the dynamic model and then convert the model to SVG format.
@@ -162,16 +198,18 @@ def collect_and_process_model_for_static_non_conformance(link_dyn_model_path: st
     :param interpretation: The dictionary that stores the interpretation of the non-conformance.
     :param output_folder: The path to the output folder.
     :param output_file_name: The name of the file that should be used to store the dynamic model as SVG file.
-    :param static_model: The dictionary containing the evidences extracted from the static model.
+    :param static_model: The StaticModel containing the evidences extracted from the static model.
+    :param model_registry: The (optional) run-scoped registry that holds the loaded and rendered dynamic models.
     """
-    link_dynamic_model = collect_dynamic_model(link_dyn_model_path)
+    if model_registry is None:
+        model_registry = ModelRegistry()
+    link_dynamic_model = model_registry.get_model(link_dyn_model_path)
     top_transitions_from_link_dyn_model = compute_top_n_transitions_from_dynamic_model(link_dynamic_model, 10)
     interpretation['top_transitions_from_link_dyn_model'] = top_transitions_from_link_dyn_model
-    add_links_to_code(output_folder + 'code_linked_models/', output_file_name, link_dynamic_model, static_model)
-    interpretation['link_dyn_model'] = output_folder + 'code_linked_models/' + output_file_name + '.svg'
+    interpretation['link_dyn_model'] = render_model_with_links_to_code(output_folder + 'code_linked_models/', output_file_name, link_dynamic_model, static_model, model_registry)
 
 
-def collect_and_process_model_for_dynamic_non_conformance(serv_dyn_model_path: str, interpretation: dict, output_folder: str, output_file_name: str, static_model: dict, direction: str) -> list:
+def collect_and_process_model_for_dynamic_non_conformance(serv_dyn_model_path: str, interpretation: dict, output_folder: str, output_file_name: str, static_model, direction: str, model_registry = None) -> list:
     """
     Collect and process the dynamic model for a dynamic non-conformance. We add the links to the code on each
     transition that has occurred in the dynammic model and then convert the model to SVG format.
@@ -180,217 +218,398 @@ def collect_and_process_model_for_dynamic_non_conformance(serv_dyn_model_path: s
     :param interpretation: The dictionary that stores the interpretation of the non-conformance.
     :param output_folder: The path to the output folder.
     :param output_file_name: The name of the file that should be used to store the dynamic model as SVG file.
-    :param static_model: The dictionary containing the evidences extracted from the static model.
+    :param static_model: The StaticModel containing the evidences extracted from the static model.
     :param direction: The direction of the non-conformance, either source or destination.
+    :param model_registry: The (optional) run-scoped registry that holds the loaded and rendered dynamic models.
     """
-    if not os.path.exists(serv_dyn_model_path):
+    if model_registry is None:
+        model_registry = ModelRegistry()
+    service_dynamic_model = model_registry.get_model(serv_dyn_model_path, required=False)
+    if service_dynamic_model is None:
            return None
     else:
-        service_dynamic_model = collect_dynamic_model(serv_dyn_model_path)
-        add_links_to_code(output_folder + 'code_linked_models/', output_file_name, service_dynamic_model, static_model)
-        interpretation[direction + '_dyn_model'] = output_folder + 'code_linked_models/' + output_file_name + '.svg'
+        interpretation[direction + '_dyn_model'] = render_model_with_links_to_code(output_folder + 'code_linked_models/', output_file_name, service_dynamic_model, static_model, model_registry)
         return service_dynamic_model
 
 
-def transform_static_model_links(static_model_links: list) -> dict:
+def render_model_with_links_to_code(output_folder_path: str, file_name: str, dynamic_model, static_model, model_registry) -> str:
     """
-    Tranform the links from the static model into a dictionary that stores information on the parents and children
-    of each service. This is used to find the previous sequences of links that could occur in the static model.
+    Render the dynamic model with the links to the code to an SVG file, unless the registry already rendered
+    this file in the current run (e.g. a service that is involved in multiple non-conformances). The path to
+    the SVG file is returned; if the registry has a render pool, the file is written in the background.
 
-    :param static_model_links: A list of links between the services.
+    :param output_folder_path: The path to the folder processed dynamic model will be saved.
+    :param file_name: The file name that should be used to store the dynamic model with the links to code.
+    :param dynamic_model: The dynamic model loaded using the FlexFringe DOT parser.
+    :param static_model: The StaticModel containing the evidences extracted from the static model.
+    :param model_registry: The run-scoped registry that keeps track of the rendered models.
     """
-    service_parent_children_mapping = {}
-    for link in static_model_links:
-        splitted = link.split('-')
-        if len(splitted) == 2:
-            source = splitted[0]
-            target = splitted[1]
-        elif len(splitted) == 3:
-            source = splitted[0]
-            target = splitted[1] + '-' + splitted[2]
-        elif len(splitted) == 4:
-            source = splitted[0] + '-' + splitted[1]
-            target = splitted[2] + '-' + splitted[3]
-        
-        if source not in service_parent_children_mapping:
-            service_parent_children_mapping[source] = {'parents': set(), 'children': set()}
-        
-        if target not in service_parent_children_mapping:
-            service_parent_children_mapping[target] = {'parents': set(), 'children': set()}
-        
-        service_parent_children_mapping[source]['children'].add(target)
-        service_parent_children_mapping[target]['parents'].add(source)
-    
-    return service_parent_children_mapping
+    svg_path = output_folder_path + file_name + '.svg'
+    if not model_registry.is_rendered(svg_path):
+        add_links_to_code(output_folder_path, file_name, dynamic_model, static_model, model_registry.render_pool)
+        model_registry.mark_rendered(svg_path)
+    return svg_path
 
 
-def find_previous_sequences_for_link_static_model(static_model_links: dict, starting_point: str, required_service: str, number_of_walks: int) -> list:
+def compute_distances_to_service(static_model, service_id: int, max_distance: int) -> dict:
+    """
+    Compute for every service the minimal number of steps backwards in the static model (from a service to one
+    of its parents) that is needed to reach the given service, up to `max_distance`. This is a breadth-first
+    search over the children of the given service. The services are identified by their ids in the service registry.
+
+    :param static_model: The StaticModel that contains the links between the services.
+    :param service_id: The id of the service that should be reached.
+    :param max_distance: The maximal number of steps.
+    """
+    distances = {service_id: 0}
+    frontier = [service_id]
+    for distance in range(1, max_distance + 1):
+        next_frontier = []
+        for current in frontier:
+            for child in static_model.get_child_ids(current):
+                if child not in distances:
+                    distances[child] = distance
+                    next_frontier.append(child)
+        frontier = next_frontier
+    return distances
+
+
+def find_previous_sequences_for_link_static_model(static_model, starting_point: str, required_service: str, max_sequences: int = MAX_PREVIOUS_SEQUENCES, min_length: int = MIN_PREVIOUS_SEQUENCE_LENGTH, max_length: int = MAX_PREVIOUS_SEQUENCE_LENGTH) -> list:
     """
     For a given link that is part of a non-conformance of type static, find the previous sequences of links
     that could occur in the static model. To do so, we start from the destination service of the link and we
-    go backwards in the static model to find (possible) previous sequences. Currently, we only consider 
-    sequences that have a length between 1 and 5.
-
-    :param static_model_links: A dictionary that contains the links between the services.
+    go backwards in the static model. All paths of `min_length` up to `max_length` services that contain the
+    required service are enumerated, shorter paths are included if they start at a service without parents.
+    Branches from which the required service cannot be reached within the remaining steps are not explored.
+    The sequences are ordered by their length and then by the names of the services, at most `max_sequences`
+    sequences are returned. The paths are enumerated over the ids of the services, the links of the sequences
+    use the display names of the services (as in the dynamic models).
+
+    :param static_model: The StaticModel that contains the links between the services.
     :param starting_point: The service from which we start to walk backwards in the static model.
     :param required_services: The service that must be in the path, this would be the source service of the link.
-    :param number_of_walks: The number of random walks to do.
+    :param max_sequences: The maximal number of sequences that is returned.
+    :param min_length: The minimal number of services before the starting point, unless a service without parents is reached.
+    :param max_length: The maximal number of services before the starting point.
     """
-    service_parent_children_info = transform_static_model_links(static_model_links)
+    service_registry = static_model.service_registry
+    starting_point_id = service_registry.add_service(starting_point)
+    required_service_id = service_registry.add_service(required_service)
+    distances = compute_distances_to_service(static_model, required_service_id, max_length)
     potential_previous_sequences = []
-    potential_previous_sequences_set = set()
-    # Do the random backwards walks
-    for i in range(number_of_walks):
-        current_node = starting_point
-        path = []
-        walk_length = random.randint(2, 5)
-        for j in range(walk_length):
-            target_nodes = service_parent_children_info[current_node]['parents']
-            if len(target_nodes) == 0:
+    # every partial path is stored as the list of service ids (farthest service first) and whether it contains the required service
+    partial_paths = [([], False)]
+    for length in range(1, max_length + 1):
+        next_partial_paths = []
+        for path, has_required_service in partial_paths:
+            current_node = path[0] if path else starting_point_id
+            for parent in static_model.get_parent_ids(current_node):
+                extended_path = [parent] + path
+                contains_required_service = has_required_service or parent == required_service_id
+                if contains_required_service and (length >= min_length or len(static_model.get_parent_ids(parent)) == 0):
+                    potential_previous_sequences.append(extended_path)
+                    if len(potential_previous_sequences) >= max_sequences:
+                        break
+                # only continue if the required service is (still) reachable within the remaining steps
+                if contains_required_service or distances.get(parent, max_length + 1) <= max_length - length:
+                    next_partial_paths.append((extended_path, contains_required_service))
+            if len(potential_previous_sequences) >= max_sequences:
                 break
-            next_target_node = random.choice(list(target_nodes))
-            path.insert(0, next_target_node)
-            current_node = next_target_node
+        if len(potential_previous_sequences) >= max_sequences:
+            break
+        partial_paths = next_partial_paths
 
-        if str(path) in potential_previous_sequences_set:
-            continue
-        
-        if required_service in path:
-            potential_previous_sequences.append(path)
-            potential_previous_sequences_set.add(str(path))
-        else:
-            continue
-    
     # Transform the paths into sequences of links
     potential_previous_link_sequences = []
     for path in potential_previous_sequences:
-        path.append(starting_point) # include the starting point to show this in the interpretation
-        sequence = []
-        for i in range(len(path)):
-            if i+1 >= len(path):
-                break
-            sequence.append(path[i] + '__' + path[i+1])
-        potential_previous_link_sequences.append(sequence)
+        path.append(starting_point_id) # include the starting point to show this in the interpretation
+        names = [service_registry.get_display_name(service_id) for service_id in path]
+        potential_previous_link_sequences.append([names[i] + '__' + names[i + 1] for i in range(len(names) - 1)])
 
     return potential_previous_link_sequences
 
 
-def find_sequence_of_call_details(call_sequence: list, dynamic_model) -> list:
+def find_call_details_frequencies(call_sequence: list, dynamic_model) -> dict:
     """
-    Find the call details from a given call sequence. We basically traverse the dynamic model
-    and find sequences of transitions that matches the call sequence. We then extract the call 
-    details from these sequences of transitions.
+    Find the call details from a given call sequence, together with how often they occurred. We traverse the
+    dynamic model breadth-first: the frontier holds the reached states with the call details of the transitions
+    that led there, and in every step only the transitions of the next link of the sequence are followed. These
+    are looked up in the (state, link) index of the model, so the work is proportional to the matched frontier.
+    The frequency of a path is the lowest frequency of its transitions, the frequencies of paths with the same
+    call details are summed.
 
     :param call_sequence: The sequence of calls for which we want to find the details.
-    :param dynamic_model: The dynamic model that is loaded using the pydot library.
+    :param dynamic_model: The dynamic model that is loaded using the FlexFringe DOT parser.
     """
-    unique_call_details_sequences = set()
-    state_to_edges_mapping = extract_state_to_edges_mapping_from_dynamic_model(dynamic_model)
-    start_call = call_sequence[0]
-    starting_points = find_starting_points_for_sequence(start_call, dynamic_model)
     # We redefine the length of the sequence as the last item in the sequence is the missing link
     # and we do not have any call details for this link, hence we have len(call_sequence) - 1. It
     # could be the case that the call sequence only contains one call, in this case we set the length to 1.
     len_call_sequence = len(call_sequence) - 1 if len(call_sequence) > 1 else 1
-    
-    # now we traverse the model using the found starting points and we try to find the
-    # sequence of call details for the given sequence.
-    for p in starting_points:
-        sequence_of_details = []
-        matching_path = True
-        current_node = p
-        for i in range(len_call_sequence):
-            if current_node not in state_to_edges_mapping:
-                matching_path = False
-                break
-            
-            out_edges = state_to_edges_mapping[current_node]
-            non_matching_out_edges = False
-            for edge in out_edges:
-                splitted = edge.get_label().split('\n')[0].split('__')
-                link = splitted[-2] + '__' + splitted[-1]
-                if link == call_sequence[i]:
-                    sequence_of_details.append(splitted[0] + '__' + splitted[1])
-                    current_node = edge.get_destination()
-                    break
-                else:
-                    non_matching_out_edges = True
-            
-            if non_matching_out_edges:
-                matching_path = False
-                break
-            
-        if matching_path:
-            unique_call_details_sequences.add(str(sequence_of_details))
-
-    # Clean the call details sequences before returning them
-    processed_call_details = []
-    for call_detail_sequence in unique_call_details_sequences:
-        sequence = call_detail_sequence.replace('[', '').replace(']', '').replace('\"', '').replace('\'', '').replace('>', '/').split(',')
-        processed_call_details.append(sequence)
-    
-    return processed_call_details
+
+    frontier = {(None, ()): None}
+    for i in range(len_call_sequence):
+        next_frontier = {}
+        for (state, details), frequency in frontier.items():
+            for edge in dynamic_model.get_edges_of_link(call_sequence[i], state):
+                label = dynamic_model.labels[dynamic_model.symbols[edge]]
+                key = (int(dynamic_model.destinations[edge]), details + ((label.port + '__' + label.url).replace('>', '/'),))
+                edge_frequency = int(dynamic_model.frequencies[edge])
+                path_frequency = edge_frequency if frequency is None else min(frequency, edge_frequency)
+                next_frontier[key] = next_frontier.get(key, 0) + path_frequency
+        frontier = next_frontier
+        if len(frontier) == 0:
+            break
+
+    call_details_frequencies = {}
+    for (state, details), frequency in frontier.items():
+        call_details_frequencies[details] = call_details_frequencies.get(details, 0) + frequency
+
+    return dict(sorted(call_details_frequencies.items(), key=lambda x: x[1], reverse=True))
 
 
-def do_random_walk_dynamic_model(dynamic_model, required_service: str, missing_service: str, number_of_walks: int, walk_length: int) -> list:
+def find_sequence_of_call_details(call_sequence: list, dynamic_model) -> list:
+    """
+    Find the distinct sequences of call details from a given call sequence, ordered from the most to the least
+    frequent sequence. See `find_call_details_frequencies`.
+
+    :param call_sequence: The sequence of calls for which we want to find the details.
+    :param dynamic_model: The dynamic model that is loaded using the FlexFringe DOT parser.
+    """
+    return [list(details) for details in find_call_details_frequencies(call_sequence, dynamic_model)]
+
+
+def do_random_walk_dynamic_model(dynamic_model, required_service: str, missing_service: str, number_of_walks: int, walk_length: int, random_generator: np.random.Generator = None, frequency_weighted: bool = False) -> list:
     """
     Do random walks over the dynamic model to sample paths that were used to infer the dynamic
     model. The paths that are traversed through this model must contain the service that is
-    given as the parameter.
+    given as the parameter. All walks are done at once over the transition arrays of the model.
 
-    :param dynamic_model: The dynamic model that is loaded using the pydot library.
+    :param dynamic_model: The dynamic model that is loaded using the FlexFringe DOT parser.
     :param number_of_walks: The number of random walks to do.
     :param required_service: The service that must be in the path.
     :param walk_length: The length of each random walk.
+    :param random_generator: The random generator that is used, a generator seeded from the OS is used if None.
+    :param frequency_weighted: If True, transitions are chosen according to their frequencies, otherwise uniformly.
+    """
+    if random_generator is None:
+        random_generator = create_random_generator()
+    missing_link = required_service + '__' + missing_service # include the missing link in the path (will be shown in the interpretation).
+    initial_state = dynamic_model.get_initial_state()
+    if initial_state is None:
+        walks = np.full((number_of_walks, 0), -1, dtype=np.int64)
+    else:
+        probabilities = compute_transition_probabilities(dynamic_model) if frequency_weighted else None
+        walks = do_batched_random_walks(dynamic_model.offsets, dynamic_model.destinations, initial_state, number_of_walks, walk_length, random_generator, probabilities)
+
+    return convert_walks_to_paths(dynamic_model, walks, required_service, missing_link)
+
+
+def do_adaptive_random_walk_dynamic_model(dynamic_model, required_service: str, missing_service: str, random_walk_settings: dict, random_generator: np.random.Generator = None) -> tuple:
     """
-    states_to_edges_mapping = extract_state_to_edges_mapping_from_dynamic_model(dynamic_model)
+    Do random walks over the dynamic model until the sampled paths saturate, see `do_adaptive_random_walks`.
+    The budget of walks grows with the number of transitions of the model. Besides the paths, the number of
+    walks, the number of unique paths and the estimated coverage of the paths are returned.
 
+    :param dynamic_model: The dynamic model that is loaded using the FlexFringe DOT parser.
+    :param required_service: The service that must be in the path.
+    :param missing_service: The destination service of the missing link.
+    :param random_walk_settings: The settings of the walks, see `get_random_walk_settings`.
+    :param random_generator: The random generator that is used, a generator seeded from the OS is used if None.
+    """
+    if random_generator is None:
+        random_generator = create_random_generator()
+    missing_link = required_service + '__' + missing_service
+    initial_state = dynamic_model.get_initial_state()
+    if initial_state is None:
+        return [[missing_link]], {'number_of_walks': 1, 'unique_paths': 1, 'estimated_coverage': 1.0}
+
+    probabilities = compute_transition_probabilities(dynamic_model) if random_walk_settings['frequency_weighted'] else None
+    budget = compute_walk_budget(dynamic_model.num_edges, random_walk_settings['number_of_walks'], random_walk_settings['max_number_of_walks'])
+    # paths are identified by their links, symbols with the same link (e.g. other URLs) share the same token
+    link_ids = {}
+    symbol_link_ids = np.array([link_ids.setdefault(label.link, len(link_ids)) for label in dynamic_model.labels] + [-1], dtype=np.int64)
+    walks, coverage = do_adaptive_random_walks(dynamic_model.offsets, dynamic_model.destinations, symbol_link_ids[dynamic_model.symbols], initial_state, random_walk_settings['walk_length'],
+                                               random_generator, budget, random_walk_settings['missing_mass_threshold'], probabilities)
+    return convert_walks_to_paths(dynamic_model, walks, required_service, missing_link), coverage
+
+
+def convert_walks_to_paths(dynamic_model, walks: np.ndarray, required_service: str, missing_link: str) -> list:
+    """
+    Convert walks (rows of transition indices, -1 after the end of a walk) into paths of links that end with the missing link.
+
+    :param dynamic_model: The dynamic model the walks were done on.
+    :param walks: The walks.
+    :param required_service: The service that must be in the path.
+    :param missing_link: The missing link that is appended to every path.
+    """
+    # the symbol id -1 of transitions without a link selects the last entry
+    edge_links = np.array([label.link for label in dynamic_model.labels] + [None], dtype=object)[dynamic_model.symbols]
     random_walk_paths = []
-    random_walk_paths_set = set()
-    for i in range(number_of_walks):
-        current_node = '0'
-        path = []
-        for j in range(walk_length):
-            if current_node not in states_to_edges_mapping:
-                break
-            out_edges = states_to_edges_mapping[current_node]
-            selected_edge = random.choice(out_edges)
-            next_target_node = selected_edge.get_destination()
-            splitted = selected_edge.get_label().split('\n')[0].split('__')
-            path.append(splitted[-2] + '__' + splitted[-1])
-            current_node = next_target_node
-
-        path.append(required_service + '__' + missing_service) # include the missing link in the path (will be shown in the interpretation).
+    for walk in walks:
+        path = edge_links[walk[walk >= 0]].tolist()
+        path.append(missing_link)
         if required_service in str(path):
             random_walk_paths.append(path)
-            random_walk_paths_set.add(str(path))
-        
-    
+
     return random_walk_paths
-            
-            
+
+
+def compute_transition_probabilities(dynamic_model) -> np.ndarray:
+    """
+    Compute the probability of each transition of the dynamic model given its source state. The probabilities
+    are weighted by the frequencies that FlexFringe stores on the transitions; the outgoing transitions of a
+    state without any counts are taken to be equally likely.
+
+    :param dynamic_model: The dynamic model that is loaded using the FlexFringe DOT parser.
+    """
+    sources = dynamic_model.sources
+    frequencies = dynamic_model.frequencies.astype(np.float64)
+    out_totals = np.bincount(sources, weights=frequencies, minlength=dynamic_model.num_states)[sources]
+    out_degrees = np.diff(dynamic_model.offsets)[sources]
+    uniform = 1.0 / np.maximum(out_degrees, 1)
+    return np.divide(frequencies, out_totals, out=uniform, where=out_totals > 0)
+
+
+def compute_sequence_matching_targets(link_sequence: list, edge_links: np.ndarray, link_ids: dict) -> np.ndarray:
+    """
+    Compute the transitions of the automaton that tracks how much of a link sequence has been matched (as in the
+    Knuth-Morris-Pratt algorithm). Row `j` holds for every transition of the dynamic model the number of matched
+    links after taking this transition when `j` links were matched before.
+
+    :param link_sequence: The sequence of links that is matched.
+    :param edge_links: The id of the link of every transition of the dynamic model (-1 for transitions without a link).
+    :param link_ids: The mapping from the links to their ids.
+    """
+    length = len(link_sequence)
+    targets = np.zeros((length + 1, len(edge_links)), dtype=np.int64)
+    for j in range(length + 1):
+        for link in set(link_sequence):
+            matched = link_sequence[:j] + [link]
+            target = 0
+            for m in range(min(len(matched), length), 0, -1):
+                if matched[-m:] == link_sequence[:m]:
+                    target = m
+                    break
+            if target > 0:
+                targets[j, edge_links == link_ids[link]] = target
+    return targets
+
+
+def compute_sequence_statistics(dynamic_model, call_sequences: list, missing_link: str, walk_length: int) -> dict:
+    """
+    Compute for each call sequence how likely it occurs in a path (trace) through the dynamic model. Paths
+    start in the initial state and take up to `walk_length` transitions, the transitions are weighted by their
+    frequencies. The missing link does not occur in the dynamic model, so for a sequence that ends with the
+    missing link only the links before it are matched; other sequences are matched as a whole (as in
+    `compute_sequence_statistics_from_paths`, where the missing link ends every path).
+    We use dynamic programming over pairs of a state and the number of matched links: the distribution over
+    these pairs is propagated one transition at a time with sparse matrix-vector products (over the transition
+    arrays of the model). For each sequence we compute the probability that it occurs in a path and the expected
+    number of times it occurs in a path.
+
+    :param dynamic_model: The dynamic model that is loaded using the FlexFringe DOT parser.
+    :param call_sequences: The sequences of links.
+    :param missing_link: The missing link in the format `src__dst`.
+    :param walk_length: The maximal number of transitions of a path.
+    """
+    num_states = dynamic_model.num_states
+    sources = dynamic_model.sources
+    destinations = dynamic_model.destinations
+    probabilities = compute_transition_probabilities(dynamic_model)
+    link_ids = {}
+    symbol_links = np.array([link_ids.setdefault(label.link, len(link_ids)) for label in dynamic_model.labels] + [-1], dtype=np.int64)
+    edge_links = symbol_links[dynamic_model.symbols] # the symbol id -1 of transitions without a link selects the last entry
+    initial_state = dynamic_model.get_initial_state()
+
+    sequence_statistics = dict()
+    for call_sequence in call_sequences:
+        link_sequence = list(call_sequence[:-1]) if call_sequence[-1] == missing_link else list(call_sequence)
+        length = len(link_sequence)
+        if length == 0:
+            # only the missing link, every path leads up to it
+            sequence_statistics[str(call_sequence)] = {'probability': 1.0, 'expected_count': 1.0}
+            continue
+        if initial_state is None or any(link not in link_ids for link in link_sequence):
+            sequence_statistics[str(call_sequence)] = {'probability': 0.0, 'expected_count': 0.0}
+            continue
+
+        targets = compute_sequence_matching_targets(link_sequence, edge_links, link_ids)
+        # distributions over (number of matched links, state); paths that matched the sequence are absorbed in `absorbed`
+        counting = np.zeros((length + 1, num_states))
+        counting[0, initial_state] = 1.0
+        absorbing = counting.copy()
+        probability = 0.0
+        expected_count = 0.0
+        for step in range(walk_length):
+            next_counting = np.zeros((length + 1) * num_states)
+            next_absorbing = np.zeros((length + 1) * num_states)
+            for j in range(length + 1):
+                index = targets[j] * num_states + destinations
+                if counting[j].any():
+                    next_counting += np.bincount(index, weights=counting[j][sources] * probabilities, minlength=(length + 1) * num_states)
+                if absorbing[j].any():
+                    next_absorbing += np.bincount(index, weights=absorbing[j][sources] * probabilities, minlength=(length + 1) * num_states)
+            counting = next_counting.reshape(length + 1, num_states)
+            absorbing = next_absorbing.reshape(length + 1, num_states)
+            expected_count += counting[length].sum()
+            probability += absorbing[length].sum()
+            absorbing[length] = 0.0
+            if not counting.any():
+                break
+
+        sequence_statistics[str(call_sequence)] = {'probability': min(probability, 1.0), 'expected_count': expected_count}
+
+    return sequence_statistics
+
+
+def find_occurred_sequences_in_statistics(potential_previous_sequences: list, sequence_statistics: dict) -> list:
+    """
+    Find sequences, generated from backward walks on the static model, that occur with a non-zero probability
+    in the dynamic model. The sequences are ordered from the most to the least likely sequence.
+
+    :param potential_previous_sequences: The previous sequences of links that could have occurred for a given link in the static model.
+    :param sequence_statistics: The probability and expected count of each sequence, computed by `compute_sequence_statistics`.
+    """
+    occurred_sequences = [seq for seq in potential_previous_sequences if sequence_statistics[str(seq)]['probability'] > 0]
+    return sorted(occurred_sequences, key=lambda seq: sequence_statistics[str(seq)]['probability'], reverse=True)
+
+
 def find_occurred_sequences_in_paths(potential_previous_sequences: list, dynamic_model_walk_paths: list) -> list:
     """
     Find sequences, generated from backward walks on the static model, that really occurred in the dynamic model.
-    We also count how often it has occurred in the dynamic model.
+    All sequences are matched at once with an Aho-Corasick automaton, so every path is scanned a single time.
 
     :param potential_previous_sequences: The previous sequences of links that could have occurred for a given link in the static model.
     :param dynamic_model_walk_paths: The random paths that were traversed in the dynamic model.
     """
+    _, path_counts = SequenceMatcher(potential_previous_sequences).count_occurrences(dynamic_model_walk_paths)
     occurred_sequences = []
     occurred_sequence_set = set()
-    for seq in potential_previous_sequences:
-        processed_seq = str(seq).replace(']', '').replace('[', '')
-        for path in dynamic_model_walk_paths:
-            if processed_seq in occurred_sequence_set:
-                continue
-            if processed_seq in str(path):
-                occurred_sequences.append(seq)
-                occurred_sequence_set.add(processed_seq)
+    for seq, path_count in zip(potential_previous_sequences, path_counts):
+        if path_count > 0 and str(seq) not in occurred_sequence_set:
+            occurred_sequences.append(seq)
+            occurred_sequence_set.add(str(seq))
 
     return occurred_sequences
 
 
+def compute_sequence_statistics_from_paths(potential_previous_sequences: list, dynamic_model_walk_paths: list) -> dict:
+    """
+    Estimate the probability and expected count of each sequence from sampled paths: the fraction of the paths
+    in which the sequence occurs and the average number of occurrences per path.
+
+    :param potential_previous_sequences: The previous sequences of links that could have occurred for a given link in the static model.
+    :param dynamic_model_walk_paths: The random paths that were traversed in the dynamic model.
+    """
+    occurrence_counts, path_counts = SequenceMatcher(potential_previous_sequences).count_occurrences(dynamic_model_walk_paths)
+    num_paths = max(len(dynamic_model_walk_paths), 1)
+    sequence_statistics = dict()
+    for seq, occurrence_count, path_count in zip(potential_previous_sequences, occurrence_counts, path_counts):
+        sequence_statistics[str(seq)] = {'probability': path_count / num_paths, 'expected_count': occurrence_count / num_paths}
+
+    return sequence_statistics
+
+
 def find_starting_points_for_sequence(start_call: str, dynamic_model) -> list:
     """
     Find the possible starting points in the dynamic model given a starting call for a call 
@@ -398,22 +617,14 @@ def find_starting_points_for_sequence(start_call: str, dynamic_model) -> list:
     start of the call sequence.
 
     :param call_sequence: The starting call of the call sequence.
-    :param dynamic_model: The dynamic model that is loaded using the pydot library.
+    :param dynamic_model: The dynamic model that is loaded using the FlexFringe DOT parser.
     """
-    starting_points = set()
-    for edge in dynamic_model.get_edges():
-         # starting transition of state machine
-        if edge.get_label() is None:
-            continue
-        splitted = edge.get_label().split('\n')[0].split('__')
-        link = splitted[-2] + '__' + splitted[-1]
-        if link == start_call:
-            starting_points.add(edge.get_source())
+    starting_points = np.unique(dynamic_model.sources[dynamic_model.get_edges_of_link(start_call)])
 
-    return list(starting_points)
+    return [dynamic_model.state_names[p] for p in starting_points]
 
 
-def add_links_to_code(output_folder_path: str, file_name: str, dynamic_model, static_model: dict):
+def add_links_to_code(output_folder_path: str, file_name: str, dynamic_model, static_model, render_pool = None):
     """
     This function is used to the link a transition shown in the dynamic model to the corresponding line
     of code that produced the behaviour. The links are parsed from the static model (DFD model) extracted 
@@ -423,24 +634,29 @@ def add_links_to_code(output_folder_path: str, file_name: str, dynamic_model, st
 
     :param output_folder_path: The path to the folder processed dynamic model will be saved.
     :param file_name: The file name that should be used to store the dynamic model with the links to code.
-    :param dynamic_model: The dynamic model loaded using the pydot library.
-    :param evidence_file: The dictionary containing the evidences extracted by the static model (DFD).
+    :param dynamic_model: The dynamic model loaded using the FlexFringe DOT parser.
+    :param static_model: The StaticModel containing the evidences extracted by the static model (DFD).
+    :param render_pool: The (optional) RenderPool that renders the SVG file in the background, by default it is rendered before returning.
     """
-    dynamic_model = clean_dynamic_model(dynamic_model)
-    edges = dynamic_model.get_edges()
-
-    for e in edges:
-        # get the edge label
-        label = e.get_label()
-        if label is None:
-            continue
-        link = extract_link_from_transition_label(label)
-        if link in static_model['links']:
-            url = static_model['links'][link][0][1]
+    # models handed out by the model registry are already cleaned
+    if not dynamic_model.cleaned:
+        dynamic_model = clean_dynamic_model(dynamic_model)
+
+    # look up the code for the link of each symbol once
+    symbol_links = static_model.service_registry.find_label_links(dynamic_model.labels)
+    symbol_urls = {}
+    for symbol in dynamic_model.get_present_symbols():
+        url = static_model.get_link_code_url_by_id(symbol_links[symbol]) if symbol_links[symbol] >= 0 else None
+        if url is not None:
+            symbol_urls[symbol] = url
+
+    for edge, symbol in enumerate(dynamic_model.symbols):
+        if symbol in symbol_urls:
             # add href to the edge
-            e.set_href(url)
-        else:
-            continue
+            dynamic_model.hrefs[edge] = symbol_urls[symbol]
 
-    dynamic_model.write(output_folder_path + file_name + '.svg', format='svg')
+    if render_pool is not None:
+        render_pool.submit(dynamic_model.to_string(), output_folder_path + file_name + '.svg')
+    else:
+        dynamic_model.write(output_folder_path + file_name + '.svg', format='svg')
 
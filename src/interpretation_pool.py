@@ -0,0 +1,147 @@
+from src.model_processor import read_static_model
+from src.model_registry import ModelRegistry
+from src.interpretation_generator import generate_interpretation
+from src.render_pool import RenderPool, RenderJobList
+from collections import deque
+import os
+
+# The models of the project that a worker process analyzes, loaded once per worker and reused for all of its tasks
+worker_context = {'key': None, 'static_model': None, 'dynamic_model': None, 'model_registry': None}
+
+
+def collect_rendered_model_paths(non_conformance_type: str, services: list, output_folder: str, static_model) -> list:
+    """
+    Collect the paths to the SVG files that are rendered for the interpretation of a non-conformance, see
+    `generate_interpretation` for the names of these files.
+
+    :param non_conformance_type: The type of the non-conformance, either `static` or `dynamic`.
+    :param services: The list of two services that are involved in the non-conformance.
+    :param output_folder: The path to the output folder.
+    :param static_model: The StaticModel, its service registry gives the display names of the services.
+    """
+    if non_conformance_type == 'static':
+        return [output_folder + 'code_linked_models/' + services[0] + '_' + services[1] + '_link_model.svg']
+    service_registry = static_model.service_registry
+    return [output_folder + 'code_linked_models/' + service_registry.get_display_name(service_registry.add_service(service)) + '_service_model.svg' for service in services]
+
+
+def load_worker_context(static_model_path: str, general_model_path: str, model_format: str = None, model_cache = None) -> dict:
+    """
+    Get the models of a project in a worker process. The static model and general dynamic model are loaded on
+    the first task of the project, the general model is memory-mapped (or taken from the model cache), so the
+    large models are never pickled per task. A worker keeps the models of a single project at a time.
+
+    :param static_model_path: The path to the static model.
+    :param general_model_path: The path to the general dynamic model.
+    :param model_format: The format of the dynamic models that should be read, either `dot` or `json`.
+    :param model_cache: The (optional) persistent cache of parsed dynamic models.
+    """
+    key = (static_model_path, general_model_path, model_format)
+    if worker_context['key'] != key:
+        if worker_context['model_registry'] is not None:
+            worker_context['model_registry'].close()
+        model_registry = ModelRegistry(model_format, model_cache)
+        worker_context.update({
+            'key': key,
+            'static_model': read_static_model(static_model_path),
+            'dynamic_model': model_registry.get_model(general_model_path, lazy=True),
+            'model_registry': model_registry
+        })
+    return worker_context
+
+
+def generate_interpretation_task(task: dict) -> tuple:
+    """
+    Generate the interpretation of a single non-conformance in a worker process. Errors are returned instead of
+    raised, so a model that cannot be processed only fails the interpretation it belongs to. The models are not
+    rendered in the worker, the render jobs are returned to be queued in the render pool of the main process.
+
+    :param task: The non-conformance and the settings of its interpretation, see `stream_interpretations_in_pool`.
+    """
+    try:
+        context = load_worker_context(task['static_model_path'], task['general_model_path'], task['model_format'], task['model_cache'])
+        model_registry = context['model_registry']
+        model_registry.render_pool = RenderJobList()
+        # only the files of tasks that succeeded count as rendered, the jobs of a failed task of this worker were discarded
+        model_registry.rendered_models.clear()
+        for svg_path in task['rendered_elsewhere']:
+            model_registry.mark_rendered(svg_path)
+        interpretation = generate_interpretation(task['non_conformance_type'], task['non_conformance'].split('-'), task['dynamic_models_path'], task['output_folder'],
+                                                 context['static_model'], context['dynamic_model'], model_registry, task['sequence_analysis'], task['random_walk_settings'], task['stream'])
+        return interpretation, None, model_registry.render_pool.jobs
+    except Exception as e:
+        return None, type(e).__name__ + ': ' + str(e), []
+
+
+def stream_interpretations_in_pool(executor, items, static_model, static_model_path: str, dynamic_models_path: str, general_model_path: str, output_folder: str, sequence_analysis: str, random_walk_settings: dict, model_format: str = None, model_cache = None, render_pool: RenderPool = None, max_in_flight: int = None):
+    """
+    Generate the interpretations of a stream of non-conformances in the worker processes of a process pool, the
+    non-conformances are yielded in their order as soon as their interpretation is finished. At most `max_in_flight`
+    non-conformances are submitted at once, so the stream is not consumed faster than the results are used.
+    Non-conformances that already have an interpretation (e.g. reused from a previous run) are passed on as they are.
+
+    Every task only carries paths and settings, the workers load the models themselves, see `load_worker_context`.
+    The models of a task are queued in the render pool as soon as the task is finished, so they render while the
+    other tasks are running. The error of a failed task is stored in `error`, its interpretation stays None.
+
+    :param executor: The process pool.
+    :param items: The non-conformances as dicts with their `non_conformance_type`, `non_conformance`, `stream` and `interpretation` (None if it should be generated).
+    :param static_model: The StaticModel of the project, used to find the models that the tasks render.
+    :param static_model_path: The path to the static model.
+    :param dynamic_models_path: The path to the folder containing the dynamic models.
+    :param general_model_path: The path to the general dynamic model.
+    :param output_folder: The path to the output folder.
+    :param sequence_analysis: How the occurred sequences are found, either `analytic` or `random_walk`.
+    :param random_walk_settings: The settings of the random walks, see `get_random_walk_settings`.
+    :param model_format: The format of the dynamic models that should be read, either `dot` or `json`.
+    :param model_cache: The (optional) persistent cache of parsed dynamic models.
+    :param render_pool: The RenderPool of the run.
+    :param max_in_flight: The maximal number of non-conformances that are submitted at once, by default twice the number of CPUs.
+    """
+    if max_in_flight is None:
+        max_in_flight = 2 * (os.cpu_count() or 1)
+    # an SVG file is skipped by the later tasks once a task that renders it succeeded, if that task fails the file is
+    # still rendered by the next task that needs it
+    rendered_paths = set()
+    in_flight = deque()
+    for item in items:
+        future, svg_paths = None, []
+        if item['interpretation'] is None:
+            svg_paths = collect_rendered_model_paths(item['non_conformance_type'], item['non_conformance'].split('-'), output_folder, static_model)
+            future = executor.submit(generate_interpretation_task, {
+                'non_conformance_type': item['non_conformance_type'],
+                'non_conformance': item['non_conformance'],
+                'stream': item['stream'],
+                'rendered_elsewhere': [svg_path for svg_path in svg_paths if svg_path in rendered_paths],
+                'static_model_path': static_model_path,
+                'dynamic_models_path': dynamic_models_path,
+                'general_model_path': general_model_path,
+                'output_folder': output_folder,
+                'sequence_analysis': sequence_analysis,
+                'random_walk_settings': random_walk_settings,
+                'model_format': model_format,
+                'model_cache': model_cache
+            })
+        in_flight.append((item, future, svg_paths))
+        while len(in_flight) >= max_in_flight or (in_flight and (in_flight[0][1] is None or in_flight[0][1].done())):
+            yield collect_task_result(*in_flight.popleft(), render_pool, rendered_paths)
+    while in_flight:
+        yield collect_task_result(*in_flight.popleft(), render_pool, rendered_paths)
+
+
+def collect_task_result(item: dict, future, svg_paths: list, render_pool: RenderPool, rendered_paths: set) -> dict:
+    """
+    Store the result of the task of a non-conformance in its item and queue its render jobs. The SVG files of a
+    task that succeeded are added to the rendered paths, so the tasks that are submitted later skip them.
+    """
+    item['error'] = None
+    if future is None:
+        return item
+    try:
+        item['interpretation'], item['error'], render_jobs = future.result()
+    except Exception as e: # e.g. a worker process that was killed
+        item['interpretation'], item['error'], render_jobs = None, type(e).__name__ + ': ' + str(e), []
+    render_pool.submit_jobs(render_jobs)
+    if item['error'] is None:
+        rendered_paths.update(svg_paths)
+    return item
@@ -1,6 +1,8 @@
 import dominate
 from dominate.tags import *
 from dominate.util import raw
+from src.transition_label import TransitionLabel, parse_transition_label
+import os
 
 def convert_flexfringe_transition_to_call(transition_info: list) -> dict:
     """
@@ -8,20 +10,17 @@ def convert_flexfringe_transition_to_call(transition_info: list) -> dict:
     more human readable information. We basically extract here the URL, port, status code,
     the direction of the call HTTP event call and the frequence of the call.
     
-    :param transition_info: The transition information that is collected from the dynamic model.
+    :param transition_info: The transition information that is collected from the dynamic model; the transition (its label or TransitionLabel record) and its frequency.
     """
     transition = transition_info[0]
     transition_frequency = transition_info[1]
-    splitted = transition.split('__')
-    start_index = 0
-    if splitted[0] == 'in' or splitted[0] == 'out':
-        start_index = 1
+    label = transition if isinstance(transition, TransitionLabel) else parse_transition_label(transition, transition_frequency)
     
     call_info = dict()
-    call_info['port'] = splitted[start_index]
-    call_info['call_url'] = splitted[start_index + 1].replace('>', '/').replace('-', ':')
-    call_info['call_status_code'] = splitted[start_index + 2]
-    call_info['call_direction'] = 'from ' + splitted[start_index + 4] + ' to ' + splitted[start_index + 5]
+    call_info['port'] = label.port
+    call_info['call_url'] = label.url.replace('>', '/').replace('-', ':')
+    call_info['call_status_code'] = label.status
+    call_info['call_direction'] = 'from ' + label.source + ' to ' + label.destination
     call_info['call_frequency'] = transition_frequency
     return call_info
 
@@ -144,7 +143,7 @@ def transform_extracted_call_sequence_to_readable_format(call_sequence: list) ->
              
     return readable_sequence
 
-def generate_html_list_for_call_sequences(doc, call_sequences: list, code_call_sequences: list):
+def generate_html_list_for_call_sequences(doc, call_sequences: list, code_call_sequences: list, sequence_statistics: dict = None):
     """
     Generate a list element for showing list of call sequences. The link to the source code 
     is added as a hyperlink in the arrows that are generated. 
@@ -152,6 +151,7 @@ def generate_html_list_for_call_sequences(doc, call_sequences: list, code_call_s
     :param doc: The HTML document to which the list will be added.
     :param call_sequences: The list of call sequences that will be added to the list.
     :param code_call_sequences: The list of code call sequences that belongs to the call sequences.
+    :param sequence_statistics: The (optional) probability and expected count of each call sequence in the dynamic model.
     """
     with ul():
         for call_sequence in call_sequences:
@@ -167,19 +167,23 @@ def generate_html_list_for_call_sequences(doc, call_sequences: list, code_call_s
                 else:
                     list_item.add(a(raw('&#8594;'), href=code_call_sequence[i-1][1]))
                 list_item.add(' ' + readable_sequence[i])
+            if sequence_statistics is not None and str(call_sequence) in sequence_statistics:
+                statistics = sequence_statistics[str(call_sequence)]
+                list_item.add(' (probability: ' + format(statistics['probability'], '.4f') + ', expected count per path: ' + format(statistics['expected_count'], '.4f') + ')')
 
     return doc
 
-def generate_html_for_call_sequences_leading_to_missing_link(doc, call_sequences: list, code_call_sequences: list):
+def generate_html_for_call_sequences_leading_to_missing_link(doc, call_sequences: list, code_call_sequences: list, sequence_statistics: dict = None):
     """
     Generate the HTMl DIV element that will contain the call sequences that should lead to the 
     missing link in a dynamic non-conformance.
 
     :param doc: The HTML document to which the DIV element will be added
     :param interpretation_data: The interpretation data that we generated for the non-conformance
+    :param sequence_statistics: The (optional) probability and expected count of each call sequence in the dynamic model.
     """
     with div(id = 'call_sequences'):
-            generate_html_list_for_call_sequences(doc, call_sequences, code_call_sequences)
+            generate_html_list_for_call_sequences(doc, call_sequences, code_call_sequences, sequence_statistics)
 
     return doc
 
@@ -194,6 +198,10 @@ def generate_div_with_svg_model(link_to_svg: str, text: str, ncf_type: str):
     """
     svg_div = div(id = 'model_svg')
     svg_div.add(h3(text))
+    if not os.path.exists(link_to_svg):
+        # the rendering of the model failed (or timed out), the failure is reported when the page is written
+        svg_div.add(p('The model could not be rendered, see the output of the run for the error.'))
+        return svg_div
     model = load_dynamic_model_as_svg(link_to_svg)
     # add id to the svg element
     model = model.replace('<svg', '<svg id="' + ncf_type + '"')
@@ -245,10 +253,13 @@ def generate_dynamic_non_conformance_interpretation(doc, interpretation_data: di
             with div(id = 'dynamic_ncf_occurred_sequences'):
                 h3('Sequences that occurred in the dynamic model that should produce dynamic behavior for link between ' + interpretation_data['services'][0] + ' and ' + interpretation_data['services'][1])
                 runtime_call_sequences = interpretation_data['occurred_call_sequences']
+                random_walk_coverage = interpretation_data.get('random_walk_coverage')
+                if random_walk_coverage is not None:
+                    p('Based on ' + str(random_walk_coverage['number_of_walks']) + ' random walks with ' + str(random_walk_coverage['unique_paths']) + ' unique paths (estimated coverage: ' + '{:.1%}'.format(random_walk_coverage['estimated_coverage']) + ')')
                 if len(runtime_call_sequences) == 0:
                     p('No sequences were found in the dynamic model that actually produced dynamic behavior for the link between ' + interpretation_data['services'][0] + ' and ' + interpretation_data['services'][1])
                 else:
-                    doc = generate_html_for_call_sequences_leading_to_missing_link(doc, runtime_call_sequences, code_call_sequences)
+                    doc = generate_html_for_call_sequences_leading_to_missing_link(doc, runtime_call_sequences, code_call_sequences, interpretation_data.get('call_sequence_statistics'))
 
             with div(id = 'call_details_occurred_sequences'):
                 h3('For the occurred sequences, these are the unique sequence of endpoints (parameters) that were used in the sequence')
@@ -266,8 +277,9 @@ def generate_dynamic_non_conformance_interpretation(doc, interpretation_data: di
                             list_item.add(raw('&#8594;'))
                             list_item.add(' ' + readable_call_sequence[i])
                         
+                        call_details_frequencies = interpretation_data.get('call_details_frequencies', {}).get(str(call_sequence))
                         with ul():
-                            for sequence in call_details_sequences:
+                            for k, sequence in enumerate(call_details_sequences):
                                 list_item = li()
                                 for j in range(len(sequence)):
                                     port = sequence[j].split('__')[0]
@@ -276,6 +288,8 @@ def generate_dynamic_non_conformance_interpretation(doc, interpretation_data: di
                                         list_item.add('Call started with \"' + endpoint + '\". ')
                                     else:
                                         list_item.add('Then followed by call with \"' + endpoint + '\". ')
+                                if call_details_frequencies is not None:
+                                    list_item.add('(Observed ' + str(call_details_frequencies[k]) + ' times)')
 
 
         with div(id = 'dynamic_model'):
@@ -368,6 +382,16 @@ def generate_style_sheet(file_path: str):
         )
 
 
+def get_interpretation_file_name(non_conformance_type: str, services: list) -> str:
+    """
+    Get the name of the HTML document of the interpretation of a non-conformance.
+
+    :param non_conformance_type: The type of the non-conformance, either `static` or `dynamic`.
+    :param services: The (display) names of the two services that are involved in the non-conformance.
+    """
+    return '_'.join(services) + '_' + non_conformance_type + '-non_conformance.html'
+
+
 def generate_html_for_interpretation(output_path: str, interpretation_data: dict, interpretation_texts: dict):
     """
     Generate HTML document for visualizing the interpretation of a non-conformance.
@@ -404,7 +428,7 @@ def generate_html_for_interpretation(output_path: str, interpretation_data: dict
             doc = generate_dynamic_non_conformance_interpretation(doc, interpretation_data, interpretation_texts['dynamic_interpretations'])
         
 
-    file_name = '_'.join(interpretation_data['services']) + '_' + non_conformance_type + '-non_conformance.html'
+    file_name = get_interpretation_file_name(non_conformance_type, interpretation_data['services'])
     with open(output_path + file_name, 'w') as f:
         f.write(doc.render())
 
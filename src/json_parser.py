@@ -0,0 +1,51 @@
+from src.dot_parser import DotGraph, DotNode, DotEdge
+import json
+
+
+def parse_json_model(model_data: dict) -> DotGraph:
+    """
+    Build a dynamic model from the JSON output of FlexFringe (the `.csv.ff.final.json` companion of
+    the DOT file). The transitions are built directly from the structured data: the symbols are
+    taken from the `alphabet` and the frequencies from the `trans_counts` stored per node. Just like
+    in the DOT output, only edges between states that are part of the final model are kept and the
+    initial transition `I -> 0` is added.
+
+    :param model_data: The JSON data written by FlexFringe.
+    """
+    graph = DotGraph()
+    for symbol_name in model_data['alphabet']:
+        graph.intern_symbol(symbol_name)
+
+    nodes = {}
+    graph.nodes.append(DotNode('0', {'label': '"root"', 'shape': 'box'}))
+    graph.edges.append(DotEdge('I', '0', {}))
+    for node in model_data['nodes']:
+        name = str(node['id'])
+        nodes[name] = node
+        graph.nodes.append(DotNode(name, {
+            'label': '"' + name + ' #' + str(node['size']) + '\n' + node['label'] + '"',
+            'style': 'filled',
+            'fillcolor': '"firebrick1"'
+        }))
+
+    for edge in model_data['edges']:
+        source = edge['source']
+        destination = edge['target']
+        if source not in nodes or destination not in nodes:
+            continue
+        symbol_name = edge['name']
+        frequency = int(nodes[source]['data']['trans_counts'].get(symbol_name, 0))
+        attributes = {'label': '"' + symbol_name + '\n' + str(frequency) + ' "'}
+        graph.edges.append(DotEdge(source, destination, attributes, graph.intern_symbol(symbol_name), frequency))
+
+    return graph
+
+
+def parse_json_file(path: str) -> DotGraph:
+    """
+    Load a dynamic model that is stored in the JSON format by FlexFringe.
+
+    :param path: The path to the JSON file.
+    """
+    with open(path, 'r') as f:
+        return parse_json_model(json.load(f))
@@ -0,0 +1,158 @@
+from src.dot_parser import ATTRIBUTE_REGEX, strip_quotes
+from src.dynamic_model import DynamicModel, NO_SYMBOL
+from array import array
+import numpy as np
+import mmap
+import re
+
+# A statement of the DOT files written by FlexFringe: a comment, the graph header, the closing brace, a stray `;`
+# or a node/edge statement. Quoted strings may contain `]`, `;` and newlines (e.g. the node labels of FlexFringe).
+QUOTED_BYTES_PATTERN = rb'"(?:[^"\\]|\\.)*"'
+STATEMENT_BYTES_REGEX = re.compile(
+    rb'\s*(?://[^\n]*|(?:strict\s+)?(?:di)?graph\s*(?:[\w.]+|' + QUOTED_BYTES_PATTERN + rb')?\s*\{|\}|;|'
+    rb'(' + QUOTED_BYTES_PATTERN + rb'|[\w.]+)\s*(?:->\s*(' + QUOTED_BYTES_PATTERN + rb'|[\w.]+))?\s*'
+    rb'(?:\[((?:[^\]"]|' + QUOTED_BYTES_PATTERN + rb')*)\])?\s*;?)', re.DOTALL)
+LABEL_BYTES_REGEX = re.compile(rb'label\s*=\s*"((?:[^"\\]|\\.)*)"', re.DOTALL)
+KEYWORDS = (b'node', b'edge', b'graph', b'subgraph')
+
+
+def open_model_buffer(model_path: str):
+    """
+    Map a model file read-only into memory, or return an empty buffer for an empty file (which cannot be mapped).
+
+    :param model_path: The path to the model file.
+    """
+    with open(model_path, 'rb') as f:
+        try:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            return b''
+
+
+class LazyDynamicModel(DynamicModel):
+    """
+    DynamicModel that is indexed from a memory-mapped DOT file in a single scan, without creating an object per
+    statement. Only the transitions (states, symbols and frequencies) are read during the scan. For every node
+    statement the byte offsets of its attribute list are kept, the attributes themselves (the large statistics
+    labels of FlexFringe, widths and shapes) are only parsed once the model is rendered. The general model is
+    only used for detection and analysis, so its node statements are never parsed.
+    """
+
+    def __init__(self, model_path: str, node_spans: np.ndarray, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.model_path = model_path
+        self.node_spans = node_spans
+        self.node_attributes_loaded = False
+
+    @classmethod
+    def from_file(cls, model_path: str):
+        """
+        Index a dynamic model stored in the DOT format by FlexFringe.
+
+        :param model_path: The path to the DOT file.
+        """
+        state_ids = {}
+        state_names = []
+        symbol_ids = {}
+        alphabet = []
+
+        def get_state(identifier: bytes) -> int:
+            state = state_ids.get(identifier)
+            if state is None:
+                state = len(state_names)
+                state_ids[identifier] = state
+                state_names.append(strip_quotes(identifier.decode('utf-8')))
+            return state
+
+        sources, destinations, symbols, frequencies = array('i'), array('i'), array('i'), array('q')
+        node_spans = array('q') # (state, start, end) of the attribute list of every node statement
+
+        buffer = open_model_buffer(model_path)
+        try:
+            position = 0
+            size = len(buffer)
+            while position < size:
+                match = STATEMENT_BYTES_REGEX.match(buffer, position)
+                if match is None or match.end() == position:
+                    # skip what cannot be parsed, just like the streaming parser ignores unknown statements
+                    next_line = buffer.find(b'\n', position)
+                    if next_line < 0:
+                        break
+                    position = next_line + 1
+                    continue
+                position = match.end()
+                source = match.group(1)
+                if source is None or source in KEYWORDS:
+                    continue
+
+                if match.group(2) is None:
+                    node_spans.extend((get_state(source), match.start(3), match.end(3)))
+                    continue
+
+                symbol, frequency = NO_SYMBOL, 0
+                attribute_text = match.group(3)
+                label = LABEL_BYTES_REGEX.search(attribute_text) if attribute_text else None
+                if label is not None:
+                    # labels of FlexFringe are formatted as `"<symbol>\n<frequency> "`
+                    splitted = label.group(1).split(b'\n')
+                    symbol_name = splitted[0].decode('utf-8')
+                    symbol = symbol_ids.get(symbol_name)
+                    if symbol is None:
+                        symbol = len(alphabet)
+                        symbol_ids[symbol_name] = symbol
+                        alphabet.append(symbol_name)
+                    if len(splitted) > 1 and splitted[1].strip().isdigit():
+                        frequency = int(splitted[1].strip())
+                sources.append(get_state(source))
+                destinations.append(get_state(match.group(2)))
+                symbols.append(symbol)
+                frequencies.append(frequency)
+        finally:
+            if isinstance(buffer, mmap.mmap):
+                buffer.close()
+
+        node_spans = np.frombuffer(node_spans, dtype=np.int64).reshape(-1, 3).copy() if len(node_spans) > 0 else np.zeros((0, 3), dtype=np.int64)
+        sources = np.frombuffer(sources, dtype=np.int32)
+        destinations = np.frombuffer(destinations, dtype=np.int32)
+        # number the states as `DynamicModel.from_graph` does (the declared states in the order of their node statements,
+        # then the other sources and destinations of the edges), so both models give the same DOT text and render cache key
+        order = list(dict.fromkeys(node_spans[:, 0].tolist() + sources.tolist() + destinations.tolist()))
+        new_ids = np.empty(len(state_names), dtype=np.int64)
+        new_ids[order] = np.arange(len(order))
+        node_spans[:, 0] = new_ids[node_spans[:, 0]]
+        declared_states = np.zeros(len(state_names), dtype=bool)
+        declared_states[node_spans[:, 0]] = True
+        return cls(model_path, node_spans, [state_names[state] for state in order], declared_states,
+                   new_ids[sources].astype(np.int32), new_ids[destinations].astype(np.int32),
+                   np.frombuffer(symbols, dtype=np.int32), np.frombuffer(frequencies, dtype=np.int64), alphabet)
+
+    def load_node_attributes(self):
+        """
+        Parse the attributes of the node statements (widths, pen widths and shapes) from the model file.
+        """
+        if self.node_attributes_loaded:
+            return
+        buffer = open_model_buffer(self.model_path)
+        try:
+            for state, start, end in self.node_spans:
+                if start < 0:
+                    continue
+                attributes = dict(ATTRIBUTE_REGEX.findall(buffer[start:end].decode('utf-8')))
+                if 'width' in attributes:
+                    self.state_widths[state] = float(strip_quotes(attributes['width']))
+                if 'penwidth' in attributes:
+                    self.state_penwidths[state] = float(strip_quotes(attributes['penwidth']))
+                if strip_quotes(attributes.get('shape', '')) == 'box':
+                    self.box_states.add(int(state))
+        finally:
+            if isinstance(buffer, mmap.mmap):
+                buffer.close()
+        self.node_attributes_loaded = True
+
+    def get_edge_attributes(self, index: int) -> dict:
+        self.load_node_attributes()
+        return super().get_edge_attributes(index)
+
+    def get_node_attributes(self, state: int) -> dict:
+        self.load_node_attributes()
+        return super().get_node_attributes(state)
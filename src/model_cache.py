@@ -0,0 +1,163 @@
+import hashlib
+import json
+import os
+import pickle
+
+CACHE_VERSION = 6 # Version of the cached model format, entries of other versions are ignored
+INDEX_FILE_NAME = 'index.json' # File that stores the size, mtime and content hash of each model file seen before
+ENTRY_SUFFIX = '.pickle'
+
+
+def compute_file_hash(file_path: str) -> str:
+    """
+    Compute the SHA-256 hash of the content of a file. The file is read in chunks to keep memory usage low.
+
+    :param file_path: The path to the file.
+    """
+    sha = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def write_atomically(file_path: str, data: bytes):
+    """
+    Write data to a file via a temporary file, so that readers never see a partially written file.
+
+    :param file_path: The path to the file.
+    :param data: The data that is written.
+    """
+    temp_path = file_path + '.' + str(os.getpid()) + '.tmp'
+    with open(temp_path, 'wb') as f:
+        f.write(data)
+    os.replace(temp_path, file_path)
+
+
+def evict_least_recently_used(cache_folder: str, entry_suffix: str, max_size: int):
+    """
+    Remove the least recently used entries of a cache folder until their total size is below the maximum size.
+    The modification time of an entry marks when it was last used.
+
+    :param cache_folder: The folder in which the cache entries are stored.
+    :param entry_suffix: The suffix of the entry files, other files in the folder are ignored.
+    :param max_size: The maximum total size of the entries in bytes.
+    """
+    entries = []
+    for file_name in os.listdir(cache_folder):
+        if file_name.endswith(entry_suffix):
+            try:
+                stat = os.stat(os.path.join(cache_folder, file_name))
+            except FileNotFoundError: # removed by another process in the meantime
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, file_name))
+    total_size = sum(entry[1] for entry in entries)
+    for _, size, file_name in sorted(entries):
+        if total_size <= max_size:
+            break
+        try:
+            os.remove(os.path.join(cache_folder, file_name))
+        except FileNotFoundError:
+            pass
+        total_size -= size
+
+
+class ModelCache:
+    """
+    Persistent on-disk cache of parsed (and cleaned) dynamic models. An entry is identified by the
+    content hash of the model file, so a model that is checked out again (new mtime, same content)
+    is still found. To avoid hashing files on every lookup, the index stores the size, mtime and
+    hash per model file path; the hash is only recomputed when the size or mtime changed.
+    Entries are evicted in least-recently-used order once the cache grows beyond its maximum size.
+    """
+
+    def __init__(self, cache_folder: str, max_size_mb: float = 512):
+        """
+        :param cache_folder: The folder in which the cache entries are stored.
+        :param max_size_mb: The maximum total size of the cache entries in megabytes.
+        """
+        self.cache_folder = cache_folder
+        self.max_size = int(max_size_mb * 1024 * 1024)
+        os.makedirs(cache_folder, exist_ok=True)
+        self.index_path = os.path.join(cache_folder, INDEX_FILE_NAME)
+        self.index = self.load_index()
+
+    def load_index(self) -> dict:
+        if not os.path.exists(self.index_path):
+            return {}
+        try:
+            with open(self.index_path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save_index(self):
+        write_atomically(self.index_path, json.dumps(self.index).encode('utf-8'))
+
+    def get_content_hash(self, model_path: str) -> str:
+        """
+        Get the content hash of a model file. The hash is taken from the index when the path, size and
+        mtime of the file did not change, otherwise it is recomputed and the index is updated.
+
+        :param model_path: The path to the model file.
+        """
+        absolute_path = os.path.abspath(model_path)
+        stat = os.stat(absolute_path)
+        known = self.index.get(absolute_path)
+        if known is not None and known['size'] == stat.st_size and known['mtime'] == stat.st_mtime_ns:
+            return known['hash']
+        content_hash = compute_file_hash(absolute_path)
+        self.index[absolute_path] = {'size': stat.st_size, 'mtime': stat.st_mtime_ns, 'hash': content_hash}
+        self.save_index()
+        return content_hash
+
+    def get_entry_path(self, model_path: str, variant: str) -> str:
+        return os.path.join(self.cache_folder, self.get_content_hash(model_path) + '_' + variant + '_v' + str(CACHE_VERSION) + ENTRY_SUFFIX)
+
+    def get(self, model_path: str, variant: str = 'raw'):
+        """
+        Get the cached model for a model file, or None if the model is not in the cache.
+
+        :param model_path: The path to the model file.
+        :param variant: The variant of the model, e.g. `raw` for the parsed model or `cleaned` for the cleaned model.
+        """
+        entry_path = self.get_entry_path(model_path, variant)
+        if not os.path.exists(entry_path):
+            return None
+        try:
+            with open(entry_path, 'rb') as f:
+                model = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+            return None
+        os.utime(entry_path) # mark the entry as recently used
+        return model
+
+    def put(self, model_path: str, model, variant: str = 'raw'):
+        """
+        Store a model in the cache and evict old entries if the cache became too large.
+
+        :param model_path: The path to the model file the model was loaded from.
+        :param model: The parsed (or cleaned) model.
+        :param variant: The variant of the model, e.g. `raw` for the parsed model or `cleaned` for the cleaned model.
+        """
+        write_atomically(self.get_entry_path(model_path, variant), pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL))
+        self.evict()
+
+    def evict(self):
+        """
+        Remove the least recently used entries until the total size of the cache is below its maximum size.
+        """
+        evict_least_recently_used(self.cache_folder, ENTRY_SUFFIX, self.max_size)
+
+
+def create_model_cache(config: dict):
+    """
+    Create the model cache based on the configuration. The cache is disabled (None is returned) if no
+    cache folder is configured.
+
+    :param config: The configuration of CATMA.
+    """
+    cache_folder = config.get('model_cache_folder')
+    if not cache_folder:
+        return None
+    return ModelCache(cache_folder, config.get('model_cache_max_size_mb', 512))
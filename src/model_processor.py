@@ -1,14 +1,15 @@
-from src.utils import collect_dynamic_model, clean_dynamic_model
+from src.utils import collect_dynamic_model, clean_dynamic_model, select_dynamic_model_file
+from src.static_model import StaticModel
+from src.service_registry import ServiceRegistry
 import json
 
 
-def read_static_model(static_model_path: str) -> dict:
+def read_static_model(static_model_path: str) -> StaticModel:
     """
     This function is used to read evidences that are collected by the static model. It first loads the 
     JSON file. Then, it processes the evidences extraced by the static model (DFD model from TUHH).
-    Evidences are parsed and stored in the corresponding dictionary; evidences collected from services
-    are store in the service_evidence dictionary and evidences collected from links are stored in the
-    link_evidences dictionary.
+    Evidences collected from links are stored per link in a StaticModel, which indexes them for the
+    later stages. The services and links are interned once here in the service registry of the model.
 
     :param evidence_file: The path to the JSON file containing the evidences.
     """
@@ -16,25 +17,40 @@ def read_static_model(static_model_path: str) -> dict:
     with open(static_model_path, 'r') as f:
         static_model = json.load(f)
 
+    service_registry = ServiceRegistry()
     link_evidences = dict()
     links = static_model['edges']
     for l in links:
-        services = [x.replace('-','_') for x in l.split(' -> ')]
-        link_name = '-'.join(services).lower()
+        source, destination = l.split(' -> ')
+        link_name = service_registry.get_static_link_name(service_registry.add_link(service_registry.add_service(source), service_registry.add_service(destination)))
         link_evidences[link_name] = []
         file = links[l]['file'].replace('blob/master/master', 'blob/master')
         line = links[l]['line']
         link_evidences[link_name].append(('Link', file, line))
 
-    return {'links' : link_evidences}
+    return StaticModel(link_evidences, service_registry)
 
-def read_dynamic_model(dynamic_models_path: str):
+def read_dynamic_model(dynamic_models_path: str, model_format: str = None, model_cache = None, lazy: bool = False):
     """
-    This function is used to read the dynamic model. The dynamic model is read using the pydot library.
+    This function is used to read the dynamic model. The dynamic model is read using the FlexFringe DOT parser,
+    or directly from the JSON companion file written by FlexFringe if the `json` format is selected. If a model
+    cache is given, the cleaned model is stored in the cache and taken from there on the next run.
 
     :param dynamic_models_path: The path to the folder containing the dynamic model.
+    :param model_format: The format of the dynamic model that should be read, either `dot` or `json`. If None, the format follows from the path.
+    :param model_cache: The (optional) cache of parsed dynamic models.
+    :param lazy: If True, the model is indexed from the memory-mapped DOT file and the attributes of its states are parsed on demand.
     """
-    return clean_dynamic_model(collect_dynamic_model(dynamic_models_path))
+    dynamic_model_path = select_dynamic_model_file(dynamic_models_path, model_format)
+    if model_cache is not None:
+        dynamic_model = model_cache.get(dynamic_model_path, 'cleaned')
+        if dynamic_model is not None:
+            return dynamic_model
+
+    dynamic_model = clean_dynamic_model(collect_dynamic_model(dynamic_model_path, lazy=lazy))
+    if model_cache is not None:
+        model_cache.put(dynamic_model_path, dynamic_model, 'cleaned')
+    return dynamic_model
     
 
 # Testing purposes
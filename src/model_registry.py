@@ -0,0 +1,127 @@
+from src.model_processor import read_dynamic_model
+from src.utils import select_dynamic_model_file
+from concurrent.futures import ProcessPoolExecutor
+import os
+
+
+class ModelRegistry:
+    """
+    Run-scoped registry of the dynamic models used by CATMA. Every model file is loaded and cleaned
+    only once per run, all stages that need the model get the same (cleaned) instance. The registry
+    also keeps track of the models that have already been rendered to SVG, so a model that is involved
+    in multiple non-conformances is only rendered once. The models are released by `close` when the run
+    is finished, the registry can also be used as a context manager for this.
+    """
+
+    def __init__(self, model_format: str = None, model_cache = None, executor = None, render_pool = None):
+        """
+        :param model_format: The format of the dynamic models that should be read, either `dot` or `json`.
+        :param model_cache: The (optional) persistent cache of parsed dynamic models.
+        :param executor: The (optional) process pool that is used to load the models, e.g. a pool that is shared between runs.
+        :param render_pool: The (optional) RenderPool that renders the models in the background, by default they are rendered inline.
+        """
+        self.model_format = model_format
+        self.model_cache = model_cache
+        self.executor = executor
+        self.render_pool = render_pool
+        self.models = {}
+        self.rendered_models = set()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    def resolve_model_path(self, model_path: str) -> str:
+        return select_dynamic_model_file(model_path, self.model_format)
+
+    def get_model(self, model_path: str, required: bool = True, lazy: bool = False):
+        """
+        Get the cleaned dynamic model stored at the given path. The model is loaded on the first request.
+
+        :param model_path: The path to the dynamic model.
+        :param required: If True, a FileNotFoundError is raised when the model does not exist, otherwise None is returned.
+        :param lazy: If True, the model is indexed from the memory-mapped DOT file and the attributes of its states are parsed on demand.
+        """
+        model_path = self.resolve_model_path(model_path)
+        if model_path not in self.models:
+            if os.path.exists(model_path):
+                self.models[model_path] = read_dynamic_model(model_path, model_cache=self.model_cache, lazy=lazy)
+            else:
+                self.models[model_path] = None
+
+        dynamic_model = self.models[model_path]
+        if dynamic_model is None and required:
+            raise FileNotFoundError('No dynamic model found at ' + model_path)
+        return dynamic_model
+
+    def prefetch(self, model_paths: list, max_workers: int = None):
+        """
+        Load all given models at once, so the later stages of the run take them directly from the registry.
+        The models are parsed and cleaned in a process pool, models that were already loaded or that do not
+        exist are skipped. The shared process pool of the registry is used if it has one, otherwise a pool is
+        created for this call; with a single worker (or a single model) the models are loaded in this process.
+
+        :param model_paths: The paths to the dynamic models that will be needed in the run.
+        :param max_workers: The maximum number of worker processes, by default the number of CPUs.
+        """
+        pending_paths = []
+        for model_path in model_paths:
+            model_path = self.resolve_model_path(model_path)
+            if model_path in self.models or model_path in pending_paths:
+                continue
+            if not os.path.exists(model_path):
+                self.models[model_path] = None
+                continue
+            pending_paths.append(model_path)
+
+        if self.executor is not None and len(pending_paths) > 1:
+            self.load_models(self.executor, pending_paths)
+            return
+
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
+        max_workers = min(max_workers, len(pending_paths))
+        if max_workers <= 1:
+            for model_path in pending_paths:
+                self.models[model_path] = read_dynamic_model(model_path, model_cache=self.model_cache)
+            return
+
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            self.load_models(executor, pending_paths)
+
+    def load_models(self, executor, model_paths: list):
+        """
+        Load the given models in the worker processes of a process pool.
+
+        :param executor: The process pool.
+        :param model_paths: The (resolved) paths to the dynamic models.
+        """
+        loaded_models = executor.map(read_dynamic_model, model_paths, [None] * len(model_paths), [self.model_cache] * len(model_paths))
+        for model_path, dynamic_model in zip(model_paths, loaded_models):
+            self.models[model_path] = dynamic_model
+
+    def release(self, model_paths: list):
+        """
+        Release the given models, e.g. once the non-conformances that need them are interpreted. A model that
+        is requested again afterwards is loaded again (from the model cache, if there is one).
+
+        :param model_paths: The paths to the dynamic models.
+        """
+        for model_path in model_paths:
+            self.models.pop(self.resolve_model_path(model_path), None)
+
+    def is_rendered(self, svg_path: str) -> bool:
+        return svg_path in self.rendered_models
+
+    def mark_rendered(self, svg_path: str):
+        self.rendered_models.add(svg_path)
+
+    def close(self):
+        """
+        Release all models held by the registry.
+        """
+        self.models.clear()
+        self.rendered_models.clear()
@@ -1,64 +1,117 @@
-from src.utils import extract_link_from_transition_label
-from tqdm import tqdm
+from src.service_registry import ServiceRegistry
+import numpy as np
+
+
+def extract_link_pairs_from_dynamic_model(dynamic_model, service_registry: ServiceRegistry, service_ids: np.ndarray = None) -> np.ndarray:
+    """
+    Extract the occurred links from the dynamic model as (source, destination) pairs of service ids.
+    The services of every symbol in the alphabet are looked up once in the registry, afterwards the
+    pairs of the symbols that occur on the transitions are selected with array operations. Links with
+    a service that is not registered (or not in `service_ids`) are left out.
+
+    :param dynamic_model: The dynamic model extracted from runtime logs.
+    :param service_registry: The registry of the services.
+    :param service_ids: The (optional) ids of the services whose links are extracted, by default all registered services.
+    """
+    pairs = service_registry.find_label_pairs(dynamic_model.labels)[dynamic_model.get_present_symbols()]
+    pairs = pairs[(pairs >= 0).all(axis=1)]
+    if service_ids is not None:
+        pairs = pairs[np.isin(pairs, service_ids).all(axis=1)]
+    return np.unique(pairs, axis=0)
+
+
+def extract_link_pairs_from_links(links, service_registry: ServiceRegistry) -> np.ndarray:
+    """
+    Convert links in the format `src-dst` into (source, destination) pairs of service ids. Services
+    that are not known yet are added to the registry.
+
+    :param links: The links in the format `src-dst`.
+    :param service_registry: The registry of the services.
+    """
+    pairs = [service_registry.get_link_pair(service_registry.add_static_link(link)) for link in links]
+    return np.array(pairs, dtype=np.int64).reshape(-1, 2)
+
+
+def compute_link_matrix(pairs: np.ndarray, num_services: int) -> np.ndarray:
+    """
+    Compute the services x services boolean matrix of the links, `matrix[src, dst]` is True if the link occurs.
+
+    :param pairs: The links as (source, destination) pairs of service ids.
+    :param num_services: The number of services.
+    """
+    matrix = np.zeros((num_services, num_services), dtype=bool)
+    matrix[pairs[:, 0], pairs[:, 1]] = True
+    return matrix
+
+
+def find_non_conformance_in_link_matrices(this_matrix: np.ndarray, that_matrix: np.ndarray) -> np.ndarray:
+    """
+    Find the links of the first matrix that occur in neither direction in the second matrix. The
+    non-conformances are returned as (source, destination) pairs of service ids.
+
+    :param this_matrix: The link matrix of the first set of links.
+    :param that_matrix: The link matrix of the second set of links.
+    """
+    return np.argwhere(this_matrix & ~(that_matrix | that_matrix.T))
+
+
+def convert_link_pairs_to_links(pairs: np.ndarray, service_registry: ServiceRegistry) -> set:
+    """
+    Convert (source, destination) pairs of service ids back into links in the format `src-dst`.
+
+    :param pairs: The links as (source, destination) pairs of service ids.
+    :param service_registry: The registry of the services.
+    """
+    return {service_registry.get_static_link_name(service_registry.add_link(source, destination)) for source, destination in pairs.tolist()}
+
 
 def extract_occurred_links_from_dynamic_model(dynamic_model, services: list) -> set:
     """
     This function is used to extract occurred links from the dynamic model.
-    It basically goes through all the transitions in the dynamic model and 
-    generated a dictionary of the occurred links. 
+    It basically goes through all the symbols that occur on the transitions in
+    the dynamic model and generated a set of the occurred links.
 
-    :param dynamic_model: The dynamic model extracted from runtime logs. This model is a pydot graph.
+    :param dynamic_model: The dynamic model extracted from runtime logs. This model is a graph loaded by the FlexFringe DOT parser.
     :param services: The list of services in the microservice application.
     """
-    occurred_links = set()
-    for transition in dynamic_model.get_edges():
-        if transition.get_label() is None:
-            continue
-        link = extract_link_from_transition_label(transition.get_label())
-        splitted = link.split('-')
-        if splitted[0] not in services or splitted[1] not in services:
-            continue
-        occurred_links.add(link)
-
-    return occurred_links
+    service_registry = ServiceRegistry(services)
+    return convert_link_pairs_to_links(extract_link_pairs_from_dynamic_model(dynamic_model, service_registry), service_registry)
 
 def find_non_conformance_in_linkset(this_linkset: set, that_linkset: set) -> set:
     """
     This function is used to find non-conformance between two sets of links.
     It basically goes through all the links in the first set and checks whether
-    the links are also in the second set.
+    the links (or their reverse) are also in the second set.
 
     :param this_linkset: The first set of links
     :param that_linkset: The second set of links
     """
-    non_conformances = set()
-    for link in tqdm(this_linkset, desc='Detecting non-conformances'):
-        splitted = link.split('-')
-        reverse_link = splitted[1] + '-' + splitted[0]
-        if link in that_linkset or reverse_link in that_linkset:
-            continue
-        else:
-            non_conformances.add(link)
-    
-    return non_conformances
+    service_registry = ServiceRegistry()
+    this_pairs = extract_link_pairs_from_links(this_linkset, service_registry)
+    that_pairs = extract_link_pairs_from_links(that_linkset, service_registry)
+    non_conformances = find_non_conformance_in_link_matrices(compute_link_matrix(this_pairs, len(service_registry)), compute_link_matrix(that_pairs, len(service_registry)))
+    return convert_link_pairs_to_links(non_conformances, service_registry)
+
 
-        
-def detect_non_conformances(static_model: dict, dynamic_model, services: list):
+def detect_non_conformances(static_model, dynamic_model, services: list):
     """
     This function is used to detect differences (non-conformances)
     between the static and dynamic model extracted for a microservice
-    applications. It basically goes through all the link evidences in
-    the static model and checks whether the links occur in the dynamic model (and vice versa)
+    applications. The services and links are interned in the service registry
+    of the static model, the links of both models are stored in a services x
+    services matrix, so the links that are missing in the other model (in
+    both directions) are found with a few matrix operations.
 
     :param static_model: The static model extracted from the source code of the microservice application
-    :param dynamic_model: The dynamic model extracted from run-time logs. This model is pydot graph.
+    :param dynamic_model: The dynamic model extracted from run-time logs. This model is a graph loaded by the FlexFringe DOT parser.
     :param services: The list of services in the microservice application
-    """ 
-    static_links = static_model['links']
-    processed_services = [x.replace('-', '_') for x in services]
-    dynamic_links = extract_occurred_links_from_dynamic_model(dynamic_model, processed_services)
-    dynamic_non_conformances = find_non_conformance_in_linkset(static_links, dynamic_links)
-    static_non_conformances = find_non_conformance_in_linkset(dynamic_links, static_links)
+    """
+    service_registry = static_model.service_registry
+    # only the links between the configured services are taken from the dynamic model
+    service_ids = np.array([service_registry.add_service(service) for service in services], dtype=np.int64)
+    dynamic_pairs = extract_link_pairs_from_dynamic_model(dynamic_model, service_registry, service_ids)
+    static_matrix = compute_link_matrix(static_model.link_pairs, len(service_registry))
+    dynamic_matrix = compute_link_matrix(dynamic_pairs, len(service_registry))
+    dynamic_non_conformances = convert_link_pairs_to_links(find_non_conformance_in_link_matrices(static_matrix, dynamic_matrix), service_registry)
+    static_non_conformances = convert_link_pairs_to_links(find_non_conformance_in_link_matrices(dynamic_matrix, static_matrix), service_registry)
     return static_non_conformances, dynamic_non_conformances
-
-
@@ -1,7 +1,27 @@
-import plantuml
+from src.dot_parser import write_dot_text
+import subprocess
 
+DEFAULT_DIAGRAM_BACKEND = 'graphviz' # Backend that renders the architecture diagram, see `DIAGRAM_BACKENDS`
+DEFAULT_DIAGRAM_TIMEOUT = 30 # Maximal number of seconds the rendering of the architecture diagram may take
+DEFAULT_PLANTUML_SERVER_URL = 'http://www.plantuml.com/plantuml/img/'
+DOT_GRAPH_DEFAULTS = '    graph[fontname = "Arial" fontsize = 11]\n    node[fontname = "Arial" fontsize = 11]\n    edge[fontname = "Arial" fontsize = 11]\n' # Same font as the skinparams of the PlantUML header
 
-def visualize_non_conformances(static_non_conformances: set, dynamic_non_conformances: set, output_folder: str, processed_static_model: dict) -> int:
+
+def get_diagram_settings(config: dict) -> dict:
+    """
+    Get the settings of the architecture diagram from the configuration, missing fields get their default value.
+
+    :param config: The configuration of CATMA.
+    """
+    return {
+        'backend': config.get('diagram_backend', DEFAULT_DIAGRAM_BACKEND),
+        'timeout': config.get('diagram_timeout', DEFAULT_DIAGRAM_TIMEOUT),
+        'plantuml_jar_path': config.get('plantuml_jar_path'),
+        'plantuml_server_url': config.get('plantuml_server_url', DEFAULT_PLANTUML_SERVER_URL)
+    }
+
+
+def visualize_non_conformances(static_non_conformances: set, dynamic_non_conformances: set, output_folder: str, processed_static_model, diagram_settings: dict = None, render_pool = None) -> int:
     """
     Visualizes found non-conformances by creating a graph of the architecture where non-conformances are highlighted in color.
 
@@ -9,25 +29,16 @@ def visualize_non_conformances(static_non_conformances: set, dynamic_non_conform
     :param dynamic_non_conformances: The set of non-conformances found by comparing the dynamic model with the static model.
     :param output_folder: The path to the output folder where the visualization should be stored.
     :param processed_static_model: The static model that is processed by the model processor.
+    :param diagram_settings: The backend that renders the diagram and its options, see `get_diagram_settings`.
+    :param render_pool: The (optional) RenderPool that renders the diagram in the background (`graphviz` backend only).
     """
     # get complete architecture from `processed_static_model_evidences``
+    service_registry = processed_static_model.service_registry
+    nodes = {service_registry.get_service_name(service_id) for service_id in processed_static_model.link_pairs.flatten().tolist()}
 
-    links_detected_by_both = set()
-    nodes = set()
-
-    # parse all links from the static model as basis for all links detected by both
-    for link in processed_static_model["links"].keys():
-        links_detected_by_both.add(link)
-        nodes.add(link.split("-")[0])
-        nodes.add(link.split("-")[1])
-    
+    # parse all links from the static model as basis for all links detected by both,
     # remove those that are non-conformances -> only links detected by both are left
-    for link in static_non_conformances:
-        if link in links_detected_by_both:
-            links_detected_by_both.remove(link)
-    for link in dynamic_non_conformances:
-        if link in links_detected_by_both:
-            links_detected_by_both.remove(link)
+    links_detected_by_both = set(processed_static_model.links.keys()) - set(static_non_conformances) - set(dynamic_non_conformances)
 
 
     plantuml_str = add_header("")
@@ -37,20 +48,20 @@ def visualize_non_conformances(static_non_conformances: set, dynamic_non_conform
 
 
     for link in links_detected_by_both:
-        plantuml_link = link.replace("-", " -> ")
+        plantuml_link = " -> ".join(service_registry.split_static_link(link))
         plantuml_str += f"\n        {plantuml_link} [color = \"black\"]"
 
     for link in static_non_conformances:
-        plantuml_link = link.replace("-", " -> ")
+        plantuml_link = " -> ".join(service_registry.split_static_link(link))
         plantuml_str += f"\n        {plantuml_link} [color = \"#D55E00\", style = \"dashed\"]"
 
     for link in dynamic_non_conformances:
-        plantuml_link = link.replace("-", " -> ")
+        plantuml_link = " -> ".join(service_registry.split_static_link(link))
         plantuml_str += f"\n        {plantuml_link} [color = \"#0072B2\", style = \"dotted\"]"
 
     plantuml_str = add_footer(plantuml_str)
 
-    write_output(plantuml_str, output_folder)
+    write_output(plantuml_str, output_folder, diagram_settings, render_pool)
     #print(plantuml_str)
     return 0
 
@@ -89,13 +100,70 @@ def add_footer(plantuml_str: str) -> str:
 """
     return plantuml_str
 
-def write_output(plantuml_str, output_folder: str):
+def convert_plantuml_to_dot(plantuml_str: str) -> str:
+    """
+    Convert the PlantUML file into a graph in the DOT format. The diagram is a `digraph` embedded in PlantUML,
+    so the graph is taken as it is and only the font of the skinparams is added to it.
+
+    :param plantuml_str: The PlantUML file of the diagram.
+    """
+    graph_start = plantuml_str.index('digraph')
+    body_start = plantuml_str.index('\n', plantuml_str.index('{', graph_start)) + 1
+    graph_end = plantuml_str.rindex('}') + 1
+    return plantuml_str[graph_start:body_start] + DOT_GRAPH_DEFAULTS + plantuml_str[body_start:graph_end] + '\n'
+
+
+def render_diagram_with_graphviz(plantuml_path: str, plantuml_str: str, diagram_settings: dict, render_pool = None):
+    """
+    Render the diagram locally with Graphviz, in the background if a render pool is given.
+    """
+    png_path = plantuml_path[:-len('.txt')] + '.png'
+    dot_text = convert_plantuml_to_dot(plantuml_str)
+    if render_pool is not None:
+        render_pool.submit(dot_text, png_path, 'png')
+    else:
+        write_dot_text(dot_text, png_path, 'png', timeout=diagram_settings['timeout'])
+
+
+def render_diagram_with_plantuml_jar(plantuml_path: str, plantuml_str: str, diagram_settings: dict, render_pool = None):
+    """
+    Render the diagram locally with the PlantUML jar at `plantuml_jar_path`, the PNG is written next to the PlantUML file.
+    """
+    if not diagram_settings['plantuml_jar_path']:
+        raise ValueError('No plantuml_jar_path configured')
+    subprocess.run(['java', '-jar', diagram_settings['plantuml_jar_path'], '-tpng', plantuml_path], check=True, timeout=diagram_settings['timeout'])
+
+
+def render_diagram_with_plantuml_server(plantuml_path: str, plantuml_str: str, diagram_settings: dict, render_pool = None):
+    """
+    Render the diagram with the PlantUML server at `plantuml_server_url`, note that this sends the architecture to the server.
+    """
+    import plantuml # only needed for this backend
+    generator = plantuml.PlantUML(url = diagram_settings['plantuml_server_url'], http_opts = {'timeout': diagram_settings['timeout']})
+    if not generator.processes_file(filename = plantuml_path):
+        raise RuntimeError('No image generated by the PlantUML server')
+
+
+# Backends that render the PlantUML file of the diagram to a PNG, with `none` only the PlantUML file is written
+DIAGRAM_BACKENDS = {
+    'graphviz': render_diagram_with_graphviz,
+    'plantuml_jar': render_diagram_with_plantuml_jar,
+    'plantuml_server': render_diagram_with_plantuml_server,
+    'none': None
+}
+
+
+def write_output(plantuml_str, output_folder: str, diagram_settings: dict = None, render_pool = None):
     """
-    Writes PlantUML to file and calls PlantUML server to generate PNG.
+    Writes PlantUML to file and renders it to a PNG with the configured backend.
 
     :param plantuml_str: The string that should be written to file and used to generate the PNG.
     :param output_folder: The path to the output folder where the visualization should be stored.
+    :param diagram_settings: The backend that renders the diagram and its options, see `get_diagram_settings`.
+    :param render_pool: The (optional) RenderPool that renders the diagram in the background.
     """ 
+    if diagram_settings is None:
+        diagram_settings = get_diagram_settings({})
 
     output_file_path = f"{output_folder}visualization/plantuml.txt"
 
@@ -104,10 +172,12 @@ def write_output(plantuml_str, output_folder: str):
         output_file.write(plantuml_str)
 
     # generate PNG
-    generator = plantuml.PlantUML(url = "http://www.plantuml.com/plantuml/img/")
+    render_diagram = DIAGRAM_BACKENDS[diagram_settings['backend']]
+    if render_diagram is None:
+        return 0
     try:
-        png = generator.processes_file(filename = output_file_path)
-    except Exception:
-        print("No connection to the PlantUML server possible or malformed input to the server.")
+        render_diagram(output_file_path, plantuml_str, diagram_settings, render_pool)
+    except Exception as e:
+        print("The architecture diagram could not be rendered with the " + diagram_settings['backend'] + " backend: " + str(e))
         
     return 0
\ No newline at end of file
@@ -0,0 +1,131 @@
+import numpy as np
+
+DEFAULT_NUMBER_OF_WALKS = 1000 # Number of random walks over the dynamic model
+DEFAULT_WALK_LENGTH = 20 # Maximal number of transitions of a walk (trace) through the dynamic model
+DEFAULT_MISSING_MASS_THRESHOLD = 0.01 # Adaptive sampling stops once the estimated probability of an unseen path is below this threshold
+DEFAULT_MAX_NUMBER_OF_WALKS = 100000 # Maximal number of walks of the adaptive sampling
+WALK_BATCH_SIZE = 100 # Number of walks that is done at once by the adaptive sampling
+WALKS_PER_TRANSITION = 10 # Budget of walks of the adaptive sampling per transition of the model (at least `number_of_walks`)
+
+
+def get_random_walk_settings(config: dict) -> dict:
+    """
+    Get the settings of the random walks from the configuration, missing fields get their default value.
+
+    :param config: The configuration of CATMA.
+    """
+    return {
+        'number_of_walks': config.get('number_of_walks', DEFAULT_NUMBER_OF_WALKS),
+        'walk_length': config.get('walk_length', DEFAULT_WALK_LENGTH),
+        'seed': config.get('random_seed'),
+        'frequency_weighted': config.get('frequency_weighted_walks', False),
+        'adaptive': config.get('adaptive_walks', True),
+        'missing_mass_threshold': config.get('missing_mass_threshold', DEFAULT_MISSING_MASS_THRESHOLD),
+        'max_number_of_walks': config.get('max_number_of_walks', DEFAULT_MAX_NUMBER_OF_WALKS)
+    }
+
+
+def create_random_generator(seed: int = None, stream: int = 0) -> np.random.Generator:
+    """
+    Create the random generator of an independent stream. All streams are derived from the same seed, so a
+    task that uses stream `i` draws the same numbers in every run, regardless of the process it runs in.
+
+    :param seed: The seed given by the user, if None the generator is seeded from the entropy of the OS.
+    :param stream: The index of the stream, e.g. the index of the task.
+    """
+    return np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(stream,)))
+
+
+def do_batched_random_walks(offsets: np.ndarray, destinations: np.ndarray, start_state: int, number_of_walks: int, walk_length: int, random_generator: np.random.Generator, probabilities: np.ndarray = None) -> np.ndarray:
+    """
+    Do random walks over a graph in CSR form, all walks advance together one step at a time. A walk stops when
+    it reaches a state without outgoing transitions (absorbing state). The next transition is chosen uniformly,
+    or according to the given transition probabilities.
+
+    :param offsets: The CSR offsets, the outgoing transitions of state `s` are `offsets[s]` up to `offsets[s + 1]`.
+    :param destinations: The destination state of every transition.
+    :param start_state: The state in which every walk starts.
+    :param number_of_walks: The number of walks.
+    :param walk_length: The maximal number of transitions of each walk.
+    :param random_generator: The random generator that is used.
+    :param probabilities: The (optional) probability of every transition given its source state.
+    """
+    walks = np.full((number_of_walks, walk_length), -1, dtype=np.int64)
+    current_states = np.full(number_of_walks, start_state, dtype=np.int64)
+    active = np.ones(number_of_walks, dtype=bool)
+    if probabilities is not None:
+        cumulative_probabilities = np.cumsum(probabilities)
+
+    for step in range(walk_length):
+        first_edges = offsets[current_states]
+        out_degrees = offsets[current_states + 1] - first_edges
+        active &= out_degrees > 0
+        if not active.any():
+            break
+        first_edges, out_degrees = first_edges[active], out_degrees[active]
+        draws = random_generator.random(len(first_edges))
+        if probabilities is None:
+            selected_edges = first_edges + np.minimum((draws * out_degrees).astype(np.int64), out_degrees - 1)
+        else:
+            # the probabilities of the outgoing transitions of a state sum to one, so we search in the cumulative sum
+            row_starts = cumulative_probabilities[first_edges] - probabilities[first_edges]
+            selected_edges = np.searchsorted(cumulative_probabilities, row_starts + draws, side='right')
+            selected_edges = np.clip(selected_edges, first_edges, first_edges + out_degrees - 1)
+        walks[active, step] = selected_edges
+        current_states[active] = destinations[selected_edges]
+
+    return walks
+
+
+def compute_walk_budget(number_of_edges: int, number_of_walks: int, max_number_of_walks: int) -> int:
+    """
+    Compute the maximal number of walks of the adaptive sampling for a model, larger models get a larger budget.
+
+    :param number_of_edges: The number of transitions of the model.
+    :param number_of_walks: The minimal budget.
+    :param max_number_of_walks: The maximal budget.
+    """
+    return max(min(WALKS_PER_TRANSITION * number_of_edges, max_number_of_walks), min(number_of_walks, max_number_of_walks))
+
+
+def do_adaptive_random_walks(offsets: np.ndarray, destinations: np.ndarray, edge_tokens: np.ndarray, start_state: int, walk_length: int, random_generator: np.random.Generator, max_number_of_walks: int, missing_mass_threshold: float, probabilities: np.ndarray = None) -> tuple:
+    """
+    Do random walks in batches until the sampled paths saturate. Paths are identified by the tokens (e.g. the
+    links) of their transitions. After every batch the probability that the next walk gives an unseen path is
+    estimated with the Good-Turing estimate of the missing mass: the number of paths seen exactly once divided
+    by the number of walks. Sampling stops once this estimate is at most `missing_mass_threshold`, or when
+    `max_number_of_walks` walks were done.
+
+    :param offsets: The CSR offsets, the outgoing transitions of state `s` are `offsets[s]` up to `offsets[s + 1]`.
+    :param destinations: The destination state of every transition.
+    :param edge_tokens: The token of every transition that identifies the paths.
+    :param start_state: The state in which every walk starts.
+    :param walk_length: The maximal number of transitions of each walk.
+    :param random_generator: The random generator that is used.
+    :param max_number_of_walks: The maximal number of walks.
+    :param missing_mass_threshold: The estimated missing mass at which the sampling stops.
+    :param probabilities: The (optional) probability of every transition given its source state.
+    """
+    batches = []
+    path_counts = {}
+    number_of_walks = 0
+    number_of_singletons = 0
+    missing_mass = 1.0
+    while number_of_walks < max_number_of_walks:
+        batch = do_batched_random_walks(offsets, destinations, start_state, min(WALK_BATCH_SIZE, max_number_of_walks - number_of_walks), walk_length, random_generator, probabilities)
+        batches.append(batch)
+        for walk in batch:
+            key = edge_tokens[walk[walk >= 0]].tobytes()
+            count = path_counts.get(key, 0) + 1
+            path_counts[key] = count
+            if count == 1:
+                number_of_singletons += 1
+            elif count == 2:
+                number_of_singletons -= 1
+        number_of_walks += len(batch)
+        missing_mass = number_of_singletons / number_of_walks
+        if missing_mass <= missing_mass_threshold:
+            break
+
+    coverage = {'number_of_walks': number_of_walks, 'unique_paths': len(path_counts), 'estimated_coverage': 1.0 - missing_mass}
+    return np.concatenate(batches), coverage
@@ -0,0 +1,274 @@
+from src.dot_parser import write_dot_text
+from src.model_cache import write_atomically, evict_least_recently_used
+from concurrent.futures import ThreadPoolExecutor, Future
+import hashlib
+import os
+import shutil
+import subprocess
+import threading
+
+DEFAULT_RENDER_TIMEOUT = 300 # Maximal number of seconds Graphviz may take to render a single model
+RENDER_CACHE_VERSION = 1 # Version of the cached renderings, entries of other versions are ignored
+
+
+def render_dot_text(dot_text: str, path: str, format: str = 'svg', prog: str = 'dot', timeout: float = None):
+    """
+    Render a graph in the DOT format with Graphviz. The output is written to a temporary file that replaces
+    the file at the given path once the rendering succeeded, so a failed (or timed out) rendering never
+    leaves a partial file behind.
+
+    :param dot_text: The graph in the DOT format.
+    :param path: The path of the file the graph is rendered to.
+    :param format: The output format, e.g. `svg`.
+    :param prog: The Graphviz program that is used for the rendering.
+    :param timeout: The maximal number of seconds the rendering may take, None for no limit.
+    """
+    temporary_path = path + '.tmp'
+    try:
+        write_dot_text(dot_text, temporary_path, format, prog, timeout)
+        os.replace(temporary_path, path)
+    finally:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+
+
+def compute_graph_hash(dot_text: str, format: str, prog: str) -> str:
+    """
+    Compute the content hash of a render job. The DOT text of a model contains its links to the code (as the
+    `href` attributes of its transitions), so the hash changes when either the model or its links change.
+
+    :param dot_text: The graph in the DOT format.
+    :param format: The output format, e.g. `svg`.
+    :param prog: The Graphviz program that is used for the rendering.
+    """
+    return hashlib.sha256((os.path.basename(prog) + '\n' + format + '\n' + dot_text).encode('utf-8')).hexdigest()
+
+
+class RenderCache:
+    """
+    Persistent on-disk cache of rendered models, shared between runs. An entry is identified by the content
+    hash of its render job (see `compute_graph_hash`), so Graphviz only runs for models (or links to the code)
+    that changed since a previous run. A cached file is hard-linked to the output path, or copied if the output
+    is on another file system. Entries are evicted in least-recently-used order once the cache grows beyond its
+    maximum size.
+    """
+
+    def __init__(self, cache_folder: str, max_size_mb: float = 256):
+        """
+        :param cache_folder: The folder in which the rendered files are stored.
+        :param max_size_mb: The maximum total size of the rendered files in megabytes.
+        """
+        self.cache_folder = cache_folder
+        self.max_size = int(max_size_mb * 1024 * 1024)
+        self.lock = threading.Lock() # entries are stored by the threads of the render pool
+        os.makedirs(cache_folder, exist_ok=True)
+
+    def get_entry_path(self, graph_hash: str, format: str) -> str:
+        return os.path.join(self.cache_folder, graph_hash + '_v' + str(RENDER_CACHE_VERSION) + '.' + format)
+
+    def restore(self, graph_hash: str, path: str, format: str = 'svg') -> bool:
+        """
+        Place the cached rendering of a graph at the given path, False is returned if the graph is not in the cache.
+
+        :param graph_hash: The content hash of the render job.
+        :param path: The path the rendered file should be placed at.
+        :param format: The output format, e.g. `svg`.
+        """
+        entry_path = self.get_entry_path(graph_hash, format)
+        if not os.path.exists(entry_path):
+            return False
+        temporary_path = path + '.tmp'
+        try:
+            if os.path.exists(path) and os.path.samefile(entry_path, path):
+                # already linked in a previous run, renaming a link over a link to the same file would do nothing
+                os.utime(entry_path)
+                return True
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+            try:
+                os.link(entry_path, temporary_path)
+            except OSError: # e.g. a cache folder on another file system
+                shutil.copyfile(entry_path, temporary_path)
+            os.replace(temporary_path, path)
+            os.utime(entry_path) # mark the entry as recently used
+        except OSError: # e.g. the entry was evicted in the meantime
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+            return False
+        return True
+
+    def store(self, graph_hash: str, path: str, format: str = 'svg'):
+        """
+        Store a rendered file in the cache and evict old entries if the cache became too large.
+
+        :param graph_hash: The content hash of the render job.
+        :param path: The path of the rendered file.
+        :param format: The output format, e.g. `svg`.
+        """
+        with open(path, 'rb') as f:
+            data = f.read()
+        with self.lock:
+            write_atomically(self.get_entry_path(graph_hash, format), data)
+            evict_least_recently_used(self.cache_folder, '_v' + str(RENDER_CACHE_VERSION) + '.' + format, self.max_size)
+
+
+def create_render_cache(config: dict):
+    """
+    Create the render cache based on the configuration. The cache is disabled (None is returned) if no
+    cache folder is configured.
+
+    :param config: The configuration of CATMA.
+    """
+    cache_folder = config.get('render_cache_folder')
+    if not cache_folder:
+        return None
+    return RenderCache(cache_folder, config.get('render_cache_max_size_mb', 256))
+
+
+def render_and_store(dot_text: str, path: str, format: str, prog: str, timeout: float, render_cache: RenderCache, graph_hash: str):
+    """
+    Render a graph and store the rendered file in the render cache.
+    """
+    render_dot_text(dot_text, path, format, prog, timeout)
+    render_cache.store(graph_hash, path, format)
+
+
+def copy_rendered_file(future, source_path: str, path: str):
+    """
+    Copy a rendered file once its rendering is finished, used for identical graphs that are rendered to multiple paths.
+
+    :param future: The future of the rendering of the source file.
+    :param source_path: The path of the rendered file.
+    :param path: The path the rendered file is copied to.
+    """
+    future.result()
+    # the file at the path may be a hard link to an entry of the render cache, so it is replaced instead of overwritten
+    shutil.copyfile(source_path, path + '.tmp')
+    os.replace(path + '.tmp', path)
+
+
+class RenderPool:
+    """
+    Background renderer of the dynamic models. Render jobs are queued and Graphviz is run for several jobs at
+    once (one thread per running Graphviz process), so the interpretations are generated while the models
+    render. Jobs are deduplicated: a path is rendered only once, and a graph that is identical to a graph that
+    was already queued is copied from its output instead of being laid out again. With a render cache, graphs
+    that were rendered in a previous run are taken from the cache. Every job has a timeout, a job that fails or
+    times out is reported by `wait` and does not stop the other jobs.
+    """
+
+    def __init__(self, max_workers: int = None, timeout: float = DEFAULT_RENDER_TIMEOUT, prog: str = 'dot', render_cache: RenderCache = None):
+        """
+        :param max_workers: The maximal number of Graphviz processes that run at once, by default the number of CPUs.
+        :param timeout: The maximal number of seconds a single job may take, None for no limit.
+        :param prog: The Graphviz program that is used for the rendering.
+        :param render_cache: The (optional) persistent cache of rendered models.
+        """
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.timeout = timeout
+        self.prog = prog
+        self.render_cache = render_cache
+        self.cache_hits = 0
+        self.executor = None # created on the first job, so a run without jobs starts no threads
+        self.jobs = {} # path -> future of the job
+        self.graphs = {} # content hash of the graph -> (path, future) of its first job
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    def submit(self, dot_text: str, path: str, format: str = 'svg'):
+        """
+        Queue the rendering of a graph, the future of the job is returned.
+
+        :param dot_text: The graph in the DOT format.
+        :param path: The path of the file the graph is rendered to.
+        :param format: The output format, e.g. `svg`.
+        """
+        if path in self.jobs:
+            return self.jobs[path]
+
+        graph_hash = compute_graph_hash(dot_text, format, self.prog)
+        if graph_hash not in self.graphs and self.render_cache is not None and self.render_cache.restore(graph_hash, path, format):
+            # a hard link (or copy) of the cached file is cheap, so it is not queued
+            future = Future()
+            future.set_result(None)
+            self.cache_hits += 1
+            self.graphs[graph_hash] = (path, future)
+            self.jobs[path] = future
+            return future
+
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='render')
+        if graph_hash in self.graphs:
+            # jobs start in the order they are queued, so the rendering of the source is already running or done
+            source_path, source_future = self.graphs[graph_hash]
+            future = self.executor.submit(copy_rendered_file, source_future, source_path, path)
+        elif self.render_cache is not None:
+            future = self.executor.submit(render_and_store, dot_text, path, format, self.prog, self.timeout, self.render_cache, graph_hash)
+            self.graphs[graph_hash] = (path, future)
+        else:
+            future = self.executor.submit(render_dot_text, dot_text, path, format, self.prog, self.timeout)
+            self.graphs[graph_hash] = (path, future)
+        self.jobs[path] = future
+        return future
+
+    def submit_jobs(self, jobs: list):
+        """
+        Queue render jobs that were collected elsewhere, see `RenderJobList`.
+
+        :param jobs: The (dot_text, path, format) tuples of the jobs.
+        """
+        for dot_text, path, format in jobs:
+            self.submit(dot_text, path, format)
+
+    def is_finished(self, paths: list) -> bool:
+        """
+        Check whether the jobs of the given paths are finished, paths without a job count as finished.
+
+        :param paths: The paths of the rendered files.
+        """
+        return all(self.jobs[path].done() for path in paths if path in self.jobs)
+
+    def wait(self, paths: list = None) -> dict:
+        """
+        Wait until the queued jobs are finished, the error per path of the jobs that failed is returned.
+
+        :param paths: The paths of the jobs that are waited for, by default all jobs. Paths without a job are ignored.
+        """
+        errors = {}
+        for path in (self.jobs if paths is None else paths):
+            future = self.jobs.get(path)
+            if future is None:
+                continue
+            try:
+                future.result()
+            except subprocess.TimeoutExpired:
+                errors[path] = 'rendering took longer than ' + str(self.timeout) + ' seconds'
+            except Exception as e:
+                errors[path] = type(e).__name__ + ': ' + str(e)
+        return errors
+
+    def close(self):
+        """
+        Wait for the running jobs and stop the threads of the pool.
+        """
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+            self.executor = None
+
+
+class RenderJobList:
+    """
+    Collects render jobs instead of rendering them, e.g. in a worker process whose jobs are rendered by the
+    render pool of the main process. It has the same `submit` method as the RenderPool.
+    """
+
+    def __init__(self):
+        self.jobs = []
+
+    def submit(self, dot_text: str, path: str, format: str = 'svg'):
+        self.jobs.append((dot_text, path, format))
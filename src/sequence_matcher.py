@@ -0,0 +1,104 @@
+from collections import deque
+
+
+def tokenize_sequence(sequence) -> list:
+    """
+    Get the tokens (links or services) of a sequence. Sequences are lists of tokens, a sequence that is
+    stored as its string representation (e.g. `['a__b', 'b__c']`) is split into its tokens.
+
+    :param sequence: The sequence as a list of tokens or as its string representation.
+    """
+    if not isinstance(sequence, str):
+        return list(sequence)
+    text = sequence.strip()
+    if text.startswith('[') and text.endswith(']'):
+        text = text[1:-1]
+    if text.strip() == '':
+        return []
+    return [token.strip().strip('\'"') for token in text.split(',')]
+
+
+class SequenceMatcher:
+    """
+    Aho-Corasick automaton over a set of token sequences. The tokens are interned as integer ids and the
+    automaton is built once, afterwards every path is scanned in a single pass (linear in the length of the
+    path) and all token-aligned occurrences of all sequences are reported.
+    """
+
+    def __init__(self, sequences: list):
+        """
+        :param sequences: The sequences that are searched for, each as a list of tokens or as its string representation.
+        """
+        self.token_ids = {}
+        self.goto = [{}]
+        self.fail = [0]
+        self.outputs = [[]]
+        self.num_sequences = len(sequences)
+        for index, sequence in enumerate(sequences):
+            tokens = tokenize_sequence(sequence)
+            if len(tokens) == 0:
+                continue
+            node = 0
+            for token in tokens:
+                token_id = self.token_ids.setdefault(token, len(self.token_ids))
+                child = self.goto[node].get(token_id)
+                if child is None:
+                    child = len(self.goto)
+                    self.goto[node][token_id] = child
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.outputs.append([])
+                node = child
+            self.outputs[node].append(index)
+        self.build_failure_links()
+
+    def build_failure_links(self):
+        """
+        Compute the failure link of every node in breadth-first order. The outputs of the node a failure link
+        points to are merged into the outputs of the node, so a scan only has to look at the current node.
+        """
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for token_id, child in self.goto[node].items():
+                queue.append(child)
+                fallback = self.fail[node]
+                while fallback != 0 and token_id not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(token_id, 0)
+                self.outputs[child] = self.outputs[child] + self.outputs[self.fail[child]]
+
+    def find_occurrences(self, path) -> list:
+        """
+        Find all occurrences of the sequences in a path.
+
+        :param path: The path as a list of tokens or as its string representation.
+        """
+        occurrences = []
+        node = 0
+        for token in tokenize_sequence(path):
+            token_id = self.token_ids.get(token)
+            if token_id is None:
+                node = 0
+                continue
+            while node != 0 and token_id not in self.goto[node]:
+                node = self.fail[node]
+            node = self.goto[node].get(token_id, 0)
+            occurrences += self.outputs[node]
+        return occurrences
+
+    def count_occurrences(self, paths: list) -> tuple:
+        """
+        Count for every sequence how often it occurs in all paths together, and in how many paths it occurs.
+
+        :param paths: The paths, each as a list of tokens or as its string representation.
+        """
+        occurrence_counts = [0] * self.num_sequences
+        path_counts = [0] * self.num_sequences
+        for path in paths:
+            occurrences = self.find_occurrences(path)
+            for index in occurrences:
+                occurrence_counts[index] += 1
+            for index in set(occurrences):
+                path_counts[index] += 1
+        return occurrence_counts, path_counts
@@ -0,0 +1,184 @@
+import numpy as np
+
+STATIC_LINK_SEPARATOR = '-' # Separator of the services in the links of the static model (`src-dst`)
+DYNAMIC_LINK_SEPARATOR = '__' # Separator of the services in the links of the dynamic models (`src__dst`)
+
+
+def normalize_service_name(service: str) -> str:
+    """
+    Normalize the name of a service as it is used in the links of the static model, e.g. `Admin-Server` becomes `admin_server`.
+
+    :param service: The name of the service.
+    """
+    return service.replace('-', '_').lower()
+
+
+class ServiceRegistry:
+    """
+    Interned registry of the services and links of a microservice application. Every service gets a dense integer
+    id, the spellings of a service (e.g. `admin-server` in the dynamic models and `admin_server` in the static model)
+    all map to the same id. Every (source, destination) pair of services that is registered as a link gets a dense
+    integer link id. Both spellings are kept as names: the normalized name is used in the links of the static model
+    and the display name is used in the dynamic models, their file names and the interpretations.
+    """
+
+    def __init__(self, services: list = ()):
+        """
+        :param services: The services that are registered first, in this order.
+        """
+        self.service_ids = {} # normalized name -> service id
+        self.spelling_ids = {} # every spelling that was seen -> service id, so known spellings are not normalized again
+        self.service_names = []
+        self.display_names = []
+        self.link_ids = {} # (source id, destination id) -> link id
+        self.link_pairs = []
+        for service in services:
+            self.add_service(service)
+
+    def __len__(self) -> int:
+        return len(self.service_names)
+
+    def add_service(self, service: str) -> int:
+        """
+        Get the id of a service, the service is registered if it is not known yet. A spelling with hyphens
+        (as used in the dynamic models) becomes the display name of the service.
+
+        :param service: The name of the service in any spelling.
+        """
+        service_id = self.spelling_ids.get(service)
+        if service_id is not None:
+            return service_id
+        normalized_name = normalize_service_name(service)
+        service_id = self.service_ids.get(normalized_name)
+        if service_id is None:
+            service_id = len(self.service_names)
+            self.service_ids[normalized_name] = service_id
+            self.service_names.append(normalized_name)
+            self.display_names.append(normalized_name.replace('_', '-'))
+        if '-' in service:
+            self.display_names[service_id] = service.lower()
+        self.spelling_ids[service] = service_id
+        return service_id
+
+    def get_service_id(self, service: str):
+        """
+        Get the id of a service, or None if the service is not registered.
+
+        :param service: The name of the service in any spelling.
+        """
+        service_id = self.spelling_ids.get(service)
+        if service_id is None:
+            service_id = self.service_ids.get(normalize_service_name(service))
+            if service_id is not None:
+                self.spelling_ids[service] = service_id
+        return service_id
+
+    def get_service_name(self, service_id: int) -> str:
+        return self.service_names[service_id]
+
+    def get_display_name(self, service_id: int) -> str:
+        return self.display_names[service_id]
+
+    def add_link(self, source_id: int, destination_id: int) -> int:
+        """
+        Get the id of the link between two services, the link is registered if it is not known yet.
+
+        :param source_id: The id of the source service.
+        :param destination_id: The id of the destination service.
+        """
+        pair = (source_id, destination_id)
+        link_id = self.link_ids.get(pair)
+        if link_id is None:
+            link_id = len(self.link_pairs)
+            self.link_ids[pair] = link_id
+            self.link_pairs.append(pair)
+        return link_id
+
+    def get_link_id(self, source_id, destination_id):
+        """
+        Get the id of the link between two services, or None if the link is not registered.
+
+        :param source_id: The id of the source service.
+        :param destination_id: The id of the destination service.
+        """
+        return self.link_ids.get((source_id, destination_id))
+
+    def get_link_pair(self, link_id: int) -> tuple:
+        return self.link_pairs[link_id]
+
+    def get_static_link_name(self, link_id: int) -> str:
+        source_id, destination_id = self.link_pairs[link_id]
+        return self.service_names[source_id] + STATIC_LINK_SEPARATOR + self.service_names[destination_id]
+
+    def get_dynamic_link_name(self, link_id: int) -> str:
+        source_id, destination_id = self.link_pairs[link_id]
+        return self.display_names[source_id] + DYNAMIC_LINK_SEPARATOR + self.display_names[destination_id]
+
+    def split_static_link(self, link: str) -> tuple:
+        """
+        Split a link in the format `src-dst` into the names of its services. Service names may contain hyphens
+        themselves, so the split at which both services are registered is taken. If there is no such split, the
+        link is split at its middle hyphen.
+
+        :param link: The link in the format `src-dst`.
+        """
+        parts = link.split(STATIC_LINK_SEPARATOR)
+        for i in range(1, len(parts)):
+            source, destination = STATIC_LINK_SEPARATOR.join(parts[:i]), STATIC_LINK_SEPARATOR.join(parts[i:])
+            if self.get_service_id(source) is not None and self.get_service_id(destination) is not None:
+                return source, destination
+        middle = max(len(parts) // 2, 1)
+        return STATIC_LINK_SEPARATOR.join(parts[:middle]), STATIC_LINK_SEPARATOR.join(parts[middle:])
+
+    def add_static_link(self, link: str) -> int:
+        """
+        Get the id of a link in the format `src-dst`, the link and its services are registered if they are not known yet.
+
+        :param link: The link in the format `src-dst`.
+        """
+        source, destination = self.split_static_link(link)
+        return self.add_link(self.add_service(source), self.add_service(destination))
+
+    def find_dynamic_link(self, link: str):
+        """
+        Get the id of a link in the format `src__dst`, or None if the link is not registered.
+
+        :param link: The link in the format `src__dst`.
+        """
+        source, _, destination = link.partition(DYNAMIC_LINK_SEPARATOR)
+        return self.get_link_id(self.get_service_id(source), self.get_service_id(destination))
+
+    def find_static_link(self, link: str):
+        """
+        Get the id of a link in the format `src-dst`, or None if the link is not registered.
+
+        :param link: The link in the format `src-dst`.
+        """
+        source, destination = self.split_static_link(link)
+        return self.get_link_id(self.get_service_id(source), self.get_service_id(destination))
+
+    def find_link(self, link: str):
+        """
+        Get the id of a link in either format (`src__dst` or `src-dst`), or None if the link is not registered.
+
+        :param link: The link in the format `src__dst` or `src-dst`.
+        """
+        return self.find_dynamic_link(link) if DYNAMIC_LINK_SEPARATOR in link else self.find_static_link(link)
+
+    def find_label_pairs(self, labels: list) -> np.ndarray:
+        """
+        Get the (source, destination) service ids of transition labels, -1 for services that are not registered.
+
+        :param labels: The TransitionLabel records, e.g. the labels of the symbols of a dynamic model.
+        """
+        pairs = [(self.get_service_id(label.source), self.get_service_id(label.destination)) for label in labels]
+        return np.array([(-1 if source is None else source, -1 if destination is None else destination) for source, destination in pairs], dtype=np.int64).reshape(-1, 2)
+
+    def find_label_links(self, labels: list) -> np.ndarray:
+        """
+        Get the link id of transition labels, -1 for links that are not registered.
+
+        :param labels: The TransitionLabel records, e.g. the labels of the symbols of a dynamic model.
+        """
+        link_ids = [self.get_link_id(self.get_service_id(label.source), self.get_service_id(label.destination)) for label in labels]
+        return np.array([-1 if link_id is None else link_id for link_id in link_ids], dtype=np.int64)
@@ -0,0 +1,81 @@
+from src.service_registry import ServiceRegistry
+import numpy as np
+
+
+class StaticModel:
+    """
+    Indexed store of the evidences extracted by the static model (DFD model from TUHH). The evidences are
+    stored per link (`src-dst`, with normalized service names), so the evidences of a link are found with
+    a single lookup. The services and links are interned in the service registry, and the parents and
+    children of each service are computed once (as service ids) when the model is created.
+    """
+
+    def __init__(self, link_evidences: dict, service_registry: ServiceRegistry = None):
+        """
+        :param link_evidences: The evidences per link, each evidence is a tuple of its type, file and line.
+        :param service_registry: The registry of the services and links, a new registry is created if None.
+        """
+        self.service_registry = service_registry if service_registry is not None else ServiceRegistry()
+        self.links = link_evidences
+        self.link_evidences = {self.service_registry.add_static_link(link): evidences for link, evidences in link_evidences.items()}
+        self.link_pairs = np.array([self.service_registry.get_link_pair(link_id) for link_id in self.link_evidences], dtype=np.int64).reshape(-1, 2)
+
+        parent_ids, child_ids = {}, {}
+        for source_id, target_id in self.link_pairs.tolist():
+            child_ids.setdefault(source_id, set()).add(target_id)
+            parent_ids.setdefault(target_id, set()).add(source_id)
+        get_name = self.service_registry.get_service_name
+        self.parent_ids = {service_id: tuple(sorted(parents, key=get_name)) for service_id, parents in parent_ids.items()}
+        self.child_ids = {service_id: tuple(sorted(children, key=get_name)) for service_id, children in child_ids.items()}
+
+    def has_link(self, link: str) -> bool:
+        return link in self.links
+
+    def get_link_evidences(self, link: str) -> list:
+        """
+        Get the evidences of a link, or an empty list if the static model has no evidence for the link.
+
+        :param link: The link in the format `src-dst`.
+        """
+        return self.links.get(link, [])
+
+    def get_link_evidences_by_id(self, link_id) -> list:
+        """
+        Get the evidences of a link, or an empty list if the static model has no evidence for the link.
+
+        :param link_id: The id of the link in the service registry, may be None for unknown links.
+        """
+        return self.link_evidences.get(link_id, [])
+
+    def get_link_code_url_by_id(self, link_id):
+        """
+        Get the file (URL to the code) of the first evidence of a link, or None if the link has no evidence.
+
+        :param link_id: The id of the link in the service registry, may be None for unknown links.
+        """
+        evidences = self.link_evidences.get(link_id)
+        return evidences[0][1] if evidences else None
+
+    def get_parent_ids(self, service_id) -> tuple:
+        """
+        Get the ids of the services that call the given service, in the order of their names.
+
+        :param service_id: The id of the service in the service registry.
+        """
+        return self.parent_ids.get(service_id, ())
+
+    def get_child_ids(self, service_id) -> tuple:
+        return self.child_ids.get(service_id, ())
+
+    def get_parents(self, service: str) -> tuple:
+        """
+        Get the services that call the given service, in sorted order.
+
+        :param service: The name of the service.
+        """
+        get_name = self.service_registry.get_service_name
+        return tuple(get_name(parent) for parent in self.get_parent_ids(self.service_registry.get_service_id(service)))
+
+    def get_children(self, service: str) -> set:
+        get_name = self.service_registry.get_service_name
+        return {get_name(child) for child in self.get_child_ids(self.service_registry.get_service_id(service))}
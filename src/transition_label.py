@@ -0,0 +1,85 @@
+DIRECTIONS = ('in', 'out') # Prefixes FlexFringe adds to the transitions of the models learned for a single service
+
+
+class TransitionLabel:
+    """
+    Immutable record holding the parsed fields of a FlexFringe transition label. The labels have
+    the format `[in|out__]port__url[__status__method]__src__dst`: the models learned for a service
+    prefix the direction of the call and the general model does not store the status code and
+    method. Each distinct label is parsed once when a model is loaded, afterwards all stages of
+    the pipeline use the fields of this record instead of splitting the label again.
+    """
+    __slots__ = ('text', 'direction', 'port', 'url', 'status', 'method', 'source', 'destination', 'link', 'service_link', 'frequency')
+
+    def __init__(self, text: str, direction, port: str, url: str, status, method, source: str, destination: str, frequency: int = 0):
+        set_field = object.__setattr__
+        set_field(self, 'text', text)
+        set_field(self, 'direction', direction)
+        set_field(self, 'port', port)
+        set_field(self, 'url', url)
+        set_field(self, 'status', status)
+        set_field(self, 'method', method)
+        set_field(self, 'source', source)
+        set_field(self, 'destination', destination)
+        # link as used in the sequences of the interpretation (`src__dst`) and as used in the static model (`src-dst`)
+        set_field(self, 'link', source + '__' + destination)
+        set_field(self, 'service_link', source.replace('-', '_') + '-' + destination.replace('-', '_'))
+        set_field(self, 'frequency', frequency)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('TransitionLabel is immutable')
+
+    def __reduce__(self):
+        return (TransitionLabel, (self.text, self.direction, self.port, self.url, self.status, self.method, self.source, self.destination, self.frequency))
+
+    def __eq__(self, other):
+        return isinstance(other, TransitionLabel) and self.text == other.text and self.frequency == other.frequency
+
+    def __hash__(self):
+        return hash((self.text, self.frequency))
+
+    def __repr__(self):
+        return 'TransitionLabel(' + repr(self.text) + ', frequency=' + str(self.frequency) + ')'
+
+    def with_frequency(self, frequency: int):
+        """
+        Get a copy of the record with a different frequency.
+
+        :param frequency: The frequency of the new record.
+        """
+        return TransitionLabel(self.text, self.direction, self.port, self.url, self.status, self.method, self.source, self.destination, frequency)
+
+
+def parse_transition_label(label: str, frequency: int = None) -> TransitionLabel:
+    """
+    Parse the label of a transition of a FlexFringe model. The label may still contain the quotes and
+    the frequency (`"<symbol>\\n<frequency> "`) as it occurs in the DOT file.
+
+    :param label: The label of the transition, or only its symbol.
+    :param frequency: The frequency of the transition. If None, the frequency is taken from the label (0 if it has none).
+    """
+    label = label.strip()
+    if len(label) > 1 and label[0] == '"' and label[-1] == '"':
+        label = label[1:-1]
+    splitted = label.split('\n')
+    text = splitted[0]
+    if frequency is None:
+        frequency = int(splitted[1].strip()) if len(splitted) > 1 and splitted[1].strip().isdigit() else 0
+
+    fields = text.split('__')
+    direction = None
+    if len(fields) > 2 and fields[0] in DIRECTIONS:
+        direction = fields[0]
+        fields = fields[1:]
+
+    if len(fields) < 2:
+        return TransitionLabel(text, direction, '', '', None, None, fields[0], fields[0], frequency)
+    source, destination = fields[-2], fields[-1]
+    if len(fields) >= 6:
+        status, method = fields[-4], fields[-3]
+        url = '__'.join(fields[1:-4])
+    else:
+        status, method = None, None
+        url = '__'.join(fields[1:-2])
+    port = fields[0] if len(fields) > 2 else ''
+    return TransitionLabel(text, direction, port, url, status, method, source, destination, frequency)
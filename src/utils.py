@@ -1,40 +1,71 @@
-import pydot
+from src.dot_parser import parse_dot_file
+from src.json_parser import parse_json_file
+from src.dynamic_model import DynamicModel
+from src.lazy_dynamic_model import LazyDynamicModel
+from src.transition_label import parse_transition_label
+import os
 
 SINGLE = 'non-conformance' # text for single non-conformance
 MULTIPLE = SINGLE + 's' # text for multiple non-conformances
+FF_MODEL_SUFFIXES = {'dot': '.csv.ff.final.dot', 'json': '.csv.ff.final.json'} # Suffixes of the dynamic model files created by FlexFringe per model format
 
 def clean_dynamic_model(dynamic_model):
 	'''
-	Clean up a dynamic model that has been loaded via the pydot library. We first remove nodes that are 
-	created due to the new lines in the DOT file. This part is a hacky as we do not know the cause for 
-	the new lines. Maybe this is a bug in the pydot library?
+	Clean up a dynamic model that has been loaded via the FlexFringe DOT parser. We remove unnecessary 
+	information and coloring from the nodes (added by FlexFringe by default) to reduce clutter and 
+	confusion when visualizing the dynamic model. The bogus nodes that pydot used to create for the 
+	new lines in the DOT file are never created by the parser, so they do not have to be removed here.
 
-	Then we the remove unnecessary information and coloring from the nodes (added by FlexFringe by default) 
-	to reduce clutter and confusion when visualizing the dynamic model.
+	:param dynamic_model: The dynamic model loaded via the FlexFringe DOT parser.
+	'''
+	# clear label text and remove color of the states
+	return dynamic_model.clean()
+
+def select_dynamic_model_file(model_path: str, model_format: str = None) -> str:
+	'''
+	Select the file of a dynamic model for the given model format. FlexFringe writes the DOT file and
+	its JSON companion next to each other, so we swap the suffix of the given path. If the file for 
+	the requested format does not exist (e.g. no JSON file was written for a model), the given path is used.
 
-	:param dynamic_model: The dynamic model loaded via the pydot library.
+	:param model_path: The path to the dynamic model (DOT or JSON).
+	:param model_format: The format of the model that should be loaded, either `dot` or `json`. If None, the given path is used.
 	'''
-	nodes = dynamic_model.get_nodes()
-	for n in nodes:
-		if n.get_name() == '\"\\n\"':
-			dynamic_model.del_node(n)
-
-	for n in nodes:
-		# clear label text
-		n.set_label('State ' + n.get_name().split('_')[-1] + '\n')
-		# remove color
-		n.set_fillcolor('white')
-	    
-	return dynamic_model
-
-def collect_dynamic_model(model_path: str):
+	if model_format is None:
+		return model_path
+	for suffix in FF_MODEL_SUFFIXES.values():
+		if model_path.endswith(suffix):
+			selected_path = model_path[:-len(suffix)] + FF_MODEL_SUFFIXES[model_format]
+			return selected_path if os.path.exists(selected_path) else model_path
+	return model_path
+
+def collect_dynamic_model(model_path: str, model_format: str = None, model_cache = None, lazy: bool = False):
     '''
-    Load the dynamic model based on the given path. We use the pydot library to load the model as
-    the models are stored in the dot format.
+    Load the dynamic model based on the given path. The models are stored in the DOT format by 
+    FlexFringe, we parse them in a single pass with the dedicated parser for this (restricted) dialect.
+    FlexFringe also stores the models in JSON format, these are loaded directly from the structured data.
+    If a model cache is given, the parsed model is taken from the cache when the model file did not change.
 
     :param model_path: The path to the dynamic model.
+    :param model_format: The format of the model that should be loaded, either `dot` or `json`. If None, the format follows from the path.
+    :param model_cache: The (optional) cache of parsed dynamic models.
+    :param lazy: If True, a DOT model is indexed from the memory-mapped file and the attributes of its states are only parsed when the model is rendered.
     '''
-    return pydot.graph_from_dot_file(model_path)[0]
+    model_path = select_dynamic_model_file(model_path, model_format)
+    if model_cache is not None:
+        dynamic_model = model_cache.get(model_path)
+        if dynamic_model is not None:
+            return dynamic_model
+
+    if model_path.endswith('.json'):
+        dynamic_model = DynamicModel.from_graph(parse_json_file(model_path))
+    elif lazy:
+        dynamic_model = LazyDynamicModel.from_file(model_path)
+    else:
+        dynamic_model = DynamicModel.from_graph(parse_dot_file(model_path))
+
+    if model_cache is not None:
+        model_cache.put(model_path, dynamic_model)
+    return dynamic_model
 
 def extract_state_to_edges_mapping_from_dynamic_model(dynamic_model):
 	'''
@@ -44,11 +75,10 @@ def extract_state_to_edges_mapping_from_dynamic_model(dynamic_model):
 	'''
 	state_to_edges_mapping = {}
 	edges = dynamic_model.get_edges()
-	for edge in edges:
-		src = edge.get_source()
-		if src not in state_to_edges_mapping:
-			state_to_edges_mapping[src] = []
-		state_to_edges_mapping[src].append(edge)
+	for state, name in enumerate(dynamic_model.state_names):
+		out_edges = dynamic_model.get_out_edges(state)
+		if len(out_edges) > 0:
+			state_to_edges_mapping[name] = [edges[i] for i in out_edges]
 	
 	return state_to_edges_mapping
 
@@ -61,8 +91,7 @@ def extract_link_from_transition_label(transition_label: str) -> str:
 	
 	:param transition_label: The label(text) extracted from a transition in the dynamic model.
 	'''
-	splitted = transition_label.split('__')
-	return splitted[-2].replace('-', '_') + '-' + splitted[-1].split('\n')[0].replace('-', '_')
+	return parse_transition_label(transition_label).service_link
 
 def compute_num_detected_ncf_text(num_static_ncfs: int, num_dynamic_ncfs: int) -> str:
 	'''
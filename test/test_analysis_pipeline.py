@@ -0,0 +1,71 @@
+from src.analysis_pipeline import *
+from src.model_processor import read_static_model
+from src.model_registry import ModelRegistry
+import unittest
+import os
+
+TEST_DATA_FOLDER = os.path.join(os.path.dirname(__file__), 'test_data/')
+TEST_STATIC_MODEL_PATH = TEST_DATA_FOLDER + 'test_static_model.json'
+TEST_DYNAMIC_MODEL_PATH = TEST_DATA_FOLDER + 'test_dynamic_model_normal.dot'
+
+class FakeRenderPool:
+    # the models of `unfinished` are still rendering
+    def __init__(self, unfinished: set):
+        self.unfinished = unfinished
+        self.waited = []
+
+    def is_finished(self, paths: list) -> bool:
+        return not any(path in self.unfinished for path in paths)
+
+    def wait(self, paths: list = None) -> dict:
+        self.waited.extend(paths)
+        return {}
+
+class TestAnalysisPipeline(unittest.TestCase):
+    def test_fingerprint_non_conformances(self):
+        non_conformances = [('static', 'user-order'), ('dynamic', 'order-catalog')]
+        settings = {'static_model': '0', 'sequence_analysis': 'analytic'}
+        items = list(fingerprint_non_conformances(non_conformances, TEST_DATA_FOLDER, TEST_DYNAMIC_MODEL_PATH, settings))
+        self.assertEqual([(item['non_conformance_type'], item['non_conformance'], item['stream']) for item in items], [('static', 'user-order', 0), ('dynamic', 'order-catalog', 1)])
+        self.assertTrue(all(item['interpretation'] is None and not item['reused'] for item in items))
+        self.assertNotEqual(items[0]['fingerprint'], items[1]['fingerprint'])
+
+    def test_generate_interpretations_in_windows(self):
+        static_model = read_static_model(TEST_STATIC_MODEL_PATH)
+        model_registry = ModelRegistry()
+        dynamic_model = model_registry.get_model(TEST_DYNAMIC_MODEL_PATH)
+        items = [{'non_conformance_type': 'dynamic', 'non_conformance': ncf, 'stream': i, 'interpretation': None} for i, ncf in enumerate(['order-catalog', 'customer-catalog', 'user-order'])]
+        reused = {'services': ['reused']}
+        items.insert(1, {'non_conformance_type': 'static', 'non_conformance': 'user-order', 'stream': 3, 'interpretation': reused})
+        results = list(generate_interpretations_in_windows(iter(items), TEST_DATA_FOLDER, TEST_DATA_FOLDER + 'output/', static_model, dynamic_model, model_registry, 'analytic', None, window_size=2))
+        self.assertEqual([result['interpretation']['services'] for result in results], [['order', 'catalog'], ['reused'], ['customer', 'catalog'], ['user', 'order']])
+        # only the general model is left, the models of the windows are released
+        self.assertEqual(len(model_registry.models), 1)
+
+    def test_generate_interpretations_in_windows_with_failed_interpretation(self):
+        static_model = read_static_model(TEST_STATIC_MODEL_PATH)
+        model_registry = ModelRegistry()
+        dynamic_model = model_registry.get_model(TEST_DYNAMIC_MODEL_PATH)
+        # there is no model of the link between order and unknown
+        items = [{'non_conformance_type': ncf_type, 'non_conformance': ncf, 'stream': i, 'interpretation': None, 'error': None} for i, (ncf_type, ncf) in enumerate([('static', 'order-unknown'), ('dynamic', 'order-catalog')])]
+        results = list(generate_interpretations_in_windows(iter(items), TEST_DATA_FOLDER, TEST_DATA_FOLDER + 'output/', static_model, dynamic_model, model_registry, 'analytic', None))
+        self.assertEqual(len(results), 2)
+        self.assertIsNone(results[0]['interpretation'])
+        self.assertTrue(results[0]['error'].startswith('FileNotFoundError'))
+        self.assertIsNone(results[1]['error'])
+        self.assertEqual(results[1]['interpretation']['services'], ['order', 'catalog'])
+
+    def test_wait_for_rendered_models(self):
+        items = [{'interpretation': {'src_dyn_model': 'a.svg'}}, {'interpretation': None}, {'interpretation': {'link_dyn_model': 'b.svg'}}, {'interpretation': {}}]
+        render_pool = FakeRenderPool({'a.svg'})
+        stream = wait_for_rendered_models(iter(items), render_pool, buffer_size=2)
+        # the first item waits for its model until the buffer is full, the order is kept
+        first = next(stream)
+        self.assertIs(first, items[0])
+        self.assertEqual(render_pool.waited, ['a.svg'])
+        self.assertEqual(list(stream), items[1:])
+        self.assertEqual(items[1]['render_errors'], {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+from CATMA import run_analysis
+import unittest
+import tempfile
+import json
+import os
+
+DATA_FOLDER = os.path.join(os.path.dirname(__file__), '../data/ewolff_microservice/')
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), '../config/config.json')
+INTERPRETATION_TEXTS_PATH = os.path.join(os.path.dirname(__file__), '../interpretation_texts/interpretation_texts.json')
+# Stand-in for Graphviz that fails for the models that involve the turbine service and renders an empty SVG otherwise
+FAILING_DOT_SCRIPT = '#!/bin/sh\ncase "$3" in *turbine*) echo "layout failed" >&2; exit 1;; esac\ncat > /dev/null\necho "<svg></svg>" > "$3"\n'
+
+class TestCATMA(unittest.TestCase):
+    def setUp(self):
+        self.temporary_folder = tempfile.TemporaryDirectory()
+        self.bin_folder = os.path.join(self.temporary_folder.name, 'bin')
+        os.makedirs(self.bin_folder)
+        with open(os.path.join(self.bin_folder, 'dot'), 'w') as f:
+            f.write(FAILING_DOT_SCRIPT)
+        os.chmod(os.path.join(self.bin_folder, 'dot'), 0o755)
+        self.path = os.environ['PATH']
+        os.environ['PATH'] = self.bin_folder + os.pathsep + self.path
+        self.output_folder = os.path.join(self.temporary_folder.name, 'output') + '/'
+        with open(CONFIG_PATH) as f:
+            self.config = json.load(f)
+        # no caches, so every model is rendered by the stand-in
+        self.config.update({'model_cache_folder': None, 'render_cache_folder': None, 'diagram_backend': 'none'})
+        with open(INTERPRETATION_TEXTS_PATH) as f:
+            self.interpretation_texts = json.load(f)
+
+    def tearDown(self):
+        os.environ['PATH'] = self.path
+        self.temporary_folder.cleanup()
+
+    def test_run_analysis_with_failed_renderings(self):
+        result = run_analysis(DATA_FOLDER + 'ewolff_microservice_static_model.json', DATA_FOLDER + 'dynamic_models/', self.output_folder, self.config, self.interpretation_texts)
+        self.assertEqual(result['failed_interpretations'], 0)
+        reports = [report for report in os.listdir(self.output_folder + 'interpretations/') if report.endswith('.html')]
+        self.assertEqual(len(reports), result['static_non_conformances'] + result['dynamic_non_conformances'])
+        rendered_models = os.listdir(self.output_folder + 'code_linked_models/')
+        self.assertEqual(sorted(rendered_models), ['order_service_model.svg', 'user_eureka_link_model.svg'])
+        with open(self.output_folder + 'interpretations/user_eureka_static-non_conformance.html') as f:
+            self.assertNotIn('could not be rendered', f.read())
+        with open(self.output_folder + 'interpretations/user_turbine_static-non_conformance.html') as f:
+            self.assertIn('could not be rendered', f.read())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+from src.dot_parser import *
+import unittest
+import os
+
+CORRECT_TEST_MODEL_PATH = os.path.join(os.path.dirname(__file__), 'test_data/test_dynamic_model_normal.dot')
+TEST_MODEL_NEWLINE_NODE = os.path.join(os.path.dirname(__file__), 'test_data/test_dynamic_model_with_newline_node.dot')
+
+class TestDotParser(unittest.TestCase):
+
+    def setUp(self):
+        self.correct_test_model_path = CORRECT_TEST_MODEL_PATH
+        self.test_model_path_with_newline_node = TEST_MODEL_NEWLINE_NODE
+
+    def test_parse_dot_file(self):
+        graph = parse_dot_file(self.correct_test_model_path)
+        edges = [(e.get_source(), e.get_destination()) for e in graph.get_edges()]
+        expected_edges = [('I', '0'), ('0', '1'), ('1', '10'), ('10', '23')]
+        self.assertEqual(edges, expected_edges)
+        self.assertEqual(len(graph.get_nodes()), 5)
+
+    def test_parse_dot_file_keeps_label_of_transition(self):
+        graph = parse_dot_file(self.correct_test_model_path)
+        label = graph.get_edges()[1].get_label()
+        self.assertEqual(label, '"in__8080.0__>__200.0__get__user__admin-server\n12 "')
+        self.assertIsNone(graph.get_edges()[0].get_label())
+
+    def test_parse_dot_file_without_newline_node(self):
+        graph = parse_dot_file(self.test_model_path_with_newline_node)
+        names = [n.get_name() for n in graph.get_nodes()]
+        self.assertEqual(names, ['0', '0', '1', '10', '23'])
+
+    def test_parse_dot_string_round_trip(self):
+        graph = parse_dot_file(self.correct_test_model_path)
+        graph.get_edges()[1].set_href('https://github.com/test')
+        reparsed = parse_dot_string(graph.to_string())
+        self.assertEqual([e.get_label() for e in reparsed.get_edges()], [e.get_label() for e in graph.get_edges()])
+        self.assertEqual(reparsed.get_edges()[1].get_attributes()['href'], '"https://github.com/test"')
+
+    def test_quote_value(self):
+        self.assertEqual(quote_value('white'), 'white')
+        self.assertEqual(quote_value('3.21888'), '3.21888')
+        self.assertEqual(quote_value('State 0\n'), '"State 0\n"')
+        self.assertEqual(quote_value('"already quoted"'), '"already quoted"')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+from src.dynamic_model import *
+from src.dot_parser import parse_dot_file
+import unittest
+import pickle
+import os
+
+TEST_DYNAMIC_MODEL_PATH = os.path.join(os.path.dirname(__file__), 'test_data/test_dynamic_model_with_call_details.dot')
+
+class TestDynamicModel(unittest.TestCase):
+    def setUp(self):
+        self.dynamic_model = DynamicModel.from_graph(parse_dot_file(TEST_DYNAMIC_MODEL_PATH))
+
+    def test_csr_adjacency(self):
+        state = self.dynamic_model.get_state('1')
+        out_edges = self.dynamic_model.get_out_edges(state)
+        destinations = [self.dynamic_model.state_names[self.dynamic_model.destinations[e]] for e in out_edges]
+        self.assertEqual(destinations, ['10'])
+        self.assertEqual(len(self.dynamic_model.get_out_edges(self.dynamic_model.get_state('23'))), 0)
+
+    def test_interned_symbols(self):
+        symbol = self.dynamic_model.symbols[self.dynamic_model.get_out_edges(self.dynamic_model.get_initial_state())[0]]
+        self.assertEqual(self.dynamic_model.alphabet[symbol], '8080.0__>__200.0__get__user__admin-server')
+        self.assertEqual(self.dynamic_model.get_symbol_link(symbol), 'user__admin-server')
+        self.assertEqual(self.dynamic_model.get_symbols_of_link('user__admin-server'), [0, 1, 2])
+
+    def test_edges_of_link(self):
+        self.assertEqual(len(self.dynamic_model.get_edges_of_link('user__admin-server')), 3)
+        state = self.dynamic_model.get_state('1')
+        edges = self.dynamic_model.get_edges_of_link('user__admin-server', state)
+        self.assertEqual([self.dynamic_model.state_names[self.dynamic_model.destinations[e]] for e in edges], ['10'])
+        self.assertEqual(len(self.dynamic_model.get_edges_of_link('user__test')), 0)
+
+    def test_edge_views(self):
+        edges = self.dynamic_model.get_edges()
+        labelled = [e for e in edges if e.symbol is not None]
+        self.assertEqual(len(edges), 4)
+        self.assertEqual([(e.get_source(), e.get_destination(), e.frequency) for e in labelled], [('0', '1', 12), ('1', '10', 9), ('10', '23', 8)])
+        self.assertEqual(labelled[0].get_label(), '"8080.0__>__200.0__get__user__admin-server\n12 "')
+
+    def test_clean(self):
+        self.dynamic_model.clean()
+        labels = [n.get_label() for n in self.dynamic_model.get_nodes()]
+        self.assertEqual(labels, ['State 0\n', 'State 1\n', 'State 10\n', 'State 23\n'])
+
+    def test_to_string_contains_hrefs(self):
+        self.dynamic_model.hrefs[0] = 'https://github.com/test'
+        self.assertIn('href="https://github.com/test"', self.dynamic_model.to_string())
+
+    def test_pickle_round_trip(self):
+        restored = pickle.loads(pickle.dumps(self.dynamic_model))
+        self.assertEqual(restored.offsets.tolist(), self.dynamic_model.offsets.tolist())
+        self.assertEqual(restored.alphabet, self.dynamic_model.alphabet)
+
+
+if __name__ == '__main__':
+    unittest.main()
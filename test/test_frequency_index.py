@@ -0,0 +1,31 @@
+from src.frequency_index import *
+from src.dynamic_model import DynamicModel
+from src.dot_parser import parse_dot_file
+import unittest
+import os
+
+TEST_DYNAMIC_MODEL_PATH = os.path.join(os.path.dirname(__file__), 'test_data/test_dynamic_model_with_call_details.dot')
+
+class TestFrequencyIndex(unittest.TestCase):
+    def setUp(self):
+        self.frequency_index = DynamicModel.from_graph(parse_dot_file(TEST_DYNAMIC_MODEL_PATH)).frequency_index
+
+    def test_call_frequencies(self):
+        self.assertEqual(self.frequency_index.get_call_frequency('8080.0__>__200.0__get__user__admin-server'), 12)
+        self.assertEqual(self.frequency_index.get_call_frequency('8080.0__>__500.0__get__user__admin-server'), 0)
+
+    def test_link_frequencies(self):
+        self.assertEqual(self.frequency_index.get_link_frequency('user__admin-server'), 29)
+        self.assertEqual(self.frequency_index.get_link_status_frequency('user__admin-server', '200.0'), 21)
+        self.assertEqual(self.frequency_index.get_status_frequencies('user__admin-server'), {'200.0': 21, '304.0': 8})
+        self.assertEqual(self.frequency_index.get_link_frequency('user__test'), 0)
+
+    def test_top_calls(self):
+        top_calls = self.frequency_index.get_top_calls(2)
+        self.assertEqual(top_calls, [('8080.0__>__200.0__get__user__admin-server', 12), ('8080.0__>applications__200.0__get__user__admin-server', 9)])
+        self.assertEqual(len(self.frequency_index.get_top_calls(10)), 3)
+        self.assertEqual(self.frequency_index.get_top_links(1), [('user__admin-server', 29)])
+
+
+if __name__ == '__main__':
+    unittest.main()
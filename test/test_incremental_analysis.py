@@ -0,0 +1,99 @@
+from src.incremental_analysis import *
+from src.static_model import StaticModel
+import unittest
+from unittest import mock
+import tempfile
+import shutil
+import os
+
+TEST_DYNAMIC_MODEL_PATH = os.path.join(os.path.dirname(__file__), 'test_data/test_dynamic_model_with_call_details.dot')
+
+class TestIncrementalAnalysis(unittest.TestCase):
+    def setUp(self):
+        self.model_folder = tempfile.mkdtemp() + '/'
+        self.output_folder = tempfile.mkdtemp() + '/'
+        self.model_path = self.model_folder + 'user_admin-server_link_data.csv.ff.final.dot'
+        shutil.copy(TEST_DYNAMIC_MODEL_PATH, self.model_path)
+
+    def tearDown(self):
+        shutil.rmtree(self.model_folder)
+        shutil.rmtree(self.output_folder)
+
+    def test_diff_model_folders(self):
+        previous_hashes = {'a.dot': '1', 'b.dot': '2', 'c.dot': '3'}
+        current_hashes = {'a.dot': '1', 'b.dot': '4', 'd.dot': '5'}
+        model_diff = diff_model_folders(previous_hashes, current_hashes)
+        self.assertEqual(model_diff, {'added': ['d.dot'], 'removed': ['c.dot'], 'changed': ['b.dot'], 'unchanged': ['a.dot']})
+
+    def test_only_model_files_are_hashed(self):
+        with open(self.model_folder + '.DS_Store', 'wb') as f:
+            f.write(b'\x00')
+        self.assertEqual(list(compute_model_folder_hashes(self.model_folder)), ['user_admin-server_link_data.csv.ff.final.dot'])
+
+    def test_compute_non_conformance_delta(self):
+        delta = compute_non_conformance_delta({'a-b', 'b-c'}, {'b-c', 'c-d'})
+        self.assertEqual(delta, {'resolved': ['a-b'], 'new': ['c-d'], 'unchanged': ['b-c']})
+
+    def test_remove_resolved_interpretations(self):
+        static_model = StaticModel({'order-catalog': []})
+        interpretations_folder = self.output_folder + 'interpretations/'
+        os.makedirs(interpretations_folder)
+        for file_name in ('order_turbine_dynamic-non_conformance.html', 'order_catalog_dynamic-non_conformance.html'):
+            open(interpretations_folder + file_name, 'w').close()
+        delta = {
+            'static': compute_non_conformance_delta({'admin_server-order'}, set()),
+            'dynamic': compute_non_conformance_delta({'order-turbine', 'order-catalog'}, {'order-catalog'})
+        }
+        removed_paths = remove_resolved_interpretations(self.output_folder, delta, static_model)
+        self.assertEqual(removed_paths, [interpretations_folder + 'order_turbine_dynamic-non_conformance.html'])
+        self.assertEqual(os.listdir(interpretations_folder), ['order_catalog_dynamic-non_conformance.html'])
+
+    def test_fingerprint_changes_with_model_content(self):
+        input_paths = collect_input_paths_for_interpretation('static', ['user', 'admin_server'], self.model_folder, self.model_folder + 'general.dot')
+        self.assertEqual(input_paths, [self.model_path])
+        fingerprint = compute_interpretation_fingerprint(input_paths, {'static_model': '1'})
+        self.assertEqual(fingerprint, compute_interpretation_fingerprint(input_paths, {'static_model': '1'}))
+        self.assertNotEqual(fingerprint, compute_interpretation_fingerprint(input_paths, {'static_model': '2'}))
+        with open(self.model_path, 'a') as f:
+            f.write('\n')
+        self.assertNotEqual(fingerprint, compute_interpretation_fingerprint(input_paths, {'static_model': '1'}))
+
+    def test_reuse_interpretation_of_previous_run(self):
+        svg_path = self.output_folder + 'user_admin-server_link_model.svg'
+        interpretation = {'non_conformance_type': 'static', 'link_dyn_model': svg_path}
+        save_analysis_state(self.output_folder, {'user-admin_server'}, set(), {('static', 'user-admin_server'): {'fingerprint': 'f', 'interpretation': interpretation}})
+        state = load_analysis_state(self.output_folder)
+        self.assertEqual(state['static_non_conformances'], {'user-admin_server'})
+        # the rendered model of the interpretation does not exist (anymore)
+        self.assertIsNone(find_reusable_interpretation(state, 'static', 'user-admin_server', 'f'))
+        open(svg_path, 'w').close()
+        self.assertEqual(find_reusable_interpretation(state, 'static', 'user-admin_server', 'f'), interpretation)
+        self.assertIsNone(find_reusable_interpretation(state, 'static', 'user-admin_server', 'g'))
+        self.assertIsNone(find_reusable_interpretation(None, 'static', 'user-admin_server', 'f'))
+        state['file'].close()
+
+    def test_corrupt_state_is_ignored(self):
+        with open(self.output_folder + STATE_FILE_NAME, 'wb') as f:
+            f.write(b'not a pickle')
+        opened_files = []
+        def open_and_track(*args, **kwargs):
+            opened_files.append(open(*args, **kwargs))
+            return opened_files[-1]
+        with mock.patch('src.incremental_analysis.open', open_and_track, create=True):
+            self.assertIsNone(load_analysis_state(self.output_folder))
+        self.assertTrue(opened_files and all(f.closed for f in opened_files))
+
+    def test_failed_run_keeps_previous_state(self):
+        save_analysis_state(self.output_folder, {'user-admin_server'}, set(), {('static', 'user-admin_server'): {'fingerprint': 'f', 'interpretation': {}}})
+        with self.assertRaises(RuntimeError):
+            with AnalysisStateWriter(self.output_folder, set(), {'user-order'}) as state_writer:
+                state_writer.add('dynamic', 'user-order', 'g', {})
+                raise RuntimeError('interrupted run')
+        state = load_analysis_state(self.output_folder)
+        self.assertEqual(list(state['interpretations']), [('static', 'user-admin_server')])
+        self.assertEqual(os.listdir(self.output_folder), [STATE_FILE_NAME])
+        state['file'].close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,7 @@
 import socket
 from src.interpretation_generator import *
 from src.model_processor import *
+from src.static_model import StaticModel
 import unittest
 import os
 
@@ -30,7 +31,7 @@ class TestInterpretationGenerator(unittest.TestCase):
     
     def test_collect_link_code(self):
         link = 'order-catalog'
-        evidences = collect_link_code(link, self.static_model['links'])
+        evidences = collect_link_code(link, self.static_model)
         evidence = evidences[0]
         expected = "https://github.com/ewolff/microservice/blob/master/microservice-demo/microservice-demo-order/src/main/java/com/ewolff/microservice/order/clients/CatalogClient.java#L86"
         self.assertEqual(evidence[1], expected)
@@ -46,7 +47,7 @@ class TestInterpretationGenerator(unittest.TestCase):
 
     def test_collect_code_call_sequences_from_sequences(self):
         sequences = [['order-catalog']]
-        code_call_sequences = collect_code_call_sequences_from_sequences(sequences, self.static_model['links'])
+        code_call_sequences = collect_code_call_sequences_from_sequences(sequences, self.static_model)
         expected_num_sequences = 1
         expected_sequence_length = 1
         num_sequences_match = len(code_call_sequences.keys()) == expected_num_sequences
@@ -81,32 +82,58 @@ class TestInterpretationGenerator(unittest.TestCase):
         walk_length_match = len(random_walks[0]) == walk_length
         walk_path_match = random_walks[0] == ['user', 'admin-server', 'user', 'admin-server']
         self.assertTrue(num_walk_match and walk_length_match, walk_path_match)
+
+    def test_do_adaptive_random_walk_dynamic_model(self):
+        random_walk_settings = get_random_walk_settings({'walk_length': 3, 'number_of_walks': 200})
+        random_walks, coverage = do_adaptive_random_walk_dynamic_model(self.dynamic_model, 'user', 'test', random_walk_settings, create_random_generator(42))
+        self.assertEqual(len(random_walks), coverage['number_of_walks'])
+        self.assertLessEqual(coverage['number_of_walks'], 200)
+        self.assertTrue(all(path[-1] == 'user__test' for path in random_walks))
+        self.assertGreaterEqual(coverage['estimated_coverage'], 1.0 - random_walk_settings['missing_mass_threshold'])
     
 
+    def test_compute_sequence_statistics(self):
+        # the last sequence does not end with the missing link, its last link does not occur in the model
+        sequences = [['user__admin-server', 'user__admin-server', 'user__test'], ['user__test', 'user__admin-server'], ['user__admin-server', 'admin-server__test']]
+        sequence_statistics = compute_sequence_statistics(self.dynamic_model, sequences, 'user__test', 20)
+        self.assertAlmostEqual(sequence_statistics[str(sequences[0])]['probability'], 1.0)
+        self.assertAlmostEqual(sequence_statistics[str(sequences[0])]['expected_count'], 2.0)
+        self.assertEqual(sequence_statistics[str(sequences[1])]['probability'], 0.0)
+        self.assertEqual(sequence_statistics[str(sequences[2])]['probability'], 0.0)
+        self.assertEqual(sequence_statistics[str(sequences[2])]['expected_count'], 0.0)
+        self.assertEqual(find_occurred_sequences_in_statistics(sequences, sequence_statistics), sequences[:1])
+
     def test_find_sequence_of_call_details(self):
         sequence = ['user__admin-server', 'user__admin-server', 'user__test']
         sequence_call_details = find_sequence_of_call_details(sequence, self.dynamic_model)
         sorted_sequence_call_details = sorted([str(x) for x in sequence_call_details])
-        expected = [['8080.0__/', ' 8080.0__/applications'], ['8080.0__/applications', ' 8080.0__/assets/js/chunk-common.530a46a5.js']]
+        expected = [['8080.0__/', '8080.0__/applications'], ['8080.0__/applications', '8080.0__/assets/js/chunk-common.530a46a5.js']]
         sorted_expected = sorted([str(x) for x in expected])
         self.assertEqual(sorted_sequence_call_details, sorted_expected)
         
+    def test_find_call_details_frequencies(self):
+        sequence = ['user__admin-server', 'user__admin-server', 'user__test']
+        call_details_frequencies = find_call_details_frequencies(sequence, self.dynamic_model)
+        expected = {('8080.0__/', '8080.0__/applications'): 9, ('8080.0__/applications', '8080.0__/assets/js/chunk-common.530a46a5.js'): 8}
+        self.assertEqual(call_details_frequencies, expected)
+        self.assertEqual(find_call_details_frequencies(['user__test', 'user__admin-server'], self.dynamic_model), {})
+
     def test_find_previous_sequences_for_link_static_model(self):
-        previous_sequences = find_previous_sequences_for_link_static_model(self.static_model['links'], 'catalog', 'order', 2)
+        previous_sequences = find_previous_sequences_for_link_static_model(self.static_model, 'catalog', 'order', 2)
         expected = ['order__catalog']
         self.assertEqual(previous_sequences[0], expected)
 
-    def test_transform_static_model_links(self):
-        links = self.static_model['links']
-        transformed_links = transform_static_model_links(links)
-        expected_num_parents = 0
-        expected_children = 'catalog'
-        num_parents_match = len(transformed_links['order']['parents']) == expected_num_parents
-        children_match = list(transformed_links['order']['children'])[0] == expected_children
-        expected_parent = 'order'
-        children_parent_match = list(transformed_links['catalog']['parents'])[0] == expected_parent
-        children_no_children_match = len(transformed_links['catalog']['children']) == 0
-        self.assertTrue(num_parents_match and children_match and children_parent_match, children_no_children_match)
+    def test_find_all_previous_sequences_for_link_static_model(self):
+        static_model = StaticModel({'user-zuul': [], 'zuul-order': [], 'order-catalog': [], 'customer-order': []})
+        previous_sequences = find_previous_sequences_for_link_static_model(static_model, 'catalog', 'zuul')
+        expected = [['zuul__order', 'order__catalog'], ['user__zuul', 'zuul__order', 'order__catalog']]
+        self.assertEqual(previous_sequences, expected)
+        self.assertEqual(find_previous_sequences_for_link_static_model(static_model, 'catalog', 'zuul', 1), expected[:1])
+
+    def test_collect_model_paths_for_non_conformances(self):
+        model_paths = collect_model_paths_for_non_conformances({'order-catalog'}, {'order-turbine', 'order-catalog'}, 'models/')
+        self.assertEqual(model_paths[0], 'models/order_catalog' + FF_LINK_MODEL_SUFFIX)
+        self.assertEqual(sorted(model_paths[1:]), ['models/catalog' + FF_SERVICE_MODEL_SUFFIX, 'models/order' + FF_SERVICE_MODEL_SUFFIX, 'models/turbine' + FF_SERVICE_MODEL_SUFFIX])
 
     def test_collect_and_process_model_for_dynamic_non_conformance(self):
         serv_dyn_model_path = self.test_dynamic_model_path
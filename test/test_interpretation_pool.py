@@ -0,0 +1,53 @@
+from src.interpretation_pool import *
+from concurrent.futures import ProcessPoolExecutor, Future
+import unittest
+import os
+
+TEST_DATA_FOLDER = os.path.join(os.path.dirname(__file__), 'test_data/')
+TEST_STATIC_MODEL_PATH = TEST_DATA_FOLDER + 'test_static_model.json'
+TEST_DYNAMIC_MODEL_PATH = TEST_DATA_FOLDER + 'test_dynamic_model_normal.dot'
+
+class FakeExecutor:
+    # runs the tasks when they are submitted, the first task fails
+    def __init__(self):
+        self.tasks = []
+
+    def submit(self, function, task):
+        self.tasks.append(task)
+        future = Future()
+        future.set_result((None, 'RuntimeError: worker failed', []) if len(self.tasks) == 1 else ({'services': task['non_conformance'].split('-')}, None, []))
+        return future
+
+class TestInterpretationPool(unittest.TestCase):
+    def setUp(self):
+        self.static_model = read_static_model(TEST_STATIC_MODEL_PATH)
+        self.output_folder = TEST_DATA_FOLDER + 'output/'
+
+    def test_stream_interpretations_in_pool(self):
+        non_conformances = [('dynamic', 'order-catalog'), ('static', 'user-order'), ('dynamic', 'customer-catalog')]
+        items = [{'non_conformance_type': ncf_type, 'non_conformance': ncf, 'stream': i, 'interpretation': None} for i, (ncf_type, ncf) in enumerate(non_conformances)]
+        with ProcessPoolExecutor(max_workers=2) as executor, RenderPool(prog='true') as render_pool:
+            results = list(stream_interpretations_in_pool(executor, items, self.static_model, TEST_STATIC_MODEL_PATH, TEST_DATA_FOLDER,
+                                                          TEST_DYNAMIC_MODEL_PATH, self.output_folder, 'analytic', None, render_pool=render_pool))
+        # the results follow the order of the non-conformances, the missing link model only fails its own task
+        self.assertEqual(results[0]['interpretation']['services'], ['order', 'catalog'])
+        self.assertEqual(results[0]['interpretation']['missing_dynamic_model'], ['order', 'catalog'])
+        self.assertIsNone(results[1]['interpretation'])
+        self.assertTrue(results[1]['error'].startswith('FileNotFoundError'))
+        self.assertEqual(results[2]['interpretation']['services'], ['customer', 'catalog'])
+        self.assertIsNone(results[2]['error'])
+
+    def test_models_of_failed_task_are_rendered_by_next_task(self):
+        non_conformances = [('dynamic', 'order-catalog'), ('dynamic', 'customer-catalog'), ('dynamic', 'user-catalog')]
+        items = [{'non_conformance_type': ncf_type, 'non_conformance': ncf, 'stream': i, 'interpretation': None} for i, (ncf_type, ncf) in enumerate(non_conformances)]
+        executor = FakeExecutor()
+        results = list(stream_interpretations_in_pool(executor, items, self.static_model, TEST_STATIC_MODEL_PATH, TEST_DATA_FOLDER, TEST_DYNAMIC_MODEL_PATH,
+                                                      self.output_folder, 'analytic', None, render_pool=RenderPool(), max_in_flight=1))
+        self.assertEqual([result['error'] is None for result in results], [False, True, True])
+        # the catalog model is rendered by the second task, as the first task failed
+        catalog_svg_path = self.output_folder + 'code_linked_models/catalog_service_model.svg'
+        self.assertEqual([task['rendered_elsewhere'] for task in executor.tasks], [[], [], [catalog_svg_path]])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -20,6 +20,10 @@ class TestInterpretationVisualizer(unittest.TestCase):
         expected = ['user', 'admin-server', 'catalog', 'order', 'admin-server']
         self.assertEqual(readable_call_sequence, expected)
 
+    def test_generate_div_with_missing_svg_model(self):
+        svg_div = generate_div_with_svg_model('missing_model.svg', 'Dynamic model:', 'static_ncf_svg')
+        self.assertIn('could not be rendered', svg_div.render())
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,32 @@
+from src.json_parser import *
+from src.dot_parser import parse_dot_file
+import unittest
+import os
+
+TEST_JSON_MODEL_PATH = os.path.join(os.path.dirname(__file__), 'test_data/test_dynamic_model_with_call_details.json')
+TEST_DOT_MODEL_PATH = os.path.join(os.path.dirname(__file__), 'test_data/test_dynamic_model_with_call_details.dot')
+
+class TestJsonParser(unittest.TestCase):
+
+    def setUp(self):
+        self.test_json_model_path = TEST_JSON_MODEL_PATH
+        self.test_dot_model_path = TEST_DOT_MODEL_PATH
+
+    def test_parse_json_file(self):
+        graph = parse_json_file(self.test_json_model_path)
+        edges = [(e.get_source(), e.get_destination(), e.symbol, e.frequency) for e in graph.get_edges()]
+        expected_edges = [('I', '0', None, 0), ('0', '1', 0, 12), ('1', '10', 1, 9), ('10', '23', 2, 8)]
+        self.assertEqual(edges, expected_edges)
+        self.assertEqual(len(graph.alphabet), 3)
+
+    def test_parse_json_file_matches_dot_file(self):
+        json_graph = parse_json_file(self.test_json_model_path)
+        dot_graph = parse_dot_file(self.test_dot_model_path)
+        json_edges = [(e.get_source(), e.get_destination(), e.get_label(), e.frequency) for e in json_graph.get_edges()]
+        dot_edges = [(e.get_source(), e.get_destination(), e.get_label(), e.frequency) for e in dot_graph.get_edges()]
+        self.assertEqual(json_edges, dot_edges)
+        self.assertEqual(json_graph.alphabet, dot_graph.alphabet)
+
+
+if __name__ == '__main__':
+    unittest.main()
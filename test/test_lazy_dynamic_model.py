@@ -0,0 +1,49 @@
+from src.lazy_dynamic_model import *
+from src.dot_parser import parse_dot_file
+from src.non_conformance_detector import extract_occurred_links_from_dynamic_model
+import unittest
+import tempfile
+import os
+
+TEST_DYNAMIC_MODEL_PATH = os.path.join(os.path.dirname(__file__), 'test_data/test_dynamic_model_with_call_details.dot')
+TEST_DYNAMIC_MODEL_NEWLINE_PATH = os.path.join(os.path.dirname(__file__), 'test_data/test_dynamic_model_with_newline_node.dot')
+
+class TestLazyDynamicModel(unittest.TestCase):
+    def setUp(self):
+        self.lazy_model = LazyDynamicModel.from_file(TEST_DYNAMIC_MODEL_PATH)
+        self.dynamic_model = DynamicModel.from_graph(parse_dot_file(TEST_DYNAMIC_MODEL_PATH))
+
+    def test_transitions_match_parsed_model(self):
+        lazy_edges = [(e.get_source(), e.get_destination(), e.get_label()) for e in self.lazy_model.get_edges()]
+        edges = [(e.get_source(), e.get_destination(), e.get_label()) for e in self.dynamic_model.get_edges()]
+        self.assertEqual(sorted(lazy_edges, key=str), sorted(edges, key=str))
+        self.assertEqual(self.lazy_model.alphabet, self.dynamic_model.alphabet)
+
+    def test_node_attributes_are_loaded_on_demand(self):
+        links = extract_occurred_links_from_dynamic_model(self.lazy_model, ['user', 'admin_server'])
+        self.assertTrue(len(links) > 0)
+        self.assertFalse(self.lazy_model.node_attributes_loaded)
+        self.assertEqual(sorted(self.lazy_model.to_string().splitlines()), sorted(self.dynamic_model.to_string().splitlines()))
+        self.assertTrue(self.lazy_model.node_attributes_loaded)
+
+    def test_node_labels_with_newlines(self):
+        lazy_model = LazyDynamicModel.from_file(TEST_DYNAMIC_MODEL_NEWLINE_PATH)
+        dynamic_model = DynamicModel.from_graph(parse_dot_file(TEST_DYNAMIC_MODEL_NEWLINE_PATH))
+        self.assertEqual(len(lazy_model.get_nodes()), len(dynamic_model.get_nodes()))
+        self.assertEqual(len(lazy_model.get_edges()), len(dynamic_model.get_edges()))
+
+    def test_to_string_matches_parsed_model(self):
+        self.assertEqual(self.lazy_model.to_string(), self.dynamic_model.to_string())
+        # a state that is an endpoint of an edge before its node statement gets the same id in both models
+        with tempfile.TemporaryDirectory() as folder:
+            model_path = os.path.join(folder, 'model.dot')
+            with open(model_path, 'w') as f:
+                f.write('digraph DFA {\n0 -> 2 [label="user__order\n3 "];\n0 [shape=box];\n2 [width=1];\n1 [width=2];\n2 -> 1 [label="order__catalog\n3 "];\n}\n')
+            lazy_model = LazyDynamicModel.from_file(model_path)
+            dynamic_model = DynamicModel.from_graph(parse_dot_file(model_path))
+            self.assertEqual(lazy_model.state_names, dynamic_model.state_names)
+            self.assertEqual(lazy_model.to_string(), dynamic_model.to_string())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+from src.model_cache import *
+from src.utils import collect_dynamic_model
+from src.model_processor import read_dynamic_model
+import unittest
+import tempfile
+import shutil
+import os
+
+TEST_DYNAMIC_MODEL_PATH = os.path.join(os.path.dirname(__file__), 'test_data/test_dynamic_model_with_call_details.dot')
+
+class TestModelCache(unittest.TestCase):
+    def setUp(self):
+        self.cache_folder = tempfile.mkdtemp()
+        self.model_folder = tempfile.mkdtemp()
+        self.model_path = os.path.join(self.model_folder, 'test.csv.ff.final.dot')
+        shutil.copy(TEST_DYNAMIC_MODEL_PATH, self.model_path)
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_folder)
+        shutil.rmtree(self.model_folder)
+
+    def test_get_returns_none_for_unknown_model(self):
+        model_cache = ModelCache(self.cache_folder)
+        self.assertIsNone(model_cache.get(self.model_path))
+
+    def test_collect_dynamic_model_uses_cache(self):
+        model_cache = ModelCache(self.cache_folder)
+        dynamic_model = collect_dynamic_model(self.model_path, model_cache=model_cache)
+        cached_model = ModelCache(self.cache_folder).get(self.model_path)
+        self.assertEqual([e.get_label() for e in cached_model.get_edges()], [e.get_label() for e in dynamic_model.get_edges()])
+
+    def test_read_dynamic_model_caches_cleaned_model(self):
+        model_cache = ModelCache(self.cache_folder)
+        read_dynamic_model(self.model_path, model_cache=model_cache)
+        cached_model = model_cache.get(self.model_path, 'cleaned')
+        self.assertEqual(cached_model.get_nodes()[0].get_label(), 'State 0\n')
+
+    def test_changed_model_is_not_taken_from_cache(self):
+        model_cache = ModelCache(self.cache_folder)
+        collect_dynamic_model(self.model_path, model_cache=model_cache)
+        with open(self.model_path, 'a') as f:
+            f.write('\n')
+        self.assertIsNone(model_cache.get(self.model_path))
+
+    def test_evict_removes_least_recently_used_entries(self):
+        model_cache = ModelCache(self.cache_folder, max_size_mb=0)
+        collect_dynamic_model(self.model_path, model_cache=model_cache)
+        entries = [f for f in os.listdir(self.cache_folder) if f.endswith(ENTRY_SUFFIX)]
+        self.assertEqual(len(entries), 0)
+
+    def test_create_model_cache_without_folder(self):
+        self.assertIsNone(create_model_cache({'services': []}))
+
+
+if __name__ == '__main__':
+    unittest.main()
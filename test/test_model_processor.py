@@ -12,9 +12,9 @@ class TestModelProcessor(unittest.TestCase):
 
     def test_read_static_model(self):
         static_model = read_static_model(self.static_model_path)
-        num_keys = 1 == len(static_model.keys())
-        link_match = 'order-catalog' in static_model['links']
-        evidences = static_model['links']['order-catalog']
+        num_keys = 1 == len(static_model.links.keys())
+        link_match = static_model.has_link('order-catalog')
+        evidences = static_model.get_link_evidences('order-catalog')
         num_evidences_match = 1 == len(evidences)
         line_match = "86" == evidences[0][2]
         file_match = "https://github.com/ewolff/microservice/blob/master/microservice-demo/microservice-demo-order/src/main/java/com/ewolff/microservice/order/clients/CatalogClient.java#L86" == evidences[0][1]
@@ -22,7 +22,7 @@ class TestModelProcessor(unittest.TestCase):
     
     def test_read_dynamic_model(self):
         dynamic_model = read_dynamic_model(self.test_dynamic_model_path)
-        num_nodes = 5 == len(dynamic_model.get_nodes())
+        num_nodes = 4 == len(dynamic_model.get_nodes())
         num_edges = 4 == len(dynamic_model.get_edges())
         self.assertTrue(num_nodes and num_edges)
 
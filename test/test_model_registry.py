@@ -0,0 +1,51 @@
+from src.model_registry import *
+import unittest
+import os
+
+TEST_DYNAMIC_MODEL_PATH = os.path.join(os.path.dirname(__file__), 'test_data/test_dynamic_model_normal.dot')
+TEST_DYNAMIC_MODEL_DETAILS_PATH = os.path.join(os.path.dirname(__file__), 'test_data/test_dynamic_model_with_call_details.dot')
+
+class TestModelRegistry(unittest.TestCase):
+    def setUp(self):
+        self.test_dynamic_model_path = TEST_DYNAMIC_MODEL_PATH
+
+    def test_get_model_loads_model_once(self):
+        model_registry = ModelRegistry()
+        dynamic_model = model_registry.get_model(self.test_dynamic_model_path)
+        self.assertTrue(dynamic_model.cleaned)
+        self.assertIs(dynamic_model, model_registry.get_model(self.test_dynamic_model_path))
+
+    def test_get_missing_model(self):
+        model_registry = ModelRegistry()
+        missing_model_path = self.test_dynamic_model_path + '.missing'
+        self.assertIsNone(model_registry.get_model(missing_model_path, required=False))
+        with self.assertRaises(FileNotFoundError):
+            model_registry.get_model(missing_model_path)
+
+    def test_prefetch_models(self):
+        model_registry = ModelRegistry()
+        missing_model_path = self.test_dynamic_model_path + '.missing'
+        model_registry.prefetch([self.test_dynamic_model_path, TEST_DYNAMIC_MODEL_DETAILS_PATH, missing_model_path], max_workers=2)
+        self.assertEqual(3, len(model_registry.models))
+        self.assertTrue(model_registry.get_model(TEST_DYNAMIC_MODEL_DETAILS_PATH).cleaned)
+        self.assertIsNone(model_registry.get_model(missing_model_path, required=False))
+
+    def test_prefetch_models_with_shared_executor(self):
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            model_registry = ModelRegistry(executor=executor)
+            model_registry.prefetch([self.test_dynamic_model_path, TEST_DYNAMIC_MODEL_DETAILS_PATH])
+            self.assertEqual(2, len(model_registry.models))
+            # the shared executor is not shut down by the registry
+            self.assertEqual(executor.submit(len, 'test').result(), 4)
+
+    def test_close_releases_models(self):
+        with ModelRegistry() as model_registry:
+            model_registry.get_model(self.test_dynamic_model_path)
+            model_registry.mark_rendered('test.svg')
+            self.assertTrue(model_registry.is_rendered('test.svg'))
+        self.assertEqual(0, len(model_registry.models))
+        self.assertFalse(model_registry.is_rendered('test.svg'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,4 +1,5 @@
 from src.non_conformance_detector import *
+from src.service_registry import ServiceRegistry
 from src.model_processor import *
 import unittest
 import os
@@ -27,6 +28,13 @@ class TestNonConformanceDetector(unittest.TestCase):
         link_match = 'catalog-admin_server' in non_conformances
         self.assertTrue(num_non_conformances_match and link_match)
 
+    def test_find_non_conformance_in_link_matrices(self):
+        service_ids = ServiceRegistry(['user', 'catalog', 'order'])
+        this_matrix = compute_link_matrix(extract_link_pairs_from_links({'user-catalog', 'catalog-order'}, service_ids), len(service_ids))
+        that_matrix = compute_link_matrix(extract_link_pairs_from_links({'order-catalog'}, service_ids), len(service_ids))
+        non_conformances = find_non_conformance_in_link_matrices(this_matrix, that_matrix)
+        self.assertEqual({'user-catalog'}, convert_link_pairs_to_links(non_conformances, service_ids))
+
     def test_detect_non_conformances(self):
         static_model = read_static_model(self.static_model_path)
         dynamic_model = read_dynamic_model(self.test_dynamic_model_path)
@@ -9,14 +9,13 @@ TEST_STATIC_MODEL_PATH = os.path.join(os.path.dirname(__file__), 'test_data/test
 class TestNonConformanceVisualizer(unittest.TestCase):
     def setUp(self):
         self.output_folder = OUTPUT_FOLDER
-        if not os.path.exists(self.output_folder):
-            os.makedirs(self.output_folder)
+        os.makedirs(os.path.join(self.output_folder, 'visualization'), exist_ok=True)
         self.test_static_model_path = TEST_STATIC_MODEL_PATH
 
     def tearDown(self):
-        if os.path.exists(os.path.join(self.output_folder, 'visualization')):
-            os.remove(os.path.join(self.output_folder, 'visualization', 'plantuml.png'))
-            os.remove(os.path.join(self.output_folder, 'visualization', 'plantuml.txt'))
+        for file_name in ('plantuml.png', 'plantuml.txt'):
+            if os.path.exists(os.path.join(self.output_folder, 'visualization', file_name)):
+                os.remove(os.path.join(self.output_folder, 'visualization', file_name))
 
             
     
@@ -45,5 +44,19 @@ class TestNonConformanceVisualizer(unittest.TestCase):
         visualize_non_conformances(static_non_conformances, dynamic_non_conformances, self.output_folder, static_model)
         self.assertTrue(len(os.listdir(self.output_folder + '/visualization')) == 2)
 
+    def test_generation_of_visualization_without_diagram_backend(self):
+        static_model = read_static_model(self.test_static_model_path)
+        visualize_non_conformances({'order-order'}, set(), self.output_folder, static_model, get_diagram_settings({'diagram_backend': 'none'}))
+        self.assertEqual(os.listdir(self.output_folder + '/visualization'), ['plantuml.txt'])
+
+    def test_convert_plantuml_to_dot(self):
+        plantuml_str = add_footer(add_header('') + '        order [label = order shape = Mrecord];\n\n        order -> catalog [color = "black"]')
+        dot_text = convert_plantuml_to_dot(plantuml_str)
+        self.assertTrue(dot_text.startswith('digraph dfd2{\n'))
+        self.assertTrue(dot_text.endswith('order -> catalog [color = "black"]\n}\n'))
+        self.assertNotIn('@startuml', dot_text)
+        self.assertNotIn('skinparam', dot_text)
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
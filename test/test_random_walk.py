@@ -0,0 +1,60 @@
+from src.random_walk import *
+import numpy as np
+import unittest
+
+class TestRandomWalk(unittest.TestCase):
+    def setUp(self):
+        # state 0 -> 1 (first transition) or 0 -> 2 (second transition), state 1 -> 0, state 2 is absorbing
+        self.offsets = np.array([0, 2, 3, 3])
+        self.destinations = np.array([1, 2, 0])
+
+    def test_get_random_walk_settings(self):
+        settings = get_random_walk_settings({'walk_length': 5, 'random_seed': 42})
+        self.assertEqual(settings, {'number_of_walks': DEFAULT_NUMBER_OF_WALKS, 'walk_length': 5, 'seed': 42, 'frequency_weighted': False,
+                                    'adaptive': True, 'missing_mass_threshold': DEFAULT_MISSING_MASS_THRESHOLD, 'max_number_of_walks': DEFAULT_MAX_NUMBER_OF_WALKS})
+
+    def test_walks_are_reproducible(self):
+        walks = do_batched_random_walks(self.offsets, self.destinations, 0, 50, 10, create_random_generator(42, 3))
+        same_walks = do_batched_random_walks(self.offsets, self.destinations, 0, 50, 10, create_random_generator(42, 3))
+        other_walks = do_batched_random_walks(self.offsets, self.destinations, 0, 50, 10, create_random_generator(42, 4))
+        self.assertTrue(np.array_equal(walks, same_walks))
+        self.assertFalse(np.array_equal(walks, other_walks))
+
+    def test_walks_stop_in_absorbing_states(self):
+        walks = do_batched_random_walks(self.offsets, self.destinations, 0, 50, 10, create_random_generator(1))
+        for walk in walks:
+            taken = walk[walk >= 0]
+            self.assertTrue(np.all(walk[len(taken):] == -1))
+            if len(taken) < 10:
+                self.assertEqual(taken[-1], 1)
+
+    def test_frequency_weighted_walks(self):
+        probabilities = np.array([1.0, 0.0, 1.0])
+        walks = do_batched_random_walks(self.offsets, self.destinations, 0, 20, 6, create_random_generator(7), probabilities)
+        self.assertTrue(np.all(walks == np.array([0, 2, 0, 2, 0, 2])))
+
+    def test_adaptive_walks_stop_when_paths_saturate(self):
+        # state 0 -> 1 -> 2 or 0 -> 2, so there are only two paths
+        offsets = np.array([0, 2, 3, 3])
+        destinations = np.array([1, 2, 2])
+        walks, coverage = do_adaptive_random_walks(offsets, destinations, np.arange(3), 0, 10, create_random_generator(42), 10000, 0.01)
+        self.assertEqual(WALK_BATCH_SIZE, len(walks))
+        self.assertEqual(coverage, {'number_of_walks': WALK_BATCH_SIZE, 'unique_paths': 2, 'estimated_coverage': 1.0})
+
+    def test_adaptive_walks_use_budget(self):
+        # state 0 has 1000 transitions to the absorbing state 1, so there are many paths that are seen only once
+        offsets = np.array([0, 1000, 1000])
+        destinations = np.ones(1000, dtype=np.int64)
+        walks, coverage = do_adaptive_random_walks(offsets, destinations, np.arange(1000), 0, 10, create_random_generator(42), 250, 0.01)
+        self.assertEqual(250, len(walks))
+        self.assertEqual(250, coverage['number_of_walks'])
+        self.assertLess(coverage['estimated_coverage'], 1.0)
+
+    def test_walk_budget(self):
+        self.assertEqual(1000, compute_walk_budget(10, 1000, 100000))
+        self.assertEqual(WALKS_PER_TRANSITION * 5000, compute_walk_budget(5000, 1000, 100000))
+        self.assertEqual(100000, compute_walk_budget(50000, 1000, 100000))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+from src.render_pool import *
+import unittest
+import tempfile
+import os
+import stat
+
+TEST_DOT_TEXT = 'digraph DFA {\n0 -> 1 [label="user__order"];\n}\n'
+
+def create_program(folder: str, name: str, command: str) -> str:
+    # stands in for Graphviz, which is called as `prog -Tsvg -o path`
+    path = os.path.join(folder, name)
+    with open(path, 'w') as f:
+        f.write('#!/bin/sh\n' + command + '\n')
+    os.chmod(path, os.stat(path).st_mode | stat.S_IEXEC)
+    return path
+
+class TestRenderPool(unittest.TestCase):
+    def setUp(self):
+        # every test gets its own folder, so files (and cache entries) of a previous test or run are never reused
+        self.temporary_folder = tempfile.TemporaryDirectory()
+        self.output_folder = self.temporary_folder.name + '/'
+        self.prog = create_program(self.output_folder, 'render_copy.sh', 'cat > "$3"')
+
+    def tearDown(self):
+        self.temporary_folder.cleanup()
+
+    def test_render_jobs(self):
+        with RenderPool(max_workers=2, prog=self.prog) as render_pool:
+            render_pool.submit(TEST_DOT_TEXT, self.output_folder + 'render_a.svg')
+            render_pool.submit(TEST_DOT_TEXT.replace('order', 'catalog'), self.output_folder + 'render_b.svg')
+            self.assertEqual(render_pool.wait(), {})
+        with open(self.output_folder + 'render_b.svg') as f:
+            self.assertIn('user__catalog', f.read())
+
+    def test_identical_graphs_are_rendered_once(self):
+        with RenderPool(max_workers=2, prog=self.prog) as render_pool:
+            future = render_pool.submit(TEST_DOT_TEXT, self.output_folder + 'render_c.svg')
+            self.assertIs(render_pool.submit(TEST_DOT_TEXT, self.output_folder + 'render_c.svg'), future)
+            render_pool.submit(TEST_DOT_TEXT, self.output_folder + 'render_d.svg')
+            self.assertEqual(len(render_pool.graphs), 1)
+            self.assertEqual(render_pool.wait(), {})
+        with open(self.output_folder + 'render_d.svg') as f:
+            self.assertEqual(f.read(), TEST_DOT_TEXT)
+
+    def test_failed_jobs_are_reported(self):
+        failing_prog = create_program(self.output_folder, 'render_fail.sh', 'exit 1')
+        slow_prog = create_program(self.output_folder, 'render_slow.sh', 'sleep 5')
+        with RenderPool(max_workers=2, prog=failing_prog) as render_pool:
+            render_pool.submit(TEST_DOT_TEXT, self.output_folder + 'render_e.svg')
+            errors = render_pool.wait()
+        self.assertIn(self.output_folder + 'render_e.svg', errors)
+        with RenderPool(max_workers=2, timeout=0.1, prog=slow_prog) as render_pool:
+            render_pool.submit(TEST_DOT_TEXT, self.output_folder + 'render_f.svg')
+            errors = render_pool.wait()
+        self.assertIn('longer than', errors[self.output_folder + 'render_f.svg'])
+        self.assertFalse(os.path.exists(self.output_folder + 'render_f.svg'))
+
+    def test_render_cache(self):
+        render_cache = RenderCache(self.output_folder + 'render_cache/')
+        with RenderPool(max_workers=2, prog=self.prog, render_cache=render_cache) as render_pool:
+            render_pool.submit(TEST_DOT_TEXT, self.output_folder + 'render_g.svg')
+            self.assertEqual(render_pool.wait(), {})
+        # the next run takes the graph from the cache, Graphviz is not run
+        failing_prog = create_program(self.output_folder, 'render_copy.sh', 'exit 1')
+        with RenderPool(max_workers=2, prog=failing_prog, render_cache=render_cache) as render_pool:
+            render_pool.submit(TEST_DOT_TEXT, self.output_folder + 'render_h.svg')
+            render_pool.submit(TEST_DOT_TEXT + '\n', self.output_folder + 'render_i.svg')
+            errors = render_pool.wait()
+            self.assertEqual(render_pool.cache_hits, 1)
+        self.assertEqual(list(errors), [self.output_folder + 'render_i.svg'])
+        with open(self.output_folder + 'render_h.svg') as f:
+            self.assertEqual(f.read(), TEST_DOT_TEXT)
+
+    def test_render_job_list(self):
+        render_jobs = RenderJobList()
+        render_jobs.submit(TEST_DOT_TEXT, 'test.svg')
+        self.assertEqual(render_jobs.jobs, [(TEST_DOT_TEXT, 'test.svg', 'svg')])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,27 @@
+from src.sequence_matcher import *
+import unittest
+
+class TestSequenceMatcher(unittest.TestCase):
+    def test_tokenize_sequence(self):
+        self.assertEqual(tokenize_sequence("['a__b', 'b__c']"), ['a__b', 'b__c'])
+        self.assertEqual(tokenize_sequence(['a__b']), ['a__b'])
+        self.assertEqual(tokenize_sequence('[]'), [])
+
+    def test_find_overlapping_occurrences(self):
+        matcher = SequenceMatcher([['a', 'b'], ['b', 'c'], ['a', 'b', 'c', 'd'], ['c']])
+        occurrences = matcher.find_occurrences(['x', 'a', 'b', 'c', 'a', 'b', 'c', 'd'])
+        self.assertEqual(sorted(occurrences), [0, 0, 1, 1, 2, 3, 3])
+
+    def test_matches_are_token_aligned(self):
+        matcher = SequenceMatcher([['order__catalog']])
+        self.assertEqual(matcher.find_occurrences(['border__catalog', 'order__catalogs']), [])
+
+    def test_count_occurrences(self):
+        matcher = SequenceMatcher([['a', 'a'], ['b']])
+        occurrence_counts, path_counts = matcher.count_occurrences([['a', 'a', 'a'], ['b'], ['c']])
+        self.assertEqual(occurrence_counts, [2, 1])
+        self.assertEqual(path_counts, [1, 1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+from src.service_registry import *
+from src.transition_label import parse_transition_label
+import unittest
+
+class TestServiceRegistry(unittest.TestCase):
+    def setUp(self):
+        self.service_registry = ServiceRegistry(['user', 'admin-server'])
+
+    def test_spellings_share_service_id(self):
+        service_id = self.service_registry.get_service_id('admin-server')
+        self.assertEqual(service_id, 1)
+        self.assertEqual(self.service_registry.get_service_id('admin_server'), service_id)
+        self.assertEqual(self.service_registry.add_service('Admin-Server'), service_id)
+        self.assertEqual(self.service_registry.get_service_name(service_id), 'admin_server')
+        self.assertEqual(self.service_registry.get_display_name(service_id), 'admin-server')
+        self.assertIsNone(self.service_registry.get_service_id('catalog'))
+        self.assertEqual(len(self.service_registry), 2)
+
+    def test_link_names(self):
+        link_id = self.service_registry.add_link(0, 1)
+        self.assertEqual(self.service_registry.add_link(0, 1), link_id)
+        self.assertEqual(self.service_registry.get_static_link_name(link_id), 'user-admin_server')
+        self.assertEqual(self.service_registry.get_dynamic_link_name(link_id), 'user__admin-server')
+        self.assertEqual(self.service_registry.find_link('user__admin-server'), link_id)
+        self.assertEqual(self.service_registry.find_link('user-admin_server'), link_id)
+        self.assertIsNone(self.service_registry.find_link('admin-server__user'))
+
+    def test_split_hyphenated_static_link(self):
+        self.service_registry.add_service('api-gateway')
+        self.assertEqual(self.service_registry.split_static_link('api-gateway-admin-server'), ('api-gateway', 'admin-server'))
+        self.assertEqual(self.service_registry.split_static_link('user-api-gateway'), ('user', 'api-gateway'))
+        # unknown services are split at the middle hyphen
+        self.assertEqual(self.service_registry.split_static_link('a-b-c-d'), ('a-b', 'c-d'))
+
+    def test_find_label_links(self):
+        link_id = self.service_registry.add_link(0, 1)
+        labels = [parse_transition_label('8080__>__200__get__user__admin-server'), parse_transition_label('8080__>__200__get__user__catalog')]
+        self.assertEqual(self.service_registry.find_label_links(labels).tolist(), [link_id, -1])
+        self.assertEqual(self.service_registry.find_label_pairs(labels).tolist(), [[0, 1], [0, -1]])
+
+
+if __name__ == '__main__':
+    unittest.main()
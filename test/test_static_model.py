@@ -0,0 +1,36 @@
+from src.static_model import *
+from src.service_registry import normalize_service_name
+import unittest
+
+class TestStaticModel(unittest.TestCase):
+    def setUp(self):
+        self.static_model = StaticModel({
+            'order-catalog': [('Link', 'CatalogClient.java#L86', '86')],
+            'zuul-order': [('Link', 'ZuulRoute.java#L10', '10')],
+            'user-order': [('Link', 'UserClient.java#L5', '5')]
+        })
+
+    def test_normalize_service_name(self):
+        self.assertEqual(normalize_service_name('Admin-Server'), 'admin_server')
+
+    def test_link_evidences(self):
+        self.assertEqual(self.static_model.get_link_evidences('order-catalog'), [('Link', 'CatalogClient.java#L86', '86')])
+        self.assertIsNone(self.static_model.get_link_code_url_by_id(None))
+        self.assertEqual(self.static_model.get_link_evidences('catalog-order'), [])
+
+    def test_parents_and_children(self):
+        self.assertEqual(self.static_model.get_parents('order'), ('user', 'zuul'))
+        self.assertEqual(self.static_model.get_children('order'), {'catalog'})
+        self.assertEqual(self.static_model.get_parents('unknown'), ())
+
+    def test_links_are_interned(self):
+        service_registry = self.static_model.service_registry
+        link_id = service_registry.find_link('order-catalog')
+        self.assertEqual(service_registry.get_static_link_name(link_id), 'order-catalog')
+        self.assertEqual(self.static_model.get_link_code_url_by_id(link_id), 'CatalogClient.java#L86')
+        order_id = service_registry.get_service_id('order')
+        self.assertEqual([service_registry.get_service_name(x) for x in self.static_model.get_parent_ids(order_id)], ['user', 'zuul'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,35 @@
+from src.transition_label import *
+import unittest
+import pickle
+
+class TestTransitionLabel(unittest.TestCase):
+
+    def test_parse_service_model_label(self):
+        label = parse_transition_label('"in__8080.0__>__200.0__get__user__admin-server\n12 "')
+        fields = (label.direction, label.port, label.url, label.status, label.method, label.source, label.destination, label.frequency)
+        self.assertEqual(fields, ('in', '8080.0', '>', '200.0', 'get', 'user', 'admin-server', 12))
+        self.assertEqual(label.link, 'user__admin-server')
+        self.assertEqual(label.service_link, 'user-admin_server')
+
+    def test_parse_link_model_label(self):
+        label = parse_transition_label('8080.0__>catalog>2__200.0__get__order__catalog', 28)
+        fields = (label.direction, label.port, label.url, label.status, label.method, label.link, label.frequency)
+        self.assertEqual(fields, (None, '8080.0', '>catalog>2', '200.0', 'get', 'order__catalog', 28))
+
+    def test_parse_general_model_label(self):
+        label = parse_transition_label('8761.0__>eureka>apps>delta__zuul__eureka')
+        fields = (label.port, label.url, label.status, label.method, label.source, label.destination)
+        self.assertEqual(fields, ('8761.0', '>eureka>apps>delta', None, None, 'zuul', 'eureka'))
+
+    def test_transition_label_is_immutable(self):
+        label = parse_transition_label('8761.0__>eureka>apps>delta__zuul__eureka')
+        with self.assertRaises(AttributeError):
+            label.port = '8080.0'
+
+    def test_pickle_round_trip(self):
+        label = parse_transition_label('8080.0__>catalog>2__200.0__get__order__catalog', 28)
+        self.assertEqual(pickle.loads(pickle.dumps(label)), label)
+
+
+if __name__ == '__main__':
+    unittest.main()
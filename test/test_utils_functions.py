@@ -5,6 +5,8 @@ import pydot
 
 CORRECT_TEST_MODEL_PATH = os.path.join(os.path.dirname(__file__), 'test_data/test_dynamic_model_normal.dot')
 TEST_MODEL_NEWLINE_NODE = os.path.join(os.path.dirname(__file__), 'test_data/test_dynamic_model_with_newline_node.dot')
+DATA_DOT_MODEL_PATH = os.path.join(os.path.dirname(__file__), '../data/ewolff_microservice/dynamic_models/order_catalog_link_data.csv.ff.final.dot')
+DATA_DOT_MODEL_WITHOUT_JSON_PATH = os.path.join(os.path.dirname(__file__), '../data/piggymetrics/dynamic_models/ms_http_data.csv.ff.final.dot')
 
 class TestUtilsFunctions(unittest.TestCase):
 
@@ -15,14 +17,15 @@ class TestUtilsFunctions(unittest.TestCase):
     def test_collect_dynamic_model(self):
         dynamic_model = collect_dynamic_model(self.correct_test_model_path)
         sum_edge_node = len(dynamic_model.get_nodes()) + len(dynamic_model.get_edges())
-        self.assertEqual(sum_edge_node, 9)
+        self.assertEqual(sum_edge_node, 8)
 
     def test_clean_dynamic_model(self):
         dynamic_model = collect_dynamic_model(self.test_model_path_with_newline_node)
         before = len(dynamic_model.get_nodes())
         dynamic_model = clean_dynamic_model(dynamic_model)
         after = len(dynamic_model.get_nodes())
-        self.assertEqual(1, before-after)
+        labels_match = all(n.get_label() == 'State ' + n.get_name() + '\n' for n in dynamic_model.get_nodes())
+        self.assertTrue(before == after == 4 and labels_match)
 
     def test_extract_state_to_edges_mapping_from_dynamic_model(self):
         dynamic_model = collect_dynamic_model(self.correct_test_model_path)
@@ -34,6 +37,16 @@ class TestUtilsFunctions(unittest.TestCase):
         link = extract_link_from_transition_label(transition_label)
         self.assertEqual(link, 'user-admin_server')
 
+    def test_select_dynamic_model_file(self):
+        json_path = select_dynamic_model_file(DATA_DOT_MODEL_PATH, 'json')
+        self.assertEqual(json_path, DATA_DOT_MODEL_PATH[:-len('.dot')] + '.json')
+        self.assertEqual(select_dynamic_model_file(json_path, 'dot'), DATA_DOT_MODEL_PATH)
+        self.assertEqual(select_dynamic_model_file(DATA_DOT_MODEL_PATH), DATA_DOT_MODEL_PATH)
+
+    def test_select_dynamic_model_file_falls_back_without_json(self):
+        path = select_dynamic_model_file(DATA_DOT_MODEL_WITHOUT_JSON_PATH, 'json')
+        self.assertEqual(path, DATA_DOT_MODEL_WITHOUT_JSON_PATH)
+
     def test_compute_num_detected_ncf_text(self):
         text = compute_num_detected_ncf_text(2, 1)
         self.assertEqual(text, 'Detected 2 static non-conformances and 1 dynamic non-conformance between implementation and deployment of the system!')